@@ -0,0 +1,175 @@
+"""Cost of the candidate representation on one request: slotted dataclasses vs the old Pydantic model.
+
+Each request parses N Google-Places-shaped results into candidates, dedupes and selects 16 of
+them, then materializes the top 5 as EnrichedSuggestions. "pydantic" builds every candidate as the
+validated model VenueCandidate used to be (defined below); "dataclass" builds the current slotted
+VenueCandidate and only converts the five returned items to models. It reports median CPU time per
+request and, from tracemalloc, the number of live allocations and peak memory while the candidate
+list is held.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.candidate_overhead --sizes 50 200 1000
+"""
+
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Literal, Optional
+
+from pydantic import BaseModel
+
+from ai_service.models import (
+  CandidateLocation,
+  CandidateRef,
+  EnrichedSuggestion,
+  ExternalRef,
+  SuggestionLocation,
+  VenueCandidate,
+)
+from ai_service.pipeline import _prefilter_candidates, _select_candidates
+
+TYPES = ["bar", "restaurant", "night_club", "bowling_alley", "museum", "park"]
+PRICES = {0: "Free", 1: "£", 2: "££", 3: "£££", 4: "££££"}
+
+
+class LegacyCandidate(BaseModel):
+  """VenueCandidate as a Pydantic model, before it became a slotted dataclass."""
+
+  id: str
+  title: str
+  category: Optional[str] = None
+  type: Literal["venue", "event"] = "venue"
+  location: SuggestionLocation = SuggestionLocation()
+  external: ExternalRef = ExternalRef()
+  roughPrice: Optional[str] = None
+  rating: Optional[float] = None
+  description: Optional[str] = None
+  priceLevel: Optional[int] = None
+  startTime: Optional[str] = None
+
+
+def _places(size: int) -> List[dict]:
+  rng = random.Random(size)
+  return [
+    {
+      # Every fifth id repeats an earlier one, like overlapping text-search queries.
+      "place_id": f"place-{idx - 1 if idx % 5 == 4 else idx}",
+      "name": f"Karaoke {rng.choice(TYPES).replace('_', ' ')} {idx}",
+      "types": [rng.choice(TYPES), "establishment"],
+      "formatted_address": f"{idx} High Street, London",
+      "geometry": {"location": {"lat": 51.5 + rng.uniform(-0.1, 0.1), "lng": -0.12 + rng.uniform(-0.1, 0.1)}},
+      "rating": round(rng.uniform(3.0, 5.0), 1),
+      "price_level": rng.randint(0, 4),
+      "business_status": "OPERATIONAL",
+    }
+    for idx in range(size)
+  ]
+
+
+def _parse_pydantic(item: dict) -> LegacyCandidate:
+  geo = item["geometry"]["location"]
+  return LegacyCandidate(
+    id=item["place_id"],
+    title=item["name"],
+    category=item["types"][0],
+    location=SuggestionLocation(name="London", address=item["formatted_address"], lat=geo["lat"], lng=geo["lng"]),
+    external=ExternalRef(source="google_places", sourceId=item["place_id"]),
+    roughPrice=PRICES.get(item["price_level"]),
+    rating=item["rating"],
+    description=item["business_status"],
+    priceLevel=item["price_level"],
+  )
+
+
+def _parse_dataclass(item: dict) -> VenueCandidate:
+  geo = item["geometry"]["location"]
+  return VenueCandidate(
+    id=item["place_id"],
+    title=item["name"],
+    category=item["types"][0],
+    location=CandidateLocation(name="London", address=item["formatted_address"], lat=geo["lat"], lng=geo["lng"]),
+    external=CandidateRef(source="google_places", sourceId=item["place_id"]),
+    roughPrice=PRICES.get(item["price_level"]),
+    rating=item["rating"],
+    description=item["business_status"],
+    priceLevel=item["price_level"],
+  )
+
+
+def _suggestion(cand, location: SuggestionLocation, external: ExternalRef) -> EnrichedSuggestion:
+  return EnrichedSuggestion(
+    id=cand.id,
+    title=cand.title,
+    category=cand.category,
+    type=cand.type,
+    location=location,
+    external=external,
+    dateFitSummary="Within your time window",
+    groupFitSummary="Good for 6 people.",
+    whySuitable="Matches the vibe: karaoke.",
+    roughPrice=cand.roughPrice,
+  )
+
+
+def _request_pydantic(places: List[dict]) -> List[EnrichedSuggestion]:
+  candidates = [_parse_pydantic(item) for item in places]
+  shortlist = _select_candidates(_prefilter_candidates(candidates), "3", limit=16)
+  return [_suggestion(cand, cand.location, cand.external) for cand in shortlist[:5]]
+
+
+def _request_dataclass(places: List[dict]) -> List[EnrichedSuggestion]:
+  candidates = [_parse_dataclass(item) for item in places]
+  shortlist = _select_candidates(_prefilter_candidates(candidates), "3", limit=16)
+  return [_suggestion(cand, cand.location.to_model(), cand.external.to_model()) for cand in shortlist[:5]]
+
+
+MODES: Dict[str, Callable[[List[dict]], List[EnrichedSuggestion]]] = {
+  "pydantic": _request_pydantic,
+  "dataclass": _request_dataclass,
+}
+PARSERS = {"pydantic": _parse_pydantic, "dataclass": _parse_dataclass}
+
+
+def _cpu_ms(run: Callable[[], object], rounds: int) -> float:
+  run()  # warm validators and imports
+  timings = []
+  for _ in range(rounds):
+    start = time.process_time()
+    run()
+    timings.append(time.process_time() - start)
+  return statistics.median(timings) * 1000
+
+
+def _memory(mode: str, places: List[dict]) -> tuple[int, int]:
+  """Live allocations and peak bytes while a parsed candidate list is held."""
+  parse = PARSERS[mode]
+  tracemalloc.start()
+  try:
+    candidates = [parse(item) for item in places]
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  del candidates
+  return sum(stat.count for stat in snapshot.statistics("filename")), peak
+
+
+def main(sizes: List[int], rounds: int) -> None:
+  print(f"{'mode':<10} {'items':>6} {'cpu/req':>10} {'allocs':>8} {'peak':>10}")
+  for size in sizes:
+    places = _places(size)
+    for mode, request in MODES.items():
+      cpu = _cpu_ms(lambda: request(places), rounds)
+      allocs, peak = _memory(mode, places)
+      print(f"{mode:<10} {size:>6} {cpu:>8.3f}ms {allocs:>8} {peak / 1024:>8.1f}KB")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000])
+  parser.add_argument("--rounds", type=int, default=50)
+  args = parser.parse_args()
+  main(args.sizes, args.rounds)
@@ -0,0 +1,82 @@
+"""Per-result filter throughput: classify 10k synthetic candidate names.
+
+"per-call" reproduces the previous approach, which re-derived request intent and compiled a regex
+per token for every result (with the word-boundary escape fixed so both paths agree); "profile"
+classifies the request once and runs one precompiled regex per result. Before timing, it checks
+that wellness studios survive the art filter for a non-art request and that art studios don't.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.classification --names 10000
+"""
+
+import argparse
+import random
+import re
+import time
+
+from ai_service.classification import ART_HINT_TOKENS, NOT_ART_PHRASES, classify_intent, is_art_candidate
+
+WORDS = ["The", "Old", "Royal", "Craft", "Studio", "Arts", "Party", "Gallery", "Lane", "Tavern", "Social", "Club"]
+TYPES = [None, "bar", "restaurant", "museum", "night_club", "park", "art_gallery", "bowling_alley"]
+
+
+def _contains_token(text: str, token: str) -> bool:
+  text_lower = (text or "").lower()
+  if " " in token:
+    return token in text_lower
+  return re.search(rf"\b{re.escape(token)}\b", text_lower) is not None
+
+
+def _has_art_intent(text: str) -> bool:
+  lowered = text.lower()
+  if not lowered or any(phrase in lowered for phrase in NOT_ART_PHRASES):
+    return False
+  return any(_contains_token(lowered, token) for token in ART_HINT_TOKENS)
+
+
+def _per_call(vibe: str, event_type: str, name: str, primary_type: str | None) -> bool:
+  art_intent = _has_art_intent(f"{vibe} {event_type}")
+  if not art_intent and (primary_type in {"art_gallery", "museum"} or _has_art_intent(name)):
+    return True
+  if (art_intent or _contains_token(vibe.lower(), "class")) and primary_type in {"bar", "night_club", "liquor_store", "restaurant"}:
+    return True
+  return False
+
+
+def _check_studios() -> None:
+  yoga = classify_intent("yoga", "Day out")
+  for name in ("Triyoga Studio", "Pilates Studio London", "The Fitness Studio"):
+    assert not yoga.skips_art(name, "gym"), f"{name!r} dropped as art for a yoga request"
+  night = classify_intent("cocktails", "night out")
+  for name in ("Pottery Studio", "Art Studio Collective"):
+    assert night.skips_art(name, None), f"{name!r} kept for a non-art request"
+
+
+def main(count: int) -> None:
+  _check_studios()
+  rng = random.Random(3)
+  names = [(f"{rng.choice(WORDS)} {rng.choice(WORDS)} {idx}", rng.choice(TYPES)) for idx in range(count)]
+  vibe, event_type = "cocktails and karaoke", "night out"
+
+  start = time.perf_counter()
+  old = [_per_call(vibe, event_type, name, primary_type) for name, primary_type in names]
+  per_call = time.perf_counter() - start
+
+  start = time.perf_counter()
+  profile = classify_intent(vibe, event_type)
+  new = [profile.skips_art(name, primary_type) or profile.excludes(primary_type) for name, primary_type in names]
+  compiled = time.perf_counter() - start
+
+  assert old == new, "compiled classifier disagrees with per-call filters"
+  assert all(is_art_candidate(name, None) == _has_art_intent(name) for name, _ in names[:500])
+  print(f"{count} names, {sum(new)} filtered")
+  print(f"per-call  {per_call * 1000:>8.1f}ms  {count / per_call:>10.0f} names/s")
+  print(f"profile   {compiled * 1000:>8.1f}ms  {count / compiled:>10.0f} names/s")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--names", type=int, default=10000)
+  args = parser.parse_args()
+  main(args.names)
@@ -0,0 +1,74 @@
+"""Google Places search latency vs number of query terms, sequential vs concurrent.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.google_places_concurrency --latency 0.08
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from ai_service.benchmarks.stub_server import StubServer
+from ai_service.http_pool import HttpClientPool
+from ai_service.models import DateRange, UserPreferences
+from ai_service.providers import GooglePlacesProvider
+
+
+async def _places(path: str, query: dict, body: bytes):
+  term = (query.get("query") or [""])[0]
+  return (
+    200,
+    {
+      "results": [
+        {
+          "place_id": f"{term}-{idx}",
+          "name": f"Venue {idx} for {term}",
+          "types": ["bar"],
+          "geometry": {"location": {"lat": 51.5, "lng": -0.12}},
+          "rating": 4.2,
+        }
+        for idx in range(10)
+      ]
+    },
+  )
+
+
+async def main(latency: float, rounds: int) -> None:
+  async with StubServer(_places, latency=latency) as server:
+    pool = HttpClientPool(http2=False)
+    try:
+      print(f"stub latency {latency * 1000:.0f}ms, {rounds} rounds per cell")
+      print(f"{'terms':>5} {'sequential':>12} {'concurrent':>12}")
+      for refresh in range(4):
+        prefs = UserPreferences(
+          groupSize=6,
+          location="London",
+          dateRange=DateRange(mode="relative", label="this week"),
+          vibe="live music karaoke bowling darts",
+          eventType="night out",
+          refreshToken=refresh,
+        )
+        row = []
+        for concurrency in (1, 6):
+          provider = GooglePlacesProvider("bench", pool, concurrency=concurrency)
+          provider.base_url = f"{server.base_url}/maps/api/place/textsearch/json"
+          provider.rate_per_second = None  # measure fan-out, not the client-side rate limiter
+          timings = []
+          for _ in range(rounds):
+            start = time.perf_counter()
+            results = await provider.search(prefs)
+            timings.append((time.perf_counter() - start) * 1000)
+          row.append(statistics.median(timings))
+        print(f"{3 + refresh:>5} {row[0]:>10.1f}ms {row[1]:>10.1f}ms  ({len(results)} candidates)")
+    finally:
+      await pool.aclose()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--latency", type=float, default=0.08, help="stub server latency in seconds")
+  parser.add_argument("--rounds", type=int, default=5)
+  args = parser.parse_args()
+  asyncio.run(main(args.latency, args.rounds))
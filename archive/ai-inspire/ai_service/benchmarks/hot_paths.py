@@ -0,0 +1,244 @@
+"""CPU cost of the pure-Python candidate-processing paths at 10, 100, 1,000 and 10,000 items.
+
+Every case gets synthetic input of each size and reports the median of --rounds runs, in total
+and per item. The cases:
+
+  prefilter        pipeline._prefilter_candidates (about 20% duplicates)
+  select           pipeline._select_candidates with a refresh token
+  google_filter    GooglePlacesProvider._collect, the per-item art/excluded-type filter chain
+  normalize_intent intent_normalizer.normalize_intent on distinct vibes, memo cleared (cold path)
+  search_terms     classification.search_terms on distinct vibes (what _vibe_keywords became)
+  classify_intent  classification.classify_intent on distinct vibes, memo cleared
+  build_prompt     llm.client._build_prompt (budgeted, so cost is dominated by the shortlist)
+  local_metadata   LocalMetadataProvider.search over a synthetic catalogue of N ideas
+  venue_model      VenueCandidate.from_dict on provider-shaped dicts
+  suggestion_model EnrichedSuggestion construction
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.hot_paths --sizes 10 100 1000 10000 --output hot_paths.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from ai_service.catalogue import IdeaCatalogue
+from ai_service.classification import classify_intent, search_terms
+from ai_service.intent_normalizer import _normalize, normalize_intent
+from ai_service.llm.client import _build_prompt
+from ai_service.models import DateRange, EnrichedSuggestion, UserPreferences, VenueCandidate
+from ai_service.pipeline import _prefilter_candidates, _select_candidates
+from ai_service.providers import GooglePlacesProvider, LocalMetadataProvider
+
+PREFS = UserPreferences(
+  groupSize=6,
+  location="London",
+  dateRange=DateRange(mode="relative", label="this month"),
+  vibe="karaoke and cocktails",
+  eventType="night out",
+  budgetLevel="Medium",
+)
+TYPES = ["bar", "restaurant", "night_club", "bowling_alley", "art_gallery", "museum", "park", "gym"]
+WORDS = ["karaoke", "cocktails", "live", "music", "quiz", "comedy", "yoga", "pottery", "hike", "games"]
+PRICES = [None, "Free", "£", "££", "£££"]
+
+
+def _place(idx: int, rng: random.Random) -> dict:
+  kind = rng.choice(TYPES)
+  return {
+    # Every fifth id repeats an earlier one, like overlapping text-search queries.
+    "place_id": f"place-{idx - 1 if idx % 5 == 4 else idx}",
+    "name": f"{rng.choice(WORDS).title()} {kind.replace('_', ' ')} {idx}",
+    "types": [kind, "establishment"],
+    "formatted_address": f"{idx} High Street, London",
+    "geometry": {"location": {"lat": 51.5 + rng.uniform(-0.1, 0.1), "lng": -0.12 + rng.uniform(-0.1, 0.1)}},
+    "rating": round(rng.uniform(3.0, 5.0), 1),
+    "price_level": rng.randint(0, 4),
+    "business_status": "OPERATIONAL",
+  }
+
+
+def _candidate_fields(idx: int, rng: random.Random) -> dict:
+  place = _place(idx, rng)
+  return {
+    "id": place["place_id"],
+    "title": place["name"],
+    "category": place["types"][0],
+    "type": "event" if idx % 4 == 0 else "venue",
+    "location": {"name": "London", "address": place["formatted_address"], **place["geometry"]["location"]},
+    "external": {"source": "bench", "url": f"https://example.com/{idx}", "sourceId": place["place_id"]},
+    "roughPrice": rng.choice(PRICES),
+    "rating": place["rating"],
+    "description": f"{rng.choice(WORDS)} night with {rng.choice(WORDS)}",
+  }
+
+
+def _candidates(size: int) -> List[VenueCandidate]:
+  rng = random.Random(size)
+  return [VenueCandidate.from_dict(_candidate_fields(idx, rng)) for idx in range(size)]
+
+
+def _vibes(size: int) -> List[str]:
+  rng = random.Random(size)
+  return [f"{rng.choice(WORDS)} and {rng.choice(WORDS)} {idx}" for idx in range(size)]
+
+
+def _ideas(size: int) -> List[dict]:
+  rng = random.Random(size)
+  return [
+    {
+      "name": f"{rng.choice(WORDS).title()} session {idx}",
+      "category": rng.choice(["music", "games", "food", "outdoors", "wellness"]),
+      "description": f"A {rng.choice(WORDS)} idea with {rng.choice(WORDS)}",
+      "typical_group_size": rng.choice(["2-6", "4-12", "6-20", "10-40"]),
+      "budget": rng.choice(["Low", "Medium", "High"]),
+      "indoor_outdoor": rng.choice(["Indoor", "Outdoor", "Indoor/Outdoor"]),
+      "ideal_time": rng.choice(["Daytime", "Evening", "Any"]),
+    }
+    for idx in range(size)
+  ]
+
+
+def _case_prefilter(size: int) -> Callable[[], object]:
+  candidates = _candidates(size)
+  return lambda: _prefilter_candidates(candidates)
+
+
+def _case_select(size: int) -> Callable[[], object]:
+  pool = _prefilter_candidates(_candidates(size))
+  return lambda: _select_candidates(pool, "3", limit=16)
+
+
+def _case_google_filter(size: int) -> Callable[[], object]:
+  rng = random.Random(size)
+  items = [_place(idx, rng) for idx in range(size)]
+  provider = GooglePlacesProvider("bench-key")
+  profile = classify_intent(PREFS.vibe, PREFS.eventType)
+  return lambda: provider._collect(PREFS, "karaoke", items, profile, set(), [])
+
+
+def _case_normalize_intent(size: int) -> Callable[[], object]:
+  vibes = _vibes(size)
+
+  def run() -> None:
+    _normalize.cache_clear()
+    for vibe in vibes:
+      normalize_intent(vibe, "night out")
+
+  return run
+
+
+def _case_search_terms(size: int) -> Callable[[], object]:
+  vibes = _vibes(size)
+  return lambda: [search_terms(vibe, "night out") for vibe in vibes]
+
+
+def _case_classify_intent(size: int) -> Callable[[], object]:
+  vibes = _vibes(size)
+
+  def run() -> None:
+    classify_intent.cache_clear()
+    for vibe in vibes:
+      classify_intent(vibe, "night out")
+
+  return run
+
+
+def _case_build_prompt(size: int) -> Callable[[], object]:
+  candidates = _candidates(size)
+  return lambda: _build_prompt(PREFS, candidates)
+
+
+def _case_local_metadata(size: int) -> Callable[[], object]:
+  provider = LocalMetadataProvider()
+  # A path that doesn't exist keeps load() from replacing the synthetic ideas.
+  catalogue = IdeaCatalogue("/nonexistent/bench-ideas.json")
+  catalogue._build(_ideas(size))
+  provider.catalogue = catalogue
+  loop = asyncio.new_event_loop()
+  return lambda: loop.run_until_complete(provider.search(PREFS))
+
+
+def _case_venue_model(size: int) -> Callable[[], object]:
+  rng = random.Random(size)
+  rows = [_candidate_fields(idx, rng) for idx in range(size)]
+  return lambda: [VenueCandidate.from_dict(row) for row in rows]
+
+
+def _case_suggestion_model(size: int) -> Callable[[], object]:
+  candidates = _candidates(size)
+
+  def run() -> List[EnrichedSuggestion]:
+    return [
+      EnrichedSuggestion(
+        id=cand.id,
+        title=cand.title,
+        category=cand.category,
+        type=cand.type,
+        location=cand.location.to_model(),
+        external=cand.external.to_model(),
+        dateFitSummary="Within your time window",
+        groupFitSummary="Good for 6 people.",
+        whySuitable=cand.description,
+        roughPrice=cand.roughPrice,
+      )
+      for cand in candidates
+    ]
+
+  return run
+
+
+CASES: Dict[str, Callable[[int], Callable[[], object]]] = {
+  "prefilter": _case_prefilter,
+  "select": _case_select,
+  "google_filter": _case_google_filter,
+  "normalize_intent": _case_normalize_intent,
+  "search_terms": _case_search_terms,
+  "classify_intent": _case_classify_intent,
+  "build_prompt": _case_build_prompt,
+  "local_metadata": _case_local_metadata,
+  "venue_model": _case_venue_model,
+  "suggestion_model": _case_suggestion_model,
+}
+
+
+def _measure(run: Callable[[], object], rounds: int) -> float:
+  run()  # warm caches, imports and regexes
+  timings = []
+  for _ in range(rounds):
+    start = time.perf_counter()
+    run()
+    timings.append(time.perf_counter() - start)
+  return statistics.median(timings)
+
+
+def main(cases: List[str], sizes: List[int], rounds: int, output: str | None) -> None:
+  results = []
+  print(f"{'case':<17} {'items':>6} {'median':>11} {'per item':>10}")
+  for name in cases:
+    for size in sizes:
+      # Large sizes are slow enough that fewer rounds still give a stable median.
+      median = _measure(CASES[name](size), max(3, rounds * 100 // max(size, 100)))
+      results.append({"case": name, "items": size, "medianMs": round(median * 1000, 4)})
+      print(f"{name:<17} {size:>6} {median * 1000:>9.3f}ms {median * 1e6 / size:>8.2f}us")
+  if output:
+    with open(output, "w", encoding="utf-8") as handle:
+      json.dump({"rounds": rounds, "results": results}, handle, indent=2)
+    print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+  parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+  parser.add_argument("--rounds", type=int, default=50, help="rounds at 100 items; scaled down for larger sizes")
+  parser.add_argument("--output", help="write results as JSON to this path")
+  args = parser.parse_args()
+  logging.disable(logging.WARNING)
+  main(args.cases, args.sizes, args.rounds, args.output)
@@ -0,0 +1,75 @@
+"""Compare per-call httpx clients against the shared HttpClientPool.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.http_pool_latency --requests 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+from ai_service.benchmarks.stub_server import StubServer
+from ai_service.http_pool import HttpClientPool
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+  ordered = sorted(samples)
+  idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+  return ordered[idx]
+
+
+async def _run(url: str, total: int, concurrency: int, pool: HttpClientPool | None) -> List[float]:
+  sem = asyncio.Semaphore(concurrency)
+  samples: List[float] = []
+
+  async def one() -> None:
+    async with sem:
+      start = time.perf_counter()
+      if pool is None:
+        async with httpx.AsyncClient(timeout=8.0) as client:
+          resp = await client.get(url)
+      else:
+        resp = await pool.client_for(url).get(url, timeout=8.0)
+      resp.raise_for_status()
+      samples.append((time.perf_counter() - start) * 1000)
+
+  await asyncio.gather(*(one() for _ in range(total)))
+  return samples
+
+
+def _report(name: str, samples: List[float], connections: int) -> None:
+  print(
+    f"{name:<16} p50={statistics.median(samples):7.2f}ms p95={_percentile(samples, 95):7.2f}ms "
+    f"max={max(samples):7.2f}ms connections={connections}"
+  )
+
+
+async def main(total: int, concurrency: int, latency: float) -> None:
+  async with StubServer(latency=latency) as server:
+    url = f"{server.base_url}/maps/api/place/textsearch/json"
+
+    samples = await _run(url, total, concurrency, pool=None)
+    _report("client-per-call", samples, server.connections)
+
+    server.connections = 0
+    pool = HttpClientPool(max_connections=concurrency, max_keepalive_connections=concurrency, http2=False)
+    try:
+      await _run(url, concurrency, concurrency, pool)  # warm the pool
+      samples = await _run(url, total, concurrency, pool)
+    finally:
+      await pool.aclose()
+    _report("pooled", samples, server.connections)
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--requests", type=int, default=500)
+  parser.add_argument("--concurrency", type=int, default=20)
+  parser.add_argument("--latency", type=float, default=0.0, help="stub server latency in seconds")
+  args = parser.parse_args()
+  asyncio.run(main(args.requests, args.concurrency, args.latency))
@@ -0,0 +1,77 @@
+"""normalize_intent matching cost over a large synthetic vocabulary.
+
+Compares the old per-entry substring scan with the Aho-Corasick IntentMatcher, plus the memoized
+normalize_intent path that repeat calls within a request hit.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.intent_matcher --labels 10000
+"""
+
+import argparse
+import random
+import statistics
+import string
+import time
+
+from ai_service import intent_normalizer
+from ai_service.intent_normalizer import IntentMatcher, normalize_intent
+
+
+def _vocab(count: int, seed: int = 11) -> list:
+  rng = random.Random(seed)
+  words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))) for _ in range(count // 2)]
+  vocab = []
+  for idx in range(count):
+    label = rng.choice(words) if idx % 2 else f"{rng.choice(words)} {rng.choice(words)}"
+    vocab.append({"label": label, "tags": [f"tag-{idx}"], "categories": [f"cat-{idx % 50}"]})
+  return vocab
+
+
+def _linear(vocab: list, vibe_lower: str, type_lower: str) -> set:
+  return {
+    idx for idx, entry in enumerate(vocab)
+    if entry["label"] and (entry["label"] in vibe_lower or entry["label"] in type_lower)
+  }
+
+
+def _median_us(fn, rounds: int) -> float:
+  timings = []
+  for _ in range(rounds):
+    start = time.perf_counter()
+    fn()
+    timings.append((time.perf_counter() - start) * 1e6)
+  return statistics.median(timings)
+
+
+def main(labels: int, rounds: int) -> None:
+  vocab = _vocab(labels)
+  vibe = f"chilled {vocab[3]['label']} and {vocab[10]['label']} with friends"
+  event_type = "night out"
+
+  start = time.perf_counter()
+  matcher = IntentMatcher(vocab)
+  build_ms = (time.perf_counter() - start) * 1000
+  expected = _linear(vocab, vibe, event_type)
+  assert matcher.matches(vibe, event_type) == expected, "matcher disagrees with linear scan"
+
+  # Point normalize_intent at the synthetic vocabulary for the memoized measurement.
+  intent_normalizer._CACHE = vocab
+  intent_normalizer._MATCHER = matcher
+  intent_normalizer._normalize.cache_clear()
+  cold = _median_us(lambda: (intent_normalizer._normalize.cache_clear(), normalize_intent(vibe, event_type)), rounds)
+  warm = _median_us(lambda: normalize_intent(vibe, event_type), rounds)
+
+  print(f"{labels} labels, {len(expected)} matches; automaton built in {build_ms:.0f}ms")
+  print(f"linear scan      {_median_us(lambda: _linear(vocab, vibe, event_type), rounds):>10.1f}us")
+  print(f"aho-corasick     {_median_us(lambda: matcher.matches(vibe, event_type), rounds):>10.1f}us")
+  print(f"normalize (cold) {cold:>10.1f}us")
+  print(f"normalize (memo) {warm:>10.1f}us")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--labels", type=int, default=10000)
+  parser.add_argument("--rounds", type=int, default=200)
+  args = parser.parse_args()
+  main(args.labels, args.rounds)
@@ -0,0 +1,111 @@
+"""Tail latency of one degraded Ollama backend vs a hedged CompositeLlmClient, plus breaker behaviour.
+
+Two local Ollama stubs: the primary answers in ~50ms but stalls for --stall seconds on a few
+percent of requests; the secondary always answers in ~150ms. Sequential rankings are timed with
+the primary alone and with CompositeLlmClient(primary, secondary, hedge=True). A last scenario
+takes the primary down (HTTP 500) and shows its breaker opening so later requests skip it.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.llm_failover --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+
+from ai_service.benchmarks.llm_streaming import ANSWER
+from ai_service.benchmarks.stub_server import StubServer
+from ai_service.http_pool import HttpClientPool
+from ai_service.llm import CompositeLlmClient, OllamaLlmClient
+from ai_service.models import CandidateLocation, CandidateRef, DateRange, UserPreferences, VenueCandidate
+from ai_service.resilience import CircuitBreaker, percentile
+
+
+def _handler(latency, fail=lambda: False):
+  text = json.dumps(ANSWER)
+
+  async def handler(path: str, query: dict, body: bytes):
+    if fail():
+      return (500, {"error": "down"})
+    delay = latency()
+
+    async def chunks():
+      await asyncio.sleep(delay)
+      yield (json.dumps({"response": text, "done": False}) + "\n").encode("utf-8")
+      yield (json.dumps({"response": "", "done": True}) + "\n").encode("utf-8")
+
+    return (200, chunks())
+
+  return handler
+
+
+async def _timed(client, prefs, candidates, requests: int) -> list:
+  timings = []
+  for _ in range(requests):
+    start = time.perf_counter()
+    await client.rank_and_annotate(prefs, candidates)
+    timings.append((time.perf_counter() - start) * 1000)
+  return timings
+
+
+def _report(label: str, timings: list) -> None:
+  print(
+    f"{label:<22} p50 {percentile(timings, 50):7.0f}ms  p95 {percentile(timings, 95):7.0f}ms"
+    f"  p99 {percentile(timings, 99):7.0f}ms  max {max(timings):7.0f}ms"
+  )
+
+
+async def main(requests: int, stall: float, stall_rate: float) -> None:
+  rng = random.Random(5)
+  prefs = UserPreferences(
+    groupSize=8,
+    location="London",
+    dateRange=DateRange(mode="relative", label="this week"),
+    vibe="cocktails",
+    eventType="night out",
+  )
+  candidates = [
+    VenueCandidate(id=f"cand-{idx}", title=f"Venue {idx}", location=CandidateLocation(name="Soho"), external=CandidateRef())
+    for idx in range(8)
+  ]
+  down = {"primary": False}
+  primary_latency = lambda: stall if rng.random() < stall_rate else 0.05
+  async with StubServer(_handler(primary_latency, lambda: down["primary"])) as slow, StubServer(
+    _handler(lambda: 0.15)
+  ) as steady:
+    pool = HttpClientPool(http2=False)
+    primary = OllamaLlmClient(base_url=slow.base_url, model="primary", http_pool=pool)
+    secondary = OllamaLlmClient(base_url=steady.base_url, model="secondary", http_pool=pool)
+    try:
+      _report("primary only", await _timed(primary, prefs, candidates, requests))
+
+      breakers = [CircuitBreaker("primary", slow_seconds=None), CircuitBreaker("secondary", slow_seconds=None)]
+      hedged = CompositeLlmClient([primary, secondary], breakers=breakers, hedge=True, hedge_delay=0.5)
+      _report("hedged composite", await _timed(hedged, prefs, candidates, requests))
+      stats = hedged.breaker_stats()
+      print(f"  hedges fired: {stats['hedges']}, won by the hedge: {stats['hedgeWins']}")
+
+      down["primary"] = True
+      before = slow.requests
+      _report("primary down", await _timed(hedged, prefs, candidates, 50))
+      stats = hedged.breaker_stats()
+      print(
+        f"  primary breaker: {stats['backends']['primary']['state']}, requests reaching primary:"
+        f" {slow.requests - before}/50, failovers: {stats['failovers']}"
+      )
+    finally:
+      await pool.aclose()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--requests", type=int, default=200)
+  parser.add_argument("--stall", type=float, default=2.0, help="seconds the primary stalls for")
+  parser.add_argument("--stall-rate", type=float, default=0.03, help="fraction of primary requests that stall")
+  args = parser.parse_args()
+  logging.disable(logging.WARNING)  # the primary-down scenario would log every failover
+  asyncio.run(main(args.requests, args.stall, args.stall_rate))
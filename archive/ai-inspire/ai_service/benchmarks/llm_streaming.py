@@ -0,0 +1,111 @@
+"""Time-to-first-suggestion for streamed vs buffered Ollama ranking against a local stub.
+
+The stub streams an Ollama-format /api/generate response (one {"response": ..., "done": ...}
+JSON object per line) a few characters at a time, so the incremental parser has to cope with
+objects split across arbitrary chunk boundaries. The script exits non-zero if the streamed
+suggestions differ from the buffered ones.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.llm_streaming --chunk-delay 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from ai_service.benchmarks.stub_server import StubServer
+from ai_service.http_pool import HttpClientPool
+from ai_service.llm import OllamaLlmClient
+from ai_service.models import CandidateLocation, CandidateRef, DateRange, UserPreferences, VenueCandidate
+
+# Answers use the prompt's short ids; the client maps them back to the candidates below.
+ANSWER = {
+  "suggestions": [
+    {
+      "id": f"c{idx + 1}",
+      "recommendedFlow": "meals_drinks",
+      "dateFitSummary": "Open late all week",
+      "groupFitSummary": "Large tables for 8",
+      "whySuitable": "Lively {but} you can still \"talk\".",
+    }
+    for idx in range(5)
+  ]
+}
+
+
+def _generate_handler(chunk_size: int, chunk_delay: float):
+  text = json.dumps(ANSWER)
+
+  async def handler(path: str, query: dict, body: bytes):
+    request = json.loads(body or b"{}")
+    if not request.get("stream"):
+      await asyncio.sleep(chunk_delay * (len(text) // chunk_size))
+      return (200, {"response": text, "done": True})
+
+    async def chunks():
+      for start in range(0, len(text), chunk_size):
+        await asyncio.sleep(chunk_delay)
+        yield (json.dumps({"response": text[start:start + chunk_size], "done": False}) + "\n").encode("utf-8")
+      yield (json.dumps({"response": "", "done": True}) + "\n").encode("utf-8")
+
+    return (200, chunks())
+
+  return handler
+
+
+async def main(chunk_size: int, chunk_delay: float) -> int:
+  prefs = UserPreferences(
+    groupSize=8,
+    location="London",
+    dateRange=DateRange(mode="relative", label="this week"),
+    vibe="cocktails",
+    eventType="night out",
+  )
+  candidates = [
+    VenueCandidate(
+      id=f"cand-{idx}",
+      title=f"Venue {idx} {{with braces}}",
+      location=CandidateLocation(name="Soho", address=f"{idx} Dean St, London"),
+      external=CandidateRef(source="google_places", url=f"https://example.com/{idx}"),
+    )
+    for idx in range(8)
+  ]
+
+  async with StubServer(_generate_handler(chunk_size, chunk_delay)) as server:
+    pool = HttpClientPool(http2=False)
+    client = OllamaLlmClient(base_url=server.base_url, model="stub", http_pool=pool)
+    try:
+      start = time.perf_counter()
+      buffered = await client.rank_and_annotate(prefs, candidates)
+      buffered_ms = (time.perf_counter() - start) * 1000
+
+      start = time.perf_counter()
+      arrivals = []
+      streamed = []
+      async for suggestion in client.stream_rank_and_annotate(prefs, candidates):
+        arrivals.append((time.perf_counter() - start) * 1000)
+        streamed.append(suggestion)
+    finally:
+      await pool.aclose()
+
+  print(f"buffered: {len(buffered)} suggestions after {buffered_ms:.0f}ms")
+  print(f"streamed: {len(streamed)} suggestions, first after {arrivals[0]:.0f}ms, last after {arrivals[-1]:.0f}ms")
+  print("arrivals (ms):", ", ".join(f"{ms:.0f}" for ms in arrivals))
+  if [s.model_dump() for s in streamed] != [s.model_dump() for s in buffered]:
+    print("MISMATCH: streamed suggestions differ from buffered parse", file=sys.stderr)
+    return 1
+  if [s.id for s in streamed] != [c.id for c in candidates[:5]]:
+    print("MISMATCH: short ids were not mapped back to candidate ids", file=sys.stderr)
+    return 1
+  return 0
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--chunk-size", type=int, default=7, help="characters per streamed chunk")
+  parser.add_argument("--chunk-delay", type=float, default=0.005, help="seconds between chunks")
+  args = parser.parse_args()
+  sys.exit(asyncio.run(main(args.chunk_size, args.chunk_delay)))
@@ -0,0 +1,261 @@
+"""Throughput and latency of /suggest-events under load, against mock upstreams.
+
+Starts MockUpstreams (Google Places, Eventbrite, Meetup, Facebook Graph, Google Geocoding and
+Ollama) in this process and the FastAPI app under uvicorn in a subprocess pointed at them. Each
+concurrency level runs closed-loop workers for --duration seconds and reports RPS, p50/p95/p99
+latency, errors, upstream calls per request and the server's resident memory. Payloads cycle
+through --distinct variants, so a small value measures the cached path and a large one the cold path.
+
+Results are written as JSON (--output); --compare prints the change against an earlier run.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.load_test --concurrency 1 5 10 25 50 --duration 5 \\
+    --upstream-latency ollama=800,2500 --upstream-errors facebook=0.1 --output load.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from ai_service.benchmarks.mock_upstreams import UPSTREAMS, MockUpstreams, UpstreamProfile
+from ai_service.resilience import percentile
+
+SERVICE_DIR = Path(__file__).resolve().parents[2]
+VIBES = ("live music", "karaoke", "board games", "comedy", "dinner", "pub quiz")
+
+# Client-side limits protect real API keys; against mocks they would only measure the limiter.
+UNLIMITED_ENV = {
+  "PROVIDER_RATE_LIMITS": ",".join(
+    f"{name}=0" for name in ("GooglePlacesProvider", "EventbriteProvider", "MeetupProvider", "FacebookEventsProvider")
+  ),
+  "PROVIDER_DAILY_QUOTAS": "FacebookEventsProvider=0",
+}
+
+
+def _profiles(args) -> Dict[str, UpstreamProfile]:
+  profiles = {name: UpstreamProfile(args.latency_median, args.latency_p99, args.error_rate) for name in UPSTREAMS}
+  for part in args.upstream_latency:
+    name, _, value = part.partition("=")
+    median, _, p99 = value.partition(",")
+    profiles[name].median_ms = float(median)
+    profiles[name].p99_ms = float(p99 or median)
+  for part in args.upstream_errors:
+    name, _, value = part.partition("=")
+    profiles[name].error_rate = float(value)
+  return profiles
+
+
+def _payload(idx: int, distinct: int) -> dict:
+  variant = idx % distinct
+  return {
+    "groupSize": 4 + variant % 6,
+    "location": f"Testville {variant}",
+    "dateRange": {"mode": "relative", "label": "next weekend"},
+    "vibe": VIBES[variant % len(VIBES)],
+    "eventType": "night out",
+  }
+
+
+def _free_port() -> int:
+  with socket.socket() as sock:
+    sock.bind(("127.0.0.1", 0))
+    return sock.getsockname()[1]
+
+
+def _memory_kb(pid: int) -> Dict[str, int | None]:
+  """Current and peak RSS of the server process (Linux /proc; None elsewhere)."""
+  fields = {"VmRSS:": "rssKb", "VmHWM:": "peakRssKb"}
+  result: Dict[str, int | None] = {"rssKb": None, "peakRssKb": None}
+  try:
+    with open(f"/proc/{pid}/status", encoding="ascii") as status:
+      for line in status:
+        key, *value = line.split()
+        if key in fields:
+          result[fields[key]] = int(value[0])
+  except OSError:
+    pass
+  return result
+
+
+def _git_commit() -> str | None:
+  try:
+    out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SERVICE_DIR, capture_output=True, text=True)
+  except OSError:
+    return None
+  return out.stdout.strip() or None
+
+
+async def _wait_healthy(client: httpx.AsyncClient, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+  deadline = time.monotonic() + timeout
+  while time.monotonic() < deadline:
+    if proc.poll() is not None:
+      raise RuntimeError(f"service exited with code {proc.returncode}")
+    try:
+      if (await client.get("/health")).status_code == 200:
+        return
+    except httpx.TransportError:
+      pass
+    await asyncio.sleep(0.2)
+  raise RuntimeError("service did not become healthy")
+
+
+async def _level(
+  client: httpx.AsyncClient, mocks: MockUpstreams, proc: subprocess.Popen, concurrency: int, args, counter
+) -> dict:
+  latencies: List[float] = []
+  statuses: Dict[int, int] = {}
+  calls_before = mocks.calls()
+  deadline = time.perf_counter() + args.duration
+
+  async def worker() -> None:
+    while time.perf_counter() < deadline:
+      payload = _payload(next(counter), args.distinct)
+      start = time.perf_counter()
+      try:
+        resp = await client.post("/suggest-events", json=payload)
+        status = resp.status_code
+      except httpx.HTTPError:
+        status = 0
+      latencies.append(time.perf_counter() - start)
+      statuses[status] = statuses.get(status, 0) + 1
+
+  started = time.perf_counter()
+  await asyncio.gather(*(worker() for _ in range(concurrency)))
+  elapsed = time.perf_counter() - started
+  completed = len(latencies)
+  calls = {name: count - calls_before[name] for name, count in mocks.calls().items()}
+
+  def ms(pct: float) -> float | None:
+    value = percentile(latencies, pct)
+    return round(value * 1000, 1) if value is not None else None
+
+  return {
+    "concurrency": concurrency,
+    "requests": completed,
+    "rps": round(completed / elapsed, 2) if elapsed else 0.0,
+    "p50Ms": ms(50),
+    "p95Ms": ms(95),
+    "p99Ms": ms(99),
+    "errors": completed - statuses.get(200, 0),
+    "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    "upstreamCalls": calls,
+    "upstreamCallsPerRequest": round(sum(calls.values()) / completed, 2) if completed else None,
+    **_memory_kb(proc.pid),
+  }
+
+
+def _print_level(result: dict) -> None:
+  print(
+    f"{result['concurrency']:>5} {result['requests']:>7} {result['rps']:>8.1f} {result['p50Ms']:>8} "
+    f"{result['p95Ms']:>8} {result['p99Ms']:>8} {result['errors']:>6} {result['upstreamCallsPerRequest']:>9} "
+    f"{(result['rssKb'] or 0) / 1024:>8.1f}"
+  )
+
+
+def _compare(results: dict, baseline_path: str) -> None:
+  with open(baseline_path, encoding="utf-8") as handle:
+    baseline = {level["concurrency"]: level for level in json.load(handle)["levels"]}
+  print(f"\nvs {baseline_path}:")
+  for level in results["levels"]:
+    before = baseline.get(level["concurrency"])
+    if before is None:
+      continue
+    deltas = []
+    for key in ("rps", "p50Ms", "p95Ms", "p99Ms", "rssKb"):
+      if before.get(key) and level.get(key) is not None:
+        deltas.append(f"{key} {(level[key] - before[key]) / before[key] * 100:+.1f}%")
+    print(f"  c={level['concurrency']}: " + ", ".join(deltas))
+
+
+async def main(args) -> dict:
+  port = _free_port()
+  log = tempfile.NamedTemporaryFile(prefix="ai-inspire-load-", suffix=".log", delete=False)
+  async with MockUpstreams(_profiles(args), seed=args.seed) as mocks:
+    env = {**os.environ, **mocks.env(), **({} if args.keep_rate_limits else UNLIMITED_ENV)}
+    proc = subprocess.Popen(
+      [sys.executable, "-m", "uvicorn", "ai_service.main:app", "--port", str(port), "--log-level", "warning"],
+      cwd=SERVICE_DIR,
+      env=env,
+      stdout=log,
+      stderr=subprocess.STDOUT,
+    )
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    try:
+      async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60.0, limits=limits) as client:
+        await _wait_healthy(client, proc)
+        counter = itertools.count()
+        levels = []
+        print(
+          f"{'conc':>5} {'reqs':>7} {'rps':>8} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} {'errors':>6}"
+          f" {'calls/req':>9} {'rssMB':>8}"
+        )
+        for concurrency in args.concurrency:
+          result = await _level(client, mocks, proc, concurrency, args, counter)
+          levels.append(result)
+          _print_level(result)
+    except Exception:
+      print(f"service log: {log.name}", file=sys.stderr)
+      raise
+    finally:
+      proc.terminate()
+      try:
+        proc.wait(timeout=10)
+      except subprocess.TimeoutExpired:
+        proc.kill()
+      log.close()
+    os.unlink(log.name)
+  return {
+    "commit": _git_commit(),
+    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    "python": platform.python_version(),
+    "config": {
+      "duration": args.duration,
+      "distinct": args.distinct,
+      "seed": args.seed,
+      "rateLimits": args.keep_rate_limits,
+      "upstreams": {name: vars(profile) for name, profile in mocks.profiles.items()},
+    },
+    "levels": levels,
+    "upstreamErrors": mocks.errors,
+  }
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+  parser.add_argument("--duration", type=float, default=5.0, help="seconds per concurrency level")
+  parser.add_argument("--distinct", type=int, default=100_000, help="distinct request payloads to cycle through")
+  parser.add_argument("--latency-median", type=float, default=60.0, help="default upstream median latency (ms)")
+  parser.add_argument("--latency-p99", type=float, default=300.0, help="default upstream p99 latency (ms)")
+  parser.add_argument("--error-rate", type=float, default=0.0, help="default upstream 503 rate")
+  parser.add_argument(
+    "--upstream-latency", nargs="*", default=[], metavar="NAME=MEDIAN,P99", help=f"per upstream: {', '.join(UPSTREAMS)}"
+  )
+  parser.add_argument("--upstream-errors", nargs="*", default=[], metavar="NAME=RATE")
+  parser.add_argument("--keep-rate-limits", action="store_true", help="keep the providers' client-side rate limits")
+  parser.add_argument("--seed", type=int, default=7)
+  parser.add_argument("--output", help="write results as JSON to this path")
+  parser.add_argument("--compare", help="earlier --output file to diff against")
+  args = parser.parse_args()
+  logging.disable(logging.WARNING)
+  results = asyncio.run(main(args))
+  if args.output:
+    with open(args.output, "w", encoding="utf-8") as handle:
+      json.dump(results, handle, indent=2)
+    print(f"wrote {args.output}")
+  if args.compare:
+    _compare(results, args.compare)
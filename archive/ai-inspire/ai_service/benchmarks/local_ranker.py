@@ -0,0 +1,66 @@
+"""Local ranker throughput: time to score and order N synthetic candidates.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.local_ranker --sizes 100 500 1000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from ai_service.models import CandidateLocation, CandidateRef, DateRange, UserPreferences, VenueCandidate
+from ai_service.ranking import rank_candidates
+
+CATEGORIES = ["bar", "restaurant", "night_club", "bowling_alley", "museum", "park", "event", "karaoke"]
+PRICES = [None, "Free", "£", "££", "£££"]
+
+
+def _candidates(count: int, seed: int = 7) -> list:
+  rng = random.Random(seed)
+  return [
+    VenueCandidate(
+      id=f"cand-{idx}",
+      title=f"{rng.choice(['The', 'Old', 'New'])} {rng.choice(CATEGORIES).replace('_', ' ')} {idx}",
+      category=rng.choice(CATEGORIES),
+      type="event" if idx % 4 == 0 else "venue",
+      location=CandidateLocation(
+        name="London", lat=51.5 + rng.uniform(-0.1, 0.1), lng=-0.12 + rng.uniform(-0.15, 0.15)
+      ),
+      external=CandidateRef(source="bench", sourceId=f"cand-{idx}"),
+      roughPrice=rng.choice(PRICES),
+      rating=round(rng.uniform(3.0, 5.0), 1) if idx % 3 else None,
+      startTime=f"2026-10-{rng.randint(1, 28):02d}T19:00:00Z" if idx % 4 == 0 else None,
+    )
+    for idx in range(count)
+  ]
+
+
+def main(sizes, rounds: int) -> None:
+  prefs = UserPreferences(
+    groupSize=6,
+    location="London",
+    dateRange=DateRange(mode="relative", label="this month"),
+    vibe="karaoke and cocktails",
+    eventType="night out",
+    budgetLevel="Medium",
+  )
+  print(f"{'candidates':>10} {'median':>10} {'per item':>10}")
+  for size in sizes:
+    candidates = _candidates(size)
+    timings = []
+    for _ in range(rounds):
+      start = time.perf_counter()
+      rank_candidates(prefs, candidates, (51.5074, -0.1278), limit=5)
+      timings.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(timings)
+    print(f"{size:>10} {median:>8.3f}ms {median * 1000 / size:>8.2f}us")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500, 1000])
+  parser.add_argument("--rounds", type=int, default=50)
+  args = parser.parse_args()
+  main(args.sizes, args.rounds)
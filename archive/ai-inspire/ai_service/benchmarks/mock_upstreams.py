@@ -0,0 +1,217 @@
+"""Local stand-ins for every upstream the service calls, with configurable latency and error rates.
+
+Each upstream gets its own StubServer. Latency is log-normal, fitted to a median and a p99, and
+each request fails with a 503 at the upstream's error rate. env() returns the variables that point
+a service process at the mocks.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from dataclasses import dataclass
+from typing import Dict
+
+from ai_service.benchmarks.stub_server import StubServer
+
+UPSTREAMS = ("google", "eventbrite", "meetup", "facebook", "geocode", "ollama")
+
+# z-score of the 99th percentile of a standard normal.
+_Z99 = 2.326
+
+
+@dataclass
+class UpstreamProfile:
+  median_ms: float = 60.0
+  p99_ms: float = 300.0
+  error_rate: float = 0.0
+
+  def latency(self, rng: random.Random) -> float:
+    """Seconds for one response, drawn from a log-normal with this median and p99."""
+    if self.median_ms <= 0:
+      return 0.0
+    sigma = math.log(max(self.p99_ms, self.median_ms) / self.median_ms) / _Z99
+    return rng.lognormvariate(math.log(self.median_ms), sigma) / 1000.0
+
+
+def _seed(*parts: object) -> int:
+  return int(hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _google(query: dict) -> dict:
+  text = (query.get("query") or [""])[0]
+  base = _seed("google", text)
+  return {
+    "status": "OK",
+    "results": [
+      {
+        "place_id": f"gp-{base}-{idx}",
+        "name": f"{text.title()} spot {idx}",
+        "types": ["bar", "establishment"],
+        "formatted_address": f"{idx} High Street",
+        "geometry": {"location": {"lat": 51.5 + idx / 1000, "lng": -0.12}},
+        "rating": 3.5 + (idx % 3) / 2,
+        "price_level": idx % 4,
+        "business_status": "OPERATIONAL",
+      }
+      for idx in range(20)
+    ],
+  }
+
+
+def _eventbrite(query: dict) -> dict:
+  base = _seed("eventbrite", query.get("location.address"), query.get("q"))
+  return {
+    "events": [
+      {
+        "id": f"eb-{base}-{idx}",
+        "name": {"text": f"Live night {idx}"},
+        "summary": "Music, drinks and a friendly crowd",
+        "url": f"https://example.com/eventbrite/{base}-{idx}",
+        "start": {"utc": "2030-01-01T19:00:00Z"},
+        "venue": {"name": "The Crown", "address": {"city": "Testville"}},
+      }
+      for idx in range(20)
+    ]
+  }
+
+
+def _meetup(query: dict) -> dict:
+  base = _seed("meetup", query.get("text"), query.get("lat"))
+  return {
+    "events": [
+      {
+        "id": f"mu-{base}-{idx}",
+        "name": f"Social meetup {idx}",
+        "plain_text_no_images_description": "Meet new people over a pint",
+        "link": f"https://example.com/meetup/{base}-{idx}",
+        "time": 1893456000000 + idx * 3600000,
+        "venue": {"name": "Community Hall", "city": "Testville", "lat": 51.5, "lon": -0.12},
+        "fee": {"amount": 0},
+      }
+      for idx in range(15)
+    ]
+  }
+
+
+def _facebook(query: dict) -> dict:
+  base = _seed("facebook", query.get("q"), query.get("center"))
+  return {
+    "data": [
+      {
+        "id": f"fb-{base}-{idx}",
+        "name": f"Party night {idx}",
+        "description": "Dancing until late",
+        "category": "party",
+        "start_time": "2030-01-01T21:00:00+0000",
+        "place": {"name": "Club", "location": {"city": "Testville", "latitude": 51.5, "longitude": -0.12}},
+      }
+      for idx in range(10)
+    ]
+  }
+
+
+def _geocode(query: dict) -> dict:
+  seed = _seed("geocode", query.get("address"))
+  return {
+    "status": "OK",
+    "results": [{"geometry": {"location": {"lat": 50 + (seed % 400) / 100, "lng": -3 + (seed % 500) / 100}}}],
+  }
+
+
+def _ollama_answer(prompt: str) -> str:
+  ids = list(dict.fromkeys(re.findall(r'"id":\s*"(c\d+)"', prompt)))[:5]
+  return json.dumps(
+    {
+      "suggestions": [
+        {
+          "id": short_id,
+          "recommendedFlow": "general",
+          "dateFitSummary": "On during your dates",
+          "groupFitSummary": "Room for the whole group",
+          "whySuitable": "Matches the vibe you asked for.",
+        }
+        for short_id in ids
+      ]
+    }
+  )
+
+
+class MockUpstreams:
+  """Starts one stub server per upstream; use as an async context manager."""
+
+  def __init__(self, profiles: Dict[str, UpstreamProfile], seed: int = 7) -> None:
+    self.profiles = {name: profiles.get(name, UpstreamProfile()) for name in UPSTREAMS}
+    self.rng = random.Random(seed)
+    self.servers: Dict[str, StubServer] = {}
+    self.errors: Dict[str, int] = {name: 0 for name in UPSTREAMS}
+
+  def _handler(self, name: str):
+    profile = self.profiles[name]
+
+    async def handler(path: str, query: dict, body: bytes):
+      delay = profile.latency(self.rng)
+      if self.rng.random() < profile.error_rate:
+        await asyncio.sleep(delay)
+        self.errors[name] += 1
+        return (503, {"error": f"mock {name} unavailable"})
+      if name != "ollama":
+        await asyncio.sleep(delay)
+        return (200, _RESPONDERS[name](query))
+      request = json.loads(body or b"{}")
+      text = _ollama_answer(request.get("prompt") or "")
+      if not request.get("stream"):
+        await asyncio.sleep(delay)
+        return (200, {"response": text, "done": True})
+
+      async def chunks():
+        # Spread generation time over ~20 chunks, like tokens arriving from the model.
+        size = max(1, len(text) // 20)
+        for start in range(0, len(text), size):
+          await asyncio.sleep(delay / 20)
+          yield (json.dumps({"response": text[start:start + size], "done": False}) + "\n").encode("utf-8")
+        yield (json.dumps({"response": "", "done": True}) + "\n").encode("utf-8")
+
+      return (200, chunks())
+
+    return handler
+
+  async def __aenter__(self) -> "MockUpstreams":
+    for name in UPSTREAMS:
+      self.servers[name] = await StubServer(self._handler(name)).start()
+    return self
+
+  async def __aexit__(self, *exc) -> None:
+    for server in self.servers.values():
+      await server.stop()
+
+  def calls(self) -> Dict[str, int]:
+    return {name: server.requests for name, server in self.servers.items()}
+
+  def env(self) -> Dict[str, str]:
+    """Environment that points the service (and its credentials checks) at these mocks."""
+    base = {name: server.base_url for name, server in self.servers.items()}
+    return {
+      "GOOGLE_PLACES_API_KEY": "mock-google-key",
+      "EVENTBRITE_API_KEY": "mock-eventbrite-key",
+      "MEETUP_API_KEY": "mock-meetup-key",
+      "FACEBOOK_GRAPH_API_TOKEN": "mock-facebook-token",
+      "GOOGLE_PLACES_URL": f"{base['google']}/maps/api/place/textsearch/json",
+      "EVENTBRITE_URL": f"{base['eventbrite']}/v3/events/search/",
+      "MEETUP_URL": f"{base['meetup']}/find/upcoming_events",
+      "FACEBOOK_GRAPH_URL": f"{base['facebook']}/v20.0/search",
+      "GEOCODE_URL": f"{base['geocode']}/maps/api/geocode/json",
+      "AI_BACKEND": "ollama",
+      "OLLAMA_HOST": base["ollama"],
+    }
+
+
+_RESPONDERS = {
+  "google": _google,
+  "eventbrite": _eventbrite,
+  "meetup": _meetup,
+  "facebook": _facebook,
+  "geocode": _geocode,
+}
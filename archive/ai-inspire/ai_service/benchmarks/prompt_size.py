@@ -0,0 +1,127 @@
+"""Ranking prompt size before and after compaction, in estimated tokens.
+
+The "before" builder is the original _build_prompt, kept here verbatim for comparison: full ids,
+urls, null fields, untruncated descriptions and twelve category hints regardless of intent.
+Meetup/Eventbrite descriptions are often several kilobytes, which is what the fixture mimics.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.prompt_size --budgets 600 900 1200
+"""
+
+import argparse
+import json
+import random
+
+from ai_service.catalogue import get_catalogue
+from ai_service.intent_normalizer import normalize_intent
+from ai_service.llm.prompt import build_prompt, estimate_tokens
+from ai_service.models import CandidateLocation, CandidateRef, DateRange, UserPreferences, VenueCandidate
+
+WORDS = "join us for a friendly evening of games food drinks and conversation with local hosts all welcome".split()
+
+
+def _candidates(count: int, seed: int = 3) -> list:
+  rng = random.Random(seed)
+  candidates = []
+  for idx in range(count):
+    long_text = idx % 2 == 0
+    words = rng.randint(300, 700) if long_text else rng.randint(10, 30)
+    candidates.append(
+      VenueCandidate(
+        id=f"meetup-{rng.randint(10**8, 10**9)}" if long_text else f"ChIJ{rng.getrandbits(96):x}",
+        title=f"Karaoke social {idx}",
+        category="event" if long_text else "karaoke",
+        type="event" if long_text else "venue",
+        location=CandidateLocation(name="Soho", address=f"{idx} Dean St, London W1D", lat=51.51, lng=-0.13),
+        external=CandidateRef(
+          source="meetup" if long_text else "google_places",
+          url=f"https://www.meetup.com/london-socials/events/{idx}/" if long_text else None,
+          sourceId=str(idx),
+        ),
+        roughPrice=None if long_text else "££",
+        rating=None if long_text else 4.4,
+        description=" ".join(rng.choice(WORDS) for _ in range(words)),
+        startTime="2026-10-23T19:00:00Z" if long_text else None,
+      )
+    )
+  return candidates
+
+
+def _legacy_prompt(prefs: UserPreferences, raw_results: list) -> str:
+  catalogue = get_catalogue()
+  ideas = [idea for _score, idea in catalogue.select(prefs, 12, require_match=False)]
+  merged = [idea.get("name") for idea in ideas] + [idea.get("category") for idea in ideas]
+  category_hints = ", ".join(dict.fromkeys(item for item in merged if item))
+  normalized = normalize_intent(prefs.vibe, prefs.eventType)
+  candidates_json = [
+    {
+      "id": c.id,
+      "title": c.title,
+      "category": c.category,
+      "type": c.type,
+      "location": {"name": c.location.name, "address": c.location.address},
+      "external": {"source": c.external.source, "url": c.external.url},
+      "price": c.roughPrice,
+      "rating": c.rating,
+      "description": c.description,
+      "startTime": c.startTime,
+    }
+    for c in raw_results[:8]
+  ]
+  return f"""
+You are helping people plan group events. Rank the supplied venue/event candidates and respond with JSON only.
+User preferences:
+- group size: {prefs.groupSize}
+- location: {prefs.location}
+- dates: {prefs.dateRange.label or (prefs.dateRange.startDate or '') + ' to ' + (prefs.dateRange.endDate or '')}
+- vibe: {prefs.vibe}
+- event type: {prefs.eventType}
+- budget: {prefs.budgetLevel or 'unknown'}
+- accessibility: step free needed = {prefs.accessibility.needsStepFree}
+Normalized intent hints: categories={normalized.get("categories")} tags={normalized.get("tags")}
+Category hints (use to improve matching): {category_hints}
+
+Candidate options (JSON):
+{json.dumps(candidates_json, ensure_ascii=False)}
+
+Return a JSON object with a single key "suggestions": a list of up to 5 entries. Each entry must include:
+- id (from candidate)
+- title
+- category
+- type ("venue" or "event")
+- recommendedFlow ("meals_drinks", "trip", or "general")
+- location: name and address if known
+- external: source and url
+- dateFitSummary
+- groupFitSummary
+- whySuitable
+- roughPrice
+Respond with valid JSON only and nothing else.
+""".strip()
+
+
+def main(budgets, count: int) -> None:
+  prefs = UserPreferences(
+    groupSize=6,
+    location="London",
+    dateRange=DateRange(mode="relative", label="next weekend"),
+    vibe="karaoke and cocktails",
+    eventType="night out",
+    budgetLevel="Medium",
+  )
+  candidates = _candidates(count)
+  before = estimate_tokens(_legacy_prompt(prefs, candidates))
+  print(f"{'budget':>8} {'before':>8} {'after':>8} {'saved':>7} {'kept':>5}")
+  for budget in budgets:
+    prompt = build_prompt(prefs, candidates, budget=budget)
+    saved = 100 * (1 - prompt.tokens / before)
+    print(f"{budget:>8} {before:>8} {prompt.tokens:>8} {saved:>6.0f}% {len(prompt.candidates):>5}")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--budgets", type=int, nargs="+", default=[600, 900, 1200, 4000])
+  parser.add_argument("--candidates", type=int, default=8)
+  args = parser.parse_args()
+  main(args.budgets, args.candidates)
@@ -0,0 +1,84 @@
+"""Provider calls against a dead, a flaky and a throttling upstream, through the resilience layer.
+
+EventbriteProvider is pointed at a local stub. For each scenario the script makes sequential
+searches and reports how many reached the stub, how many were retried or refused by the retry
+budget, and how long searches took once the breaker had opened.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.provider_resilience --requests 100
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+
+from ai_service.benchmarks.stub_server import StubServer
+from ai_service.context import SearchContext
+from ai_service.http_pool import HttpClientPool
+from ai_service.models import DateRange, UserPreferences
+from ai_service.providers import EventbriteProvider
+from ai_service.resilience import CircuitOpenError
+
+
+def _handler(status):
+  async def handler(path: str, query: dict, body: bytes):
+    code = status()
+    if code == 200:
+      return (200, {"events": []})
+    return (code, {"error": "unavailable"})
+
+  return handler
+
+
+async def _scenario(label: str, status, requests: int, pool: HttpClientPool, prefs: UserPreferences) -> None:
+  async with StubServer(_handler(status)) as server:
+    provider = EventbriteProvider(f"bench-{label}", http_pool=pool)
+    provider.base_url = f"{server.base_url}/v3/events/search/"
+    provider.rate_per_second = None  # isolate the breaker from the client-side rate limiter
+    context = SearchContext.for_request(prefs)
+    open_timings = []
+    errors = 0
+    for _ in range(requests):
+      start = time.perf_counter()
+      try:
+        await provider.search(prefs, context)
+      except CircuitOpenError:
+        open_timings.append((time.perf_counter() - start) * 1e6)
+      except Exception:
+        errors += 1
+    stats = provider.upstream_stats()
+    short = f", short-circuit median {statistics.median(open_timings):.0f}us" if open_timings else ""
+    print(
+      f"{label:<12} searches {requests}, upstream hits {server.requests}, retries {stats['retries']},"
+      f" retries denied {stats['retriesDenied']}, breaker {stats['state']} (opened {stats['opened']}x){short}"
+    )
+
+
+async def main(requests: int) -> None:
+  rng = random.Random(11)
+  prefs = UserPreferences(
+    groupSize=6,
+    location="London",
+    dateRange=DateRange(mode="relative", label="this week"),
+    vibe="live music",
+    eventType="night out",
+  )
+  pool = HttpClientPool(http2=False)
+  try:
+    await _scenario("dead", lambda: 503, requests, pool, prefs)
+    await _scenario("flaky 20%", lambda: 503 if rng.random() < 0.2 else 200, requests, pool, prefs)
+    await _scenario("throttled", lambda: 429, requests, pool, prefs)
+  finally:
+    await pool.aclose()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--requests", type=int, default=100)
+  args = parser.parse_args()
+  logging.disable(logging.WARNING)
+  asyncio.run(main(args.requests))
@@ -0,0 +1,97 @@
+"""Google Places under a refresh spike, with and without the client-side rate limiter (fake clock).
+
+Requests arrive --per-second at a time for --seconds, all with refreshToken=3 (six text-search
+queries each). GooglePlacesProvider talks to an in-process mock transport and the limiter runs on
+a fake clock, so the simulation is instant and deterministic. It reports calls sent to Google in
+the busiest second and how many searches were shrunk or refused.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.rate_limiter --per-second 20 --seconds 5
+"""
+
+import argparse
+import asyncio
+import logging
+from collections import Counter
+
+import httpx
+
+from ai_service.context import SearchContext
+from ai_service.models import DateRange, UserPreferences
+from ai_service.providers import GooglePlacesProvider
+from ai_service.rate_limit import DailyQuota, RateLimitedError, RateLimiter, TokenBucket
+
+
+# refreshToken=3 widens a search to 3 + 3 text-search queries.
+QUERIES_PER_SEARCH = 6
+
+
+class FakeClock:
+  def __init__(self, start: float = 1_800_000_000.0) -> None:
+    self.now = start
+
+  def __call__(self) -> float:
+    return self.now
+
+  async def sleep(self, seconds: float) -> None:
+    self.now += seconds
+
+
+async def _run(limited: bool, per_second: int, seconds: int, rate: float, burst: float) -> None:
+  clock = FakeClock()
+  sent: Counter = Counter()
+
+  def handler(request: httpx.Request) -> httpx.Response:
+    sent[int(clock.now)] += 1
+    return httpx.Response(200, json={"results": [{"place_id": f"p{sum(sent.values())}", "name": "Bar"}]})
+
+  client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+  provider = GooglePlacesProvider("bench-key", concurrency=7)
+  provider._client = lambda url: client
+  bucket = TokenBucket(rate, burst, clock=clock, sleep=clock.sleep) if limited else None
+  provider._limiter = RateLimiter("GooglePlacesProvider", bucket, DailyQuota(None, clock=clock))
+  prefs = UserPreferences(
+    groupSize=6,
+    location="London",
+    dateRange=DateRange(mode="relative", label="this week"),
+    vibe="karaoke",
+    eventType="night out",
+    refreshToken="3",
+  )
+  context = SearchContext.for_request(prefs)
+  shrunk = refused = 0
+  try:
+    for _second in range(seconds):
+      for _ in range(per_second):
+        before = sum(sent.values())
+        try:
+          await provider.search(prefs, context)
+        except RateLimitedError:
+          refused += 1
+        if sum(sent.values()) - before < QUERIES_PER_SEARCH:
+          shrunk += 1
+        clock.now += 1.0 / per_second
+  finally:
+    await client.aclose()
+  label = f"limited {rate:g}/s" if limited else "unlimited"
+  print(
+    f"{label:<16} calls {sum(sent.values()):>5}  busiest second {max(sent.values()):>4}"
+    f"  searches shrunk {shrunk:>4}  refused {refused:>4}"
+  )
+
+
+def main(per_second: int, seconds: int, rate: float, burst: float) -> None:
+  logging.disable(logging.WARNING)
+  asyncio.run(_run(False, per_second, seconds, rate, burst))
+  asyncio.run(_run(True, per_second, seconds, rate, burst))
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--per-second", type=int, default=20, help="search requests arriving per second")
+  parser.add_argument("--seconds", type=int, default=5)
+  parser.add_argument("--rate", type=float, default=10.0, help="limiter tokens per second")
+  parser.add_argument("--burst", type=float, default=20.0)
+  args = parser.parse_args()
+  main(args.per_second, args.seconds, args.rate, args.burst)
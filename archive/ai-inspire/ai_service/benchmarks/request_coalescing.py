@@ -0,0 +1,113 @@
+"""Upstream calls for N identical concurrent /suggest-events requests, with and without coalescing.
+
+The app runs in-process behind httpx's ASGI transport with one slow counting provider and a
+counting local ranker. Each concurrency level fires N identical requests at once (caches cleared
+between levels) and reports provider and ranker calls. "pipeline" calls run_suggestions directly,
+bypassing the endpoint's single-flight, to show what the same burst cost before.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.request_coalescing --concurrency 1 10 50 100
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+
+from ai_service.cache import SingleFlight, TtlLruCache
+from ai_service.llm import LocalRankerClient
+from ai_service.main import app
+from ai_service.models import CandidateLocation, CandidateRef, UserPreferences, VenueCandidate
+from ai_service.pipeline import ResponseCaches, run_suggestions
+from ai_service.providers import VenueProvider
+from ai_service.registry import ServiceRegistry
+
+BODY = {
+  "groupSize": 8,
+  "location": "Brighton",
+  "dateRange": {"mode": "relative", "label": "next weekend"},
+  "vibe": "karaoke",
+  "eventType": "night out",
+}
+
+
+class CountingProvider(VenueProvider):
+  cache_ttl = 0.0
+
+  def __init__(self, delay: float) -> None:
+    self.delay = delay
+    self.calls = 0
+
+  async def search(self, prefs, context=None):
+    self.calls += 1
+    await asyncio.sleep(self.delay)
+    return [
+      VenueCandidate(
+        id=f"venue-{idx}",
+        title=f"Karaoke bar {idx}",
+        category="bar",
+        location=CandidateLocation(name="Brighton"),
+        external=CandidateRef(source="bench", sourceId=f"venue-{idx}"),
+      )
+      for idx in range(20)
+    ]
+
+
+class CountingRanker(LocalRankerClient):
+  def __init__(self, delay: float) -> None:
+    super().__init__(None)
+    self.delay = delay
+    self.calls = 0
+
+  async def rank(self, user_query, raw_results):
+    self.calls += 1
+    await asyncio.sleep(self.delay)
+    return await super().rank(user_query, raw_results)
+
+
+def _caches() -> ResponseCaches:
+  return ResponseCaches(candidate_pool=TtlLruCache(), response=TtlLruCache())
+
+
+async def _level(mode: str, concurrency: int, delay: float) -> None:
+  provider = CountingProvider(delay)
+  ranker = CountingRanker(delay)
+  registry = ServiceRegistry(providers=[provider], llm=ranker)
+  app.state.registry = registry
+  app.state.response_caches = _caches()
+  app.state.suggest_flight = SingleFlight()
+  start = time.perf_counter()
+  if mode == "endpoint":
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+      responses = await asyncio.gather(*(client.post("/suggest-events", json=BODY) for _ in range(concurrency)))
+    ok = sum(1 for resp in responses if resp.status_code == 200 and resp.json()["suggestions"])
+  else:
+    prefs = UserPreferences(**BODY)
+    caches = app.state.response_caches
+    results = await asyncio.gather(*(run_suggestions(prefs, registry, caches) for _ in range(concurrency)))
+    ok = sum(1 for result in results if result.suggestions)
+  elapsed = (time.perf_counter() - start) * 1000
+  print(
+    f"{mode:<9} {concurrency:>6} {provider.calls:>10} {ranker.calls:>8} {ok:>6} {elapsed:>9.0f}ms"
+    f" {app.state.suggest_flight.coalesced:>10}"
+  )
+
+
+async def main(levels, delay: float) -> None:
+  print(f"{'mode':<9} {'conc.':>6} {'provider':>10} {'ranker':>8} {'ok':>6} {'wall':>11} {'coalesced':>10}")
+  for mode in ("pipeline", "endpoint"):
+    for concurrency in levels:
+      await _level(mode, concurrency, delay)
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100])
+  parser.add_argument("--delay", type=float, default=0.2, help="seconds each provider/ranker call takes")
+  args = parser.parse_args()
+  logging.disable(logging.WARNING)
+  asyncio.run(main(args.concurrency, args.delay))
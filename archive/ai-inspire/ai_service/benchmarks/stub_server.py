@@ -0,0 +1,105 @@
+import asyncio
+import json
+from typing import AsyncIterator, Awaitable, Callable, Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+Handler = Callable[[str, Dict[str, list], bytes], Awaitable[Tuple[int, object]]]
+
+
+async def _json_ok(path: str, query: Dict[str, list], body: bytes) -> Tuple[int, object]:
+  return (200, {"ok": True})
+
+
+class StubServer:
+  """Minimal asyncio HTTP/1.1 server with keep-alive, used as a local upstream for benchmarks.
+
+  Handlers return (status, payload); payload may be JSON-able, bytes, or an async iterator of
+  bytes, which is sent with chunked transfer encoding to mimic streaming upstreams.
+  """
+
+  def __init__(self, handler: Handler = _json_ok, latency: float = 0.0, host: str = "127.0.0.1") -> None:
+    self.handler = handler
+    self.latency = latency
+    self.host = host
+    self.port = 0
+    self.requests = 0
+    self.connections = 0
+    self._server: asyncio.AbstractServer | None = None
+    self._writers: set[asyncio.StreamWriter] = set()
+
+  @property
+  def base_url(self) -> str:
+    return f"http://{self.host}:{self.port}"
+
+  async def start(self) -> "StubServer":
+    self._server = await asyncio.start_server(self._serve, self.host, 0)
+    self.port = self._server.sockets[0].getsockname()[1]
+    return self
+
+  async def stop(self) -> None:
+    if self._server is not None:
+      self._server.close()
+      for writer in list(self._writers):
+        writer.close()
+      await self._server.wait_closed()
+      self._server = None
+
+  async def __aenter__(self) -> "StubServer":
+    return await self.start()
+
+  async def __aexit__(self, *exc) -> None:
+    await self.stop()
+
+  async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    self.connections += 1
+    self._writers.add(writer)
+    try:
+      while True:
+        request_line = await reader.readline()
+        if not request_line:
+          break
+        _method, target, _version = request_line.decode("latin-1").split(" ", 2)
+        headers: Dict[str, str] = {}
+        while True:
+          line = await reader.readline()
+          if line in (b"\r\n", b"\n", b""):
+            break
+          name, _, value = line.decode("latin-1").partition(":")
+          headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", "0") or 0)
+        body = await reader.readexactly(length) if length else b""
+
+        self.requests += 1
+        if self.latency:
+          await asyncio.sleep(self.latency)
+        parts = urlsplit(target)
+        status, payload = await self.handler(parts.path, parse_qs(parts.query), body)
+        if hasattr(payload, "__aiter__"):
+          await self._write_chunked(writer, status, payload)
+        else:
+          data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+          writer.write(
+            f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+            "Connection: keep-alive\r\n\r\n".encode("latin-1")
+            + data
+          )
+          await writer.drain()
+        if headers.get("connection", "").lower() == "close":
+          break
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError, ValueError):
+      pass
+    finally:
+      self._writers.discard(writer)
+      writer.close()
+
+  @staticmethod
+  async def _write_chunked(writer: asyncio.StreamWriter, status: int, chunks: AsyncIterator[bytes]) -> None:
+    writer.write(
+      f"HTTP/1.1 {status} OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n"
+      "Connection: keep-alive\r\n\r\n".encode("latin-1")
+    )
+    async for chunk in chunks:
+      writer.write(f"{len(chunk):x}\r\n".encode("latin-1") + chunk + b"\r\n")
+      await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
@@ -0,0 +1,127 @@
+"""Per-request cost of tracing the suggestion pipeline: off, in-memory exporter and file exporter.
+
+Each request runs the full pipeline (response and candidate caches cleared) against a local
+Eventbrite stub, an in-memory provider and the local ranker, so every span type is produced:
+suggest_events, providers.gather, provider.search, http.attempt and llm.rank_and_annotate (the
+local ranker builds no prompt, so there is no llm.build_prompt). It reports mean wall time per
+request and spans per request, then prints the last trace.
+
+Run from archive/ai-inspire:
+
+  python -m ai_service.benchmarks.tracing_overhead --requests 200
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from ai_service.benchmarks.stub_server import StubServer
+from ai_service.cache import TtlLruCache
+from ai_service.http_pool import HttpClientPool
+from ai_service.llm import LocalRankerClient
+from ai_service.models import CandidateLocation, CandidateRef, DateRange, UserPreferences, VenueCandidate
+from ai_service.pipeline import ResponseCaches, run_suggestions
+from ai_service.providers import EventbriteProvider, VenueProvider
+from ai_service.registry import ServiceRegistry
+from ai_service.tracing import FileExporter, InMemoryExporter, configure_tracing
+
+EVENTS = {
+  "events": [
+    {
+      "id": f"eb-{idx}",
+      "name": {"text": f"Open mic night {idx}"},
+      "summary": "Live music and drinks",
+      "url": f"https://example.com/eb-{idx}",
+      "venue": {"name": "The Crown", "address": {"city": "London"}},
+    }
+    for idx in range(15)
+  ]
+}
+
+
+class MemoryProvider(VenueProvider):
+  cache_ttl = 0.0
+
+  async def search(self, prefs, context=None):
+    return [
+      VenueCandidate(
+        id=f"mem-{idx}",
+        title=f"Music bar {idx}",
+        category="bar",
+        location=CandidateLocation(name="London"),
+        external=CandidateRef(source="bench", sourceId=f"mem-{idx}"),
+      )
+      for idx in range(20)
+    ]
+
+
+async def _stub_handler(path: str, query: dict, body: bytes):
+  return (200, EVENTS)
+
+
+async def _run(label: str, exporter, requests: int, registry: ServiceRegistry, prefs: UserPreferences) -> None:
+  tracer = configure_tracing(exporter)
+  caches = ResponseCaches(candidate_pool=TtlLruCache(), response=TtlLruCache())
+  before = tracer.exported
+  start = time.perf_counter()
+  for _ in range(requests):
+    caches.clear()
+    await run_suggestions(prefs, registry, caches)
+  per_request = (time.perf_counter() - start) / requests * 1e6
+  spans = (tracer.exported - before) / requests
+  print(f"{label:<8} {per_request:>10.0f}us/request {spans:>6.1f} spans/request")
+
+
+def _print_trace(exporter: InMemoryExporter) -> None:
+  spans = exporter.trace(exporter.spans[-1].trace_id)
+  children = {}
+  for span in spans:
+    children.setdefault(span.parent_id or None, []).append(span)
+
+  def walk(parent_id, depth: int) -> None:
+    for span in children.get(parent_id, []):
+      attrs = ", ".join(f"{key}={value}" for key, value in span.attributes.items())
+      print(f"  {'  ' * depth}{span.name} {span.duration_ms:.2f}ms {attrs}")
+      walk(span.span_id, depth + 1)
+
+  walk(None, 0)
+
+
+async def main(requests: int) -> None:
+  prefs = UserPreferences(
+    groupSize=6,
+    location="London",
+    dateRange=DateRange(mode="relative", label="this week"),
+    vibe="live music",
+    eventType="night out",
+  )
+  pool = HttpClientPool(http2=False)
+  path = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+  try:
+    async with StubServer(_stub_handler) as server:
+      eventbrite = EventbriteProvider("bench-tracing", http_pool=pool)
+      eventbrite.base_url = f"{server.base_url}/v3/events/search/"
+      eventbrite.rate_per_second = None
+      registry = ServiceRegistry(providers=[eventbrite, MemoryProvider()], llm=LocalRankerClient(None))
+      # Warm the connection pool and imports so the first mode isn't penalised.
+      await _run("warmup", None, 10, registry, prefs)
+      await _run("off", None, requests, registry, prefs)
+      memory = InMemoryExporter()
+      await _run("memory", memory, requests, registry, prefs)
+      await _run("file", FileExporter(path), requests, registry, prefs)
+      print("last in-memory trace:")
+      _print_trace(memory)
+  finally:
+    configure_tracing(None)
+    await pool.aclose()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--requests", type=int, default=200)
+  args = parser.parse_args()
+  logging.disable(logging.WARNING)
+  asyncio.run(main(args.requests))
@@ -0,0 +1,194 @@
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import is_dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+from ai_service.dates import resolve_date_window
+from ai_service.models import UserPreferences
+
+T = TypeVar("T")
+
+
+def _clean(value: Any) -> str:
+  return " ".join(str(value or "").lower().split())
+
+
+def refresh_level(prefs: UserPreferences) -> int:
+  """Clamp refreshToken to the 0-3 range providers use to widen their queries."""
+  try:
+    return max(0, min(3, int(prefs.refreshToken or 0)))
+  except Exception:
+    return 0
+
+
+def search_key(prefs: UserPreferences) -> Tuple:
+  """Canonical form of the fields that shape provider queries: location, intent and date window.
+
+  Text fields are lowercased and whitespace-collapsed. Relative date labels are resolved to
+  concrete windows so an entry expires with its window when the day rolls over, and the label is
+  kept too: "Today" and "This week" can cover the same days but are prompted and ranked differently.
+  """
+  start_dt, end_dt = resolve_date_window(prefs.dateRange)
+  return (
+    _clean(prefs.location),
+    _clean(prefs.vibe),
+    _clean(prefs.eventType),
+    _clean(prefs.dateRange.label),
+    start_dt.isoformat() if start_dt else None,
+    end_dt.isoformat() if end_dt else None,
+  )
+
+
+def preferences_key(prefs: UserPreferences, include_refresh: bool = False) -> Tuple:
+  """Canonical, hashable form of the full request preferences."""
+  key: Tuple = search_key(prefs) + (
+    prefs.groupSize,
+    _clean(prefs.budgetLevel),
+    prefs.accessibility.needsStepFree,
+    _clean(prefs.ageRangeHint),
+  )
+  if include_refresh:
+    key += (_clean(prefs.refreshToken),)
+  return key
+
+
+def approx_size(value: Any, _seen: set | None = None) -> int:
+  """Rough deep size in bytes of containers, strings, pydantic models and slotted dataclasses."""
+  seen = _seen if _seen is not None else set()
+  if id(value) in seen:
+    return 0
+  seen.add(id(value))
+  size = sys.getsizeof(value)
+  if isinstance(value, BaseModel):
+    size += approx_size(value.__dict__, seen)
+  elif hasattr(value, "__slots__") and is_dataclass(value):
+    size += sum(approx_size(getattr(value, name), seen) for name in value.__slots__)
+  elif isinstance(value, dict):
+    size += sum(approx_size(k, seen) + approx_size(v, seen) for k, v in value.items())
+  elif isinstance(value, (list, tuple, set, frozenset)):
+    size += sum(approx_size(item, seen) for item in value)
+  return size
+
+
+class TtlLruCache:
+  """In-process cache with per-entry TTL, LRU eviction and an approximate memory bound."""
+
+  def __init__(
+    self,
+    max_entries: int = 256,
+    ttl: float = 300.0,
+    max_bytes: int | None = None,
+    sizeof: Callable[[Any], int] = approx_size,
+    clock: Callable[[], float] = time.monotonic,
+  ) -> None:
+    self.max_entries = max_entries
+    self.ttl = ttl
+    self.max_bytes = max_bytes
+    self.sizeof = sizeof
+    self.clock = clock
+    self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+    self._bytes = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def get(self, key: Hashable, default: Any = None) -> Any:
+    entry = self._entries.get(key)
+    if entry is None:
+      self.misses += 1
+      return default
+    expires_at, _size, value = entry
+    if expires_at <= self.clock():
+      self._remove(key)
+      self.misses += 1
+      return default
+    self._entries.move_to_end(key)
+    self.hits += 1
+    return value
+
+  def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+    if key in self._entries:
+      self._remove(key)
+    size = self.sizeof(value) if self.max_bytes else 0
+    if self.max_bytes and size > self.max_bytes:
+      return
+    self._entries[key] = (self.clock() + (self.ttl if ttl is None else ttl), size, value)
+    self._bytes += size
+    while self._entries and (
+      len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes)
+    ):
+      oldest = next(iter(self._entries))
+      self._remove(oldest)
+      self.evictions += 1
+
+  def pop(self, key: Hashable) -> None:
+    if key in self._entries:
+      self._remove(key)
+
+  def clear(self) -> None:
+    self._entries.clear()
+    self._bytes = 0
+
+  def _remove(self, key: Hashable) -> None:
+    _expires_at, size, _value = self._entries.pop(key)
+    self._bytes -= size
+
+  def stats(self) -> dict:
+    lookups = self.hits + self.misses
+    return {
+      "entries": len(self._entries),
+      "bytes": self._bytes,
+      "hits": self.hits,
+      "misses": self.misses,
+      "evictions": self.evictions,
+      "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+class SingleFlight:
+  """Coalesce concurrent calls for the same key onto one in-flight task.
+
+  The task outlives any one caller being cancelled, but is cancelled once every caller has been,
+  so a timed-out or disconnected request doesn't leave upstream work running for nobody.
+  """
+
+  def __init__(self) -> None:
+    self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+    self._waiters: Dict["asyncio.Task[Any]", int] = {}
+    self.coalesced = 0
+
+  def __contains__(self, key: Hashable) -> bool:
+    return key in self._inflight
+
+  def _discard(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+    if self._inflight.get(key) is task:
+      del self._inflight[key]
+
+  async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+    task = self._inflight.get(key)
+    if task is None:
+      task = asyncio.ensure_future(fn())
+      self._inflight[key] = task
+      task.add_done_callback(lambda t, k=key: self._discard(k, t))
+    else:
+      self.coalesced += 1
+    self._waiters[task] = self._waiters.get(task, 0) + 1
+    try:
+      # Shield so one caller being cancelled doesn't cancel the work other callers are awaiting.
+      return await asyncio.shield(task)
+    finally:
+      self._waiters[task] -= 1
+      if not self._waiters[task]:
+        del self._waiters[task]
+        # Still running here means the last caller was cancelled: stop the work and let the
+        # next caller for this key start afresh rather than join a cancelling task.
+        if not task.done():
+          task.cancel()
+          self._discard(key, task)
@@ -0,0 +1,202 @@
+import heapq
+import json
+import logging
+import os
+import re
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from ai_service.dates import resolve_date_window
+from ai_service.models import UserPreferences
+from ai_service.ranking import BUDGET_LEVELS
+
+logger = logging.getLogger("ai_inspire_service")
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "ai_inspire_me_events_with_metadata.json")
+
+# Weight of a query-token hit per indexed field; names and categories say most about fit.
+FIELD_WEIGHTS = {
+  "name": 2,
+  "category": 2,
+  "ideal_time": 1,
+  "indoor_outdoor": 1,
+  "budget": 1,
+}
+# Months where outdoor-only ideas are a hard sell (the catalogue is UK-centric).
+WINTER_MONTHS = {11, 12, 1, 2}
+# Structured adjustments added to the token score of a feasible idea.
+OVER_BUDGET_PENALTY = 2.0
+# Scaled by how far the group is outside the idea's range (up to 1x below the minimum).
+GROUP_SIZE_PENALTY = 2.0
+# Groups more than this multiple of an idea's maximum are pruned rather than penalised.
+MAX_GROUP_STRETCH = 3
+SEASON_PENALTY = 2.0
+TIME_OF_DAY_PENALTY = 1.0
+
+_TOKEN_RE = re.compile(r"[a-z0-9£]+")
+_STOPWORDS = {"a", "an", "and", "the", "for", "with", "of", "to", "in", "on", "or", "out"}
+_RANGE_RE = re.compile(r"(\d+)\s*(?:-|to)\s*(\d+)")
+
+
+def _tokens(text: str | None) -> List[str]:
+  """Lowercase word tokens with a light plural strip, so "Conferences" matches "conference"."""
+  out = []
+  for token in _TOKEN_RE.findall((text or "").lower()):
+    if token in _STOPWORDS:
+      continue
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+      token = token[:-1]
+    out.append(token)
+  return out
+
+
+def _group_range(value: str | None) -> Tuple[int, int]:
+  """Parse "10-80" style sizes; unknown or unparseable ranges accept any group."""
+  match = _RANGE_RE.search(value or "")
+  if not match:
+    return (1, 10_000)
+  low, high = int(match.group(1)), int(match.group(2))
+  return (min(low, high), max(low, high))
+
+
+def _group_penalty(size: int, low: int, high: int) -> float | None:
+  """Penalty for a group outside an idea's typical range; None when it clearly can't host them.
+
+  Smaller groups are only penalised (a couple can still join a 4-20 class), larger ones by how far
+  over the maximum they are, and pruned beyond MAX_GROUP_STRETCH times it.
+  """
+  if size < low:
+    return GROUP_SIZE_PENALTY * (low - size) / low
+  if size <= high:
+    return 0.0
+  if size > high * MAX_GROUP_STRETCH:
+    return None
+  return GROUP_SIZE_PENALTY * min(1.0, (size - high) / high)
+
+
+def _budget_level(value: str | None) -> int:
+  """"£".."£££" -> 1..3; 0 when unknown."""
+  return min(3, (value or "").count("£"))
+
+
+class IdeaCatalogue:
+  """The local ideas file, indexed for token lookups and parsed into numeric columns.
+
+  Text fields go into an inverted index (token -> [(idea, field weight)]); typical_group_size,
+  budget, indoor_outdoor and ideal_time become parallel columns so group size, budget, season and
+  time-of-day checks run as one pass over plain lists. The file is re-read when its mtime changes.
+  """
+
+  def __init__(self, data_path: str = DATA_PATH) -> None:
+    self.data_path = data_path
+    self._mtime: int | None = None
+    self.events: List[dict] = []
+    self._index: Dict[str, List[Tuple[int, int]]] = {}
+    self.group_min: List[int] = []
+    self.group_max: List[int] = []
+    self.budget: List[int] = []
+    self.indoor: List[bool] = []
+    self.daytime: List[bool] = []
+
+  def load(self) -> List[dict]:
+    try:
+      mtime = os.stat(self.data_path).st_mtime_ns
+    except OSError:
+      mtime = None
+    if mtime == self._mtime:
+      return self.events
+    events: List[dict] = []
+    if mtime is not None:
+      try:
+        with open(self.data_path, "r", encoding="utf-8") as f:
+          events = json.load(f).get("events", [])
+      except Exception as exc:
+        logger.warning("Could not load local metadata from %s: %s", self.data_path, exc)
+    self._build(events)
+    self._mtime = mtime
+    return self.events
+
+  def _build(self, events: List[dict]) -> None:
+    postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+    for idx, item in enumerate(events):
+      for field, weight in FIELD_WEIGHTS.items():
+        for token in _tokens(item.get(field)):
+          # A token scores once per idea, at its best field weight.
+          if postings[token].get(idx, 0) < weight:
+            postings[token][idx] = weight
+    sizes = [_group_range(item.get("typical_group_size")) for item in events]
+    settings = [(item.get("indoor_outdoor") or "").lower() for item in events]
+    self.events = events
+    self._index = {token: list(hits.items()) for token, hits in postings.items()}
+    self.group_min = [low for low, _high in sizes]
+    self.group_max = [high for _low, high in sizes]
+    self.budget = [_budget_level(item.get("budget")) for item in events]
+    # "Indoor/Outdoor" counts as indoor, and so does a missing value, so neither is season-penalised.
+    self.indoor = ["indoor" in setting or not setting for setting in settings]
+    self.daytime = [(item.get("ideal_time") or "").lower() == "daytime" for item in events]
+    logger.info("Indexed %s local ideas (%s tokens) from %s", len(events), len(self._index), self.data_path)
+
+  def token_scores(self, prefs: UserPreferences) -> Dict[int, int]:
+    """Inverted-index score per idea sharing at least one token with the vibe or event type."""
+    # Vibe words count double: they describe the activity, event type mostly the occasion.
+    weights: Dict[str, int] = {}
+    for token in _tokens(prefs.eventType):
+      weights[token] = 1
+    for token in _tokens(prefs.vibe):
+      weights[token] = 2
+    scores: Dict[int, int] = defaultdict(int)
+    for token, query_weight in weights.items():
+      for idx, field_weight in self._index.get(token, ()):
+        scores[idx] += query_weight * field_weight
+    return scores
+
+  def structured_scores(self, prefs: UserPreferences) -> List[float | None]:
+    """Per-idea adjustment from group size, budget, season and time of day; None prunes the idea."""
+    size = prefs.groupSize
+    budget = BUDGET_LEVELS.get((prefs.budgetLevel or "").strip().lower())
+    start_dt, _end_dt = resolve_date_window(prefs.dateRange)
+    winter = start_dt is not None and start_dt.month in WINTER_MONTHS
+    event_lower = (prefs.eventType or "").lower()
+    evening = "night" in event_lower or "evening" in event_lower
+
+    group = [_group_penalty(size, low, high) for low, high in zip(self.group_min, self.group_max)]
+    if budget is not None:
+      # One level over budget is a penalty; two or more is out.
+      over = [max(0, level - budget) for level in self.budget]
+    else:
+      over = [0] * len(self.events)
+    season = [SEASON_PENALTY if winter and not inside else 0.0 for inside in self.indoor]
+    time_of_day = [TIME_OF_DAY_PENALTY if evening and day else 0.0 for day in self.daytime]
+    return [
+      None if g is None or extra > 1 else -(g + extra * OVER_BUDGET_PENALTY + s + t)
+      for g, extra, s, t in zip(group, over, season, time_of_day)
+    ]
+
+  def select(self, prefs: UserPreferences, limit: int, require_match: bool = True) -> List[Tuple[float, dict]]:
+    """Top (score, idea) pairs among ideas that can host the group and fit the budget, best fit first.
+
+    With require_match, only ideas sharing a token with the vibe or event type are considered.
+    """
+    events = self.load()
+    if not events:
+      return []
+    adjustments = self.structured_scores(prefs)
+    tokens = self.token_scores(prefs)
+    pool = tokens.keys() if require_match else range(len(events))
+    scored = [
+      (tokens.get(idx, 0) + adjustments[idx], idx) for idx in pool if adjustments[idx] is not None
+    ]
+    # Ties keep file order.
+    best = heapq.nlargest(limit, scored, key=lambda item: (item[0], -item[1]))
+    return [(score, events[idx]) for score, idx in best]
+
+
+_CATALOGUES: Dict[str, IdeaCatalogue] = {}
+
+
+def get_catalogue(data_path: str = DATA_PATH) -> IdeaCatalogue:
+  """Shared catalogue per file so the provider and prompt builder parse it once."""
+  catalogue = _CATALOGUES.get(data_path)
+  if catalogue is None:
+    catalogue = _CATALOGUES[data_path] = IdeaCatalogue(data_path)
+  return catalogue
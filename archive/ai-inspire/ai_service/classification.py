@@ -0,0 +1,164 @@
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Pattern, Tuple
+
+ART_HINT_TOKENS = [
+  "art",
+  "arts",
+  "painting",
+  "gallery",
+  "museum",
+  "exhibit",
+  "exhibition",
+  "pottery",
+  "ceramic",
+  "craft",
+  # No bare "studio": yoga, pilates and fitness studios aren't art ("art studio" still matches "art").
+  "creative",
+  "drawing",
+  "sketch",
+  "sculpture",
+  "photography",
+]
+
+# (vibe tokens, provider-friendly search terms they map to)
+KEYWORD_MAP = [
+  (["art", "paint", "drawing", "gallery", "pottery", "sketch"], ["art class", "painting class", "pottery class", "art studio"]),
+  (["yoga", "pilates", "fitness", "gym", "wellness", "stretch"], ["yoga class", "yoga studio", "pilates studio", "fitness class", "wellness studio"]),
+  (["fishing", "lake", "pond"], ["fishing lake", "fishing pond"]),
+  (["girly night", "girls night", "hen", "bachelorette"], ["cocktail bar", "rooftop bar"]),
+  (["darts"], ["darts bar", "pub with darts"]),
+  (["chess", "board game", "tabletop", "catan"], ["board game cafe", "games night", "board games"]),
+  (["live music", "gig", "concert"], ["live music", "concert venue"]),
+  (["escape room"], ["escape room"]),
+  (["karaoke"], ["karaoke bar"]),
+  (["bowling"], ["bowling alley"]),
+  (["outdoor", "outdoors"], ["park", "hiking", "scenic walk"]),
+  (["family"], ["family friendly", "kids friendly"]),
+  (["beach", "coast", "seaside", "sea", "cliff", "cliffs", "coastal"], ["beach", "coastal walk", "clifftop walk"]),
+  (["walk", "hike", "hiking", "trail"], ["scenic walk", "hiking trail"]),
+]
+
+# Phrases containing art tokens that aren't art ("craft" became live once word boundaries matched).
+NOT_ART_PHRASES = ("martial art", "craft beer", "craft brew")
+
+ART_TYPES = frozenset({"art_gallery", "museum"})
+NIGHTLIFE_FOOD_TYPES = frozenset({"bar", "night_club", "liquor_store", "restaurant"})
+WELLNESS_EXCLUDED_TYPES = frozenset({"bar", "night_club", "liquor_store", "art_gallery", "museum", "casino"})
+OUTDOORS_EXCLUDED_TYPES = frozenset(
+  {"bar", "night_club", "liquor_store", "restaurant", "art_gallery", "museum", "casino", "movie_theater"}
+)
+
+
+def token_pattern(tokens: Iterable[str]) -> Pattern[str]:
+  """Compile tokens into one regex: single words match on word boundaries, phrases as substrings."""
+  lowered = {token.lower() for token in tokens if token}
+  words = sorted((t for t in lowered if " " not in t), key=len, reverse=True)
+  phrases = sorted((t for t in lowered if " " in t), key=len, reverse=True)
+  parts = []
+  if words:
+    parts.append(rf"\b(?:{'|'.join(map(re.escape, words))})\b")
+  parts.extend(map(re.escape, phrases))
+  return re.compile("|".join(parts))
+
+
+def substring_pattern(tokens: Iterable[str]) -> Pattern[str]:
+  return re.compile("|".join(re.escape(token.lower()) for token in tokens))
+
+
+_ART_RE = token_pattern(ART_HINT_TOKENS)
+_CLASS_RE = token_pattern(["class", "lesson", "course"])
+_WELLNESS_RE = substring_pattern(["yoga", "pilates", "fitness", "gym", "wellness"])
+_OUTDOORS_RE = substring_pattern(["walk", "hike", "hiking", "trail", "beach", "coast", "cliff", "outdoor", "outdoors", "coastal"])
+_KEYWORD_PATTERNS: List[Tuple[Pattern[str], List[str]]] = [(token_pattern(tokens), mapped) for tokens, mapped in KEYWORD_MAP]
+
+
+def has_art_intent(text: str) -> bool:
+  """Detect genuine art/creative intent without matching words like 'party'."""
+  text_lower = (text or "").lower()
+  if not text_lower or any(phrase in text_lower for phrase in NOT_ART_PHRASES):
+    return False
+  return _ART_RE.search(text_lower) is not None
+
+
+def is_art_candidate(name: str | None, primary_type: str | None, description: str | None = None) -> bool:
+  """Check if a provider result is likely art-related."""
+  if primary_type in ART_TYPES:
+    return True
+  return has_art_intent(f"{name or ''} {description or ''}")
+
+
+def search_terms(vibe: str, event_type: str) -> Tuple[str, ...]:
+  """Map vibe keywords to provider-friendly search terms."""
+  vibe_lower = (vibe or "").lower()
+  event_lower = (event_type or "").lower()
+  terms: List[str] = []
+  for pattern, mapped in _KEYWORD_PATTERNS:
+    if pattern.search(vibe_lower):
+      terms.extend(mapped)
+  if event_lower.startswith("meal") or "drink" in event_lower:
+    terms.append("restaurant")
+    terms.append("bar")
+  if event_lower.startswith("trip"):
+    terms.append("weekend trip ideas")
+  if event_lower.startswith("day out"):
+    terms.append("day trip ideas")
+  if event_lower.startswith("night"):
+    terms.append("nightlife")
+  if not terms:
+    terms.extend(["group friendly", "fun venue"])
+  return tuple(dict.fromkeys(terms))  # dedupe while preserving order
+
+
+@dataclass(frozen=True)
+class IntentProfile:
+  """What a request is after, classified once and reused to filter every provider result."""
+
+  art: bool
+  learning: bool
+  wellness: bool
+  outdoors: bool
+  night: bool
+  search_terms: Tuple[str, ...]
+  excluded_types: FrozenSet[str]
+
+  def skips_art(self, name: str | None, primary_type: str | None, description: str | None = None) -> bool:
+    """Drop art results unless the user asked for art."""
+    return not self.art and is_art_candidate(name, primary_type, description)
+
+  def excludes(self, primary_type: str | None) -> bool:
+    """Clearly unrelated venue categories for this request, e.g. bars for a yoga class."""
+    return primary_type in self.excluded_types
+
+
+@lru_cache(maxsize=int(os.getenv("INTENT_CACHE_SIZE", "1024")))
+def classify_intent(vibe: str, event_type: str) -> IntentProfile:
+  vibe_lower = (vibe or "").lower()
+  event_lower = (event_type or "").lower()
+  art = has_art_intent(f"{vibe_lower} {event_lower}")
+  learning = _CLASS_RE.search(vibe_lower) is not None
+  wellness = _WELLNESS_RE.search(vibe_lower) is not None
+  outdoors = _OUTDOORS_RE.search(vibe_lower) is not None
+  night = "night" in vibe_lower or "night" in event_lower
+
+  excluded: set = set()
+  # Art/class: avoid nightlife/food
+  if art or learning:
+    excluded |= NIGHTLIFE_FOOD_TYPES
+  # Yoga/fitness: avoid nightlife and art galleries
+  if wellness:
+    excluded |= WELLNESS_EXCLUDED_TYPES
+  # Outdoors/walks: avoid nightlife/indoor leisure unless a night out was explicitly requested
+  if outdoors and not night:
+    excluded |= OUTDOORS_EXCLUDED_TYPES
+  return IntentProfile(
+    art=art,
+    learning=learning,
+    wellness=wellness,
+    outdoors=outdoors,
+    night=night,
+    search_terms=search_terms(vibe, event_type),
+    excluded_types=frozenset(excluded),
+  )
@@ -0,0 +1,55 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from ai_service.classification import IntentProfile, classify_intent
+from ai_service.geocoding import NO_COORDINATES, Coordinates, Geocoder
+from ai_service.intent_normalizer import normalize_intent
+from ai_service.metrics import Timeline
+from ai_service.models import UserPreferences
+
+
+@dataclass
+class SearchContext:
+  """Per-request state computed once and shared by every provider in the fan-out."""
+
+  location: str
+  geocoder: Geocoder | None = None
+  vibe: str = ""
+  event_type: str = ""
+  timeline: Timeline | None = None
+  _coords_task: "asyncio.Task[Coordinates] | None" = field(default=None, repr=False)
+  _intent: Dict[str, List[str]] | None = field(default=None, repr=False)
+
+  @classmethod
+  def for_request(
+    cls, prefs: UserPreferences, geocoder: Geocoder | None = None, timeline: Timeline | None = None
+  ) -> "SearchContext":
+    return cls(prefs.location, geocoder, vibe=prefs.vibe, event_type=prefs.eventType, timeline=timeline)
+
+  def intent(self) -> Dict[str, List[str]]:
+    """normalize_intent for this request, computed once and shared by every provider."""
+    if self._intent is None:
+      self._intent = normalize_intent(self.vibe, self.event_type)
+    return self._intent
+
+  def profile(self) -> IntentProfile:
+    """Classified request intent, shared by every provider's per-result filters."""
+    return classify_intent(self.vibe, self.event_type)
+
+  async def coordinates(self) -> Coordinates:
+    """Geocode the request location at most once; providers that don't need coordinates never wait."""
+    if self.geocoder is None:
+      return NO_COORDINATES
+    if self._coords_task is None:
+      self._coords_task = asyncio.ensure_future(self._geocode())
+    return await asyncio.shield(self._coords_task)
+
+  async def _geocode(self) -> Coordinates:
+    started = time.perf_counter()
+    try:
+      return await self.geocoder.geocode(self.location)
+    finally:
+      if self.timeline is not None:
+        self.timeline.add("geocode", time.perf_counter() - started)
@@ -0,0 +1,72 @@
+import calendar
+from datetime import datetime, timedelta, timezone, date
+from typing import Tuple
+
+
+def _parse_date(value: str | None) -> date | None:
+  if not value:
+    return None
+  try:
+    return date.fromisoformat(value)
+  except Exception:
+    return None
+
+
+def resolve_date_window(date_range) -> Tuple[datetime | None, datetime | None]:
+  """Translate UI date presets into concrete UTC windows for provider filters."""
+  today = datetime.now(timezone.utc).date()
+  start_date: date | None = None
+  end_date: date | None = None
+
+  if getattr(date_range, "mode", None) == "explicit":
+    start_date = _parse_date(getattr(date_range, "startDate", None))
+    end_date = _parse_date(getattr(date_range, "endDate", None)) or start_date
+  else:
+    label = (getattr(date_range, "label", "") or "").lower()
+    if "today" in label:
+      start_date = end_date = today
+    elif "next week" in label:
+      start_date = today + timedelta(days=(7 - today.weekday() or 7))
+      end_date = start_date + timedelta(days=6)
+    elif "this week" in label:
+      start_date = today
+      end_date = today + timedelta(days=max(0, 6 - today.weekday()))
+    elif "next month" in label:
+      month = today.month + 1
+      year = today.year + (1 if month > 12 else 0)
+      month = month if month <= 12 else 1
+      start_date = date(year, month, 1)
+      last_day = calendar.monthrange(year, month)[1]
+      end_date = date(year, month, last_day)
+    elif "this month" in label:
+      start_date = today
+      last_day = calendar.monthrange(today.year, today.month)[1]
+      end_date = date(today.year, today.month, last_day)
+    else:
+      start_date = today
+      end_date = today + timedelta(days=30)
+
+  if not start_date:
+    return (None, None)
+  if not end_date:
+    end_date = start_date
+  if end_date < start_date:
+    end_date = start_date
+
+  start_dt = datetime.combine(start_date, datetime.min.time(), tzinfo=timezone.utc)
+  end_dt = datetime.combine(end_date, datetime.max.time().replace(microsecond=0), tzinfo=timezone.utc)
+  return (start_dt, end_dt)
+
+
+def format_iso(dt: datetime | None) -> str | None:
+  if not dt:
+    return None
+  return dt.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def epoch_ms_to_iso(value) -> str | None:
+  """Convert Meetup-style epoch milliseconds to an ISO 8601 UTC timestamp."""
+  try:
+    return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc).isoformat()
+  except (TypeError, ValueError, OverflowError):
+    return None
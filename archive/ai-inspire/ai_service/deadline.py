@@ -0,0 +1,39 @@
+import os
+import time
+from typing import Callable
+
+
+class Deadline:
+  """Wall-clock budget for one request, split into per-stage budgets."""
+
+  def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+    self.clock = clock
+    self.expires_at = clock() + seconds
+
+  def remaining(self) -> float:
+    return max(0.0, self.expires_at - self.clock())
+
+  @property
+  def expired(self) -> bool:
+    return self.remaining() <= 0.0
+
+  def budget(self, stage_seconds: float, reserve: float = 0.0) -> float:
+    """Time a stage may use: its own budget, capped by what's left after holding back reserve."""
+    return max(0.0, min(stage_seconds, self.remaining() - reserve))
+
+
+def request_deadline_seconds() -> float:
+  # Stay under the Next.js proxy's 20s abort so users get partial results instead of a 503.
+  return float(os.getenv("REQUEST_DEADLINE_SECONDS", "18"))
+
+
+def request_deadline() -> Deadline:
+  return Deadline(request_deadline_seconds())
+
+
+def provider_stage_seconds() -> float:
+  return float(os.getenv("PROVIDER_STAGE_SECONDS", "8"))
+
+
+def llm_stage_seconds() -> float:
+  return float(os.getenv("LLM_STAGE_SECONDS", "9"))
@@ -0,0 +1,200 @@
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Tuple
+
+from ai_service.cache import SingleFlight, TtlLruCache
+from ai_service.http_pool import HttpClientPool, get_default_pool
+from ai_service.metrics import GEOCODE_SECONDS
+from ai_service.tracing import span
+
+logger = logging.getLogger("ai_inspire_service")
+
+Coordinates = Tuple[float | None, float | None]
+NO_COORDINATES: Coordinates = (None, None)
+
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+
+# City centres for the locations users type most, so they never cost a geocode call.
+COMMON_CITIES: Dict[str, Tuple[float, float]] = {
+  "london": (51.5074, -0.1278),
+  "manchester": (53.4808, -2.2426),
+  "birmingham": (52.4862, -1.8904),
+  "leeds": (53.8008, -1.5491),
+  "liverpool": (53.4084, -2.9916),
+  "glasgow": (55.8642, -4.2518),
+  "edinburgh": (55.9533, -3.1883),
+  "bristol": (51.4545, -2.5879),
+  "cardiff": (51.4816, -3.1791),
+  "belfast": (54.5973, -5.9301),
+  "newcastle": (54.9783, -1.6178),
+  "newcastle upon tyne": (54.9783, -1.6178),
+  "sheffield": (53.3811, -1.4701),
+  "nottingham": (52.9548, -1.1581),
+  "leicester": (52.6369, -1.1398),
+  "brighton": (50.8225, -0.1372),
+  "oxford": (51.7520, -1.2577),
+  "cambridge": (52.2053, 0.1218),
+  "york": (53.9600, -1.0873),
+  "bath": (51.3751, -2.3617),
+  "southampton": (50.9097, -1.4044),
+  "portsmouth": (50.8198, -1.0880),
+  "plymouth": (50.3755, -4.1427),
+  "exeter": (50.7184, -3.5339),
+  "norwich": (52.6309, 1.2974),
+  "aberdeen": (57.1497, -2.0943),
+  "dundee": (56.4620, -2.9707),
+  "swansea": (51.6214, -3.9436),
+  "dublin": (53.3498, -6.2603),
+  "cornwall": (50.2660, -5.0527),
+}
+
+
+def _normalize(location: str) -> str:
+  return " ".join((location or "").lower().replace(",", " ").split())
+
+
+class GeocodeStore:
+  """SQLite table of known coordinates, seeded with COMMON_CITIES on creation."""
+
+  def __init__(self, path: str, seed: Dict[str, Tuple[float, float]] | None = COMMON_CITIES) -> None:
+    self.path = path
+    self._conn = sqlite3.connect(path, check_same_thread=False)
+    self._conn.execute(
+      "CREATE TABLE IF NOT EXISTS geocode (key TEXT PRIMARY KEY, lat REAL, lng REAL, stored_at REAL NOT NULL)"
+    )
+    if seed:
+      self._conn.executemany(
+        "INSERT OR IGNORE INTO geocode (key, lat, lng, stored_at) VALUES (?, ?, ?, ?)",
+        [(key, lat, lng, time.time()) for key, (lat, lng) in seed.items()],
+      )
+    self._conn.commit()
+
+  def get(self, key: str) -> Coordinates | None:
+    row = self._conn.execute("SELECT lat, lng FROM geocode WHERE key = ?", (key,)).fetchone()
+    if row is None or row[0] is None or row[1] is None:
+      return None
+    return (row[0], row[1])
+
+  def set(self, key: str, coords: Coordinates) -> None:
+    self._conn.execute(
+      "INSERT OR REPLACE INTO geocode (key, lat, lng, stored_at) VALUES (?, ?, ?, ?)",
+      (key, coords[0], coords[1], time.time()),
+    )
+    self._conn.commit()
+
+  def close(self) -> None:
+    self._conn.close()
+
+
+class Geocoder:
+  """Location -> (lat, lng) with an LRU+TTL memory tier, negative caching and single-flight lookups."""
+
+  def __init__(
+    self,
+    api_key: str | None,
+    http_pool: HttpClientPool | None = None,
+    store: GeocodeStore | None = None,
+    max_entries: int = 2048,
+    ttl: float = 7 * 24 * 3600.0,
+    negative_ttl: float = 3600.0,
+    url: str = GEOCODE_URL,
+  ) -> None:
+    self.api_key = api_key
+    self.url = url
+    self.http_pool = http_pool
+    self.store = store
+    self.negative_ttl = negative_ttl
+    self._cache = TtlLruCache(max_entries=max_entries, ttl=ttl)
+    self._flight = SingleFlight()
+    self.lookups = 0
+
+  async def geocode(self, location: str) -> Coordinates:
+    with span("geocode") as geocode_span:
+      key = _normalize(location)
+      if not key:
+        return NO_COORDINATES
+      cached = self._cache.get(key)
+      if cached is not None:
+        geocode_span.set_attribute("cache", "memory")
+        return cached
+      stored = self.store.get(key) if self.store else COMMON_CITIES.get(key)
+      if stored is not None:
+        geocode_span.set_attribute("cache", "store")
+        self._cache.set(key, stored)
+        return stored
+      if not self.api_key:
+        geocode_span.set_attribute("cache", "none")
+        return NO_COORDINATES
+      geocode_span.set_attribute("cache", "coalesced" if key in self._flight else "miss")
+      return await self._flight.do(key, lambda: self._lookup(key, location))
+
+  async def _lookup(self, key: str, location: str) -> Coordinates:
+    self.lookups += 1
+    client = (self.http_pool or get_default_pool()).client_for(self.url)
+    started = time.perf_counter()
+    try:
+      resp = await client.get(self.url, params={"address": location, "key": self.api_key}, timeout=8.0)
+    except Exception as exc:
+      GEOCODE_SECONDS.observe(time.perf_counter() - started, outcome="error")
+      # Transport errors are transient; don't negative-cache them.
+      logger.warning("Geocoding %s failed: %s", location, exc)
+      return NO_COORDINATES
+    elapsed = time.perf_counter() - started
+    if resp.status_code != 200:
+      GEOCODE_SECONDS.observe(elapsed, outcome="error")
+      return NO_COORDINATES
+    try:
+      data = resp.json()
+      status = data.get("status")
+      first = (data.get("results") or [None])[0] or {}
+      loc = first.get("geometry", {}).get("location", {}) if isinstance(first, dict) else {}
+      lat = loc.get("lat")
+      lng = loc.get("lng")
+    except Exception:
+      status = lat = lng = None
+    if status == "ZERO_RESULTS":
+      GEOCODE_SECONDS.observe(elapsed, outcome="ok")
+      # Unknown places are remembered briefly so bad input isn't re-geocoded on every request.
+      self._cache.set(key, NO_COORDINATES, ttl=self.negative_ttl)
+      return NO_COORDINATES
+    if lat is None or lng is None:
+      # OVER_QUERY_LIMIT, REQUEST_DENIED and UNKNOWN_ERROR also arrive as HTTP 200; they are
+      # usually transient, so they aren't cached.
+      GEOCODE_SECONDS.observe(elapsed, outcome="error")
+      logger.warning("Geocoding %s failed: status %s", location, status)
+      return NO_COORDINATES
+    GEOCODE_SECONDS.observe(elapsed, outcome="ok")
+    coords = (float(lat), float(lng))
+    self._cache.set(key, coords)
+    if self.store:
+      self.store.set(key, coords)
+    return coords
+
+  def stats(self) -> dict:
+    return {**self._cache.stats(), "upstreamLookups": self.lookups, "coalesced": self._flight.coalesced}
+
+  def close(self) -> None:
+    if self.store is not None:
+      self.store.close()
+
+
+def build_geocoder(http_pool: HttpClientPool | None = None) -> Geocoder:
+  api_key = os.getenv("GOOGLE_PLACES_API_KEY") or os.getenv("GOOGLE_MAPS_API_KEY")
+  store: GeocodeStore | None = None
+  store_path = os.getenv("GEOCODE_STORE_PATH")
+  if store_path:
+    try:
+      store = GeocodeStore(store_path)
+    except sqlite3.Error as exc:
+      logger.warning("Geocode store unavailable at %s (%s); using memory cache only.", store_path, exc)
+  return Geocoder(
+    api_key,
+    http_pool=http_pool,
+    store=store,
+    max_entries=int(os.getenv("GEOCODE_CACHE_MAX_ENTRIES", "2048")),
+    ttl=float(os.getenv("GEOCODE_CACHE_TTL", str(7 * 24 * 3600))),
+    negative_ttl=float(os.getenv("GEOCODE_NEGATIVE_TTL", "3600")),
+    url=os.getenv("GEOCODE_URL") or GEOCODE_URL,
+  )
@@ -0,0 +1,99 @@
+import logging
+import os
+from typing import Dict
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger("ai_inspire_service")
+
+
+def _env_int(name: str, default: int) -> int:
+  try:
+    return int(os.getenv(name, default))
+  except (TypeError, ValueError):
+    return default
+
+
+def _env_float(name: str, default: float) -> float:
+  try:
+    return float(os.getenv(name, default))
+  except (TypeError, ValueError):
+    return default
+
+
+def _http2_available() -> bool:
+  try:
+    import h2  # noqa: F401
+  except ImportError:
+    return False
+  return True
+
+
+class HttpClientPool:
+  """Long-lived httpx clients keyed by upstream origin so connections are reused across requests."""
+
+  def __init__(
+    self,
+    max_connections: int = 20,
+    max_keepalive_connections: int = 10,
+    keepalive_expiry: float = 30.0,
+    http2: bool = True,
+    timeout: float = 12.0,
+  ) -> None:
+    self.limits = httpx.Limits(
+      max_connections=max_connections,
+      max_keepalive_connections=max_keepalive_connections,
+      keepalive_expiry=keepalive_expiry,
+    )
+    if http2 and not _http2_available():
+      logger.info("h2 package not installed; upstream clients will use HTTP/1.1.")
+      http2 = False
+    self.http2 = http2
+    self.timeout = timeout
+    self._clients: Dict[str, httpx.AsyncClient] = {}
+    self._closed = False
+
+  def client_for(self, url: str) -> httpx.AsyncClient:
+    """Return the shared client for the scheme/host/port of url, creating it on first use."""
+    if self._closed:
+      raise RuntimeError("HttpClientPool is closed")
+    parts = urlsplit(url)
+    origin = f"{parts.scheme}://{parts.netloc}".lower()
+    client = self._clients.get(origin)
+    if client is None:
+      client = httpx.AsyncClient(limits=self.limits, http2=self.http2, timeout=self.timeout)
+      self._clients[origin] = client
+    return client
+
+  def origins(self) -> list[str]:
+    return sorted(self._clients)
+
+  async def aclose(self) -> None:
+    self._closed = True
+    clients = list(self._clients.values())
+    self._clients.clear()
+    for client in clients:
+      await client.aclose()
+
+
+def build_http_pool() -> HttpClientPool:
+  """Create the upstream client pool from environment settings."""
+  return HttpClientPool(
+    max_connections=_env_int("HTTP_MAX_CONNECTIONS", 20),
+    max_keepalive_connections=_env_int("HTTP_MAX_KEEPALIVE_CONNECTIONS", 10),
+    keepalive_expiry=_env_float("HTTP_KEEPALIVE_EXPIRY", 30.0),
+    http2=os.getenv("HTTP2_ENABLED", "true").lower() not in ("0", "false", "no"),
+    timeout=_env_float("HTTP_TIMEOUT", 12.0),
+  )
+
+
+_DEFAULT_POOL: HttpClientPool | None = None
+
+
+def get_default_pool() -> HttpClientPool:
+  """Fallback pool for providers/clients constructed outside the app lifespan (scripts, REPL)."""
+  global _DEFAULT_POOL
+  if _DEFAULT_POOL is None or _DEFAULT_POOL._closed:
+    _DEFAULT_POOL = build_http_pool()
+  return _DEFAULT_POOL
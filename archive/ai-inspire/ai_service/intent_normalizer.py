@@ -1,10 +1,13 @@
 import json
 import os
-from typing import Dict, List
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
 
 DATA_PATH = os.path.join(os.path.dirname(__file__), "ai_inspire_me_events_linked_vibes.json")
 
 _CACHE = None
+_MATCHER = None
 
 
 def _load_vocab() -> List[dict]:
@@ -20,29 +23,94 @@ def _load_vocab() -> List[dict]:
   return _CACHE
 
 
-def normalize_intent(vibe: str, event_type: str) -> Dict[str, List[str]]:
-  """Return tags/categories derived from linked vibes metadata to enrich providers."""
-  vibe_lower = (vibe or "").lower()
-  type_lower = (event_type or "").lower()
-  tags: List[str] = []
-  categories: List[str] = []
-
-  for entry in _load_vocab():
-    label = (entry.get("label") or "").lower()
-    if not label:
-      continue
-    if label in vibe_lower or label in type_lower:
-      tags.extend(entry.get("tags", []))
-      categories.extend(entry.get("categories", []))
+class IntentMatcher:
+  """Aho-Corasick automaton over vocab labels.
+
+  Finds every label occurring as a substring of the input in one pass over the text, however
+  large the vocabulary, matching the old per-entry `label in text` checks exactly (overlapping
+  labels included).
+  """
+
+  def __init__(self, vocab: List[dict]) -> None:
+    self.vocab = vocab
+    self._goto: List[Dict[str, int]] = [{}]
+    self._fail: List[int] = [0]
+    pending: List[List[int]] = [[]]
+    for idx, entry in enumerate(vocab):
+      label = (entry.get("label") or "").lower()
+      if not label:
+        continue
+      node = 0
+      for char in label:
+        nxt = self._goto[node].get(char)
+        if nxt is None:
+          nxt = len(self._goto)
+          self._goto[node][char] = nxt
+          self._goto.append({})
+          self._fail.append(0)
+          pending.append([])
+        node = nxt
+      pending[node].append(idx)
+
+    # Breadth-first pass to set failure links and merge each node's outputs with its suffix's.
+    queue = deque(self._goto[0].values())
+    outputs = [tuple(ids) for ids in pending]
+    while queue:
+      node = queue.popleft()
+      for char, child in self._goto[node].items():
+        fail = self._fail[node]
+        while fail and char not in self._goto[fail]:
+          fail = self._fail[fail]
+        self._fail[child] = self._goto[fail].get(char, 0)
+        outputs[child] = outputs[child] + outputs[self._fail[child]]
+        queue.append(child)
+    self._out: List[Tuple[int, ...]] = outputs
+
+  def matches(self, *texts: str) -> Set[int]:
+    """Indices of vocab entries whose label occurs in any of texts."""
+    found: Set[int] = set()
+    goto, fail, out = self._goto, self._fail, self._out
+    for text in texts:
+      node = 0
+      for char in text:
+        while node and char not in goto[node]:
+          node = fail[node]
+        node = goto[node].get(char, 0)
+        if out[node]:
+          found.update(out[node])
+    return found
+
+
+def _matcher() -> IntentMatcher:
+  global _MATCHER
+  if _MATCHER is None:
+    _MATCHER = IntentMatcher(_load_vocab())
+  return _MATCHER
 
+
+def _dedupe(items: Iterable[str]) -> Tuple[str, ...]:
   # de-duplicate while preserving order
-  def dedupe(items: List[str]) -> List[str]:
-    seen = set()
-    out: List[str] = []
-    for item in items:
-      if item and item not in seen:
-        seen.add(item)
-        out.append(item)
-    return out
-
-  return {"tags": dedupe(tags), "categories": dedupe(categories)}
+  seen = set()
+  out: List[str] = []
+  for item in items:
+    if item and item not in seen:
+      seen.add(item)
+      out.append(item)
+  return tuple(out)
+
+
+@lru_cache(maxsize=int(os.getenv("INTENT_CACHE_SIZE", "1024")))
+def _normalize(vibe_lower: str, type_lower: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+  matcher = _matcher()
+  # Vocab order, not match order, so results are identical to the old linear scan.
+  entries = [matcher.vocab[idx] for idx in sorted(matcher.matches(vibe_lower, type_lower))]
+  tags = _dedupe(tag for entry in entries for tag in entry.get("tags", []))
+  categories = _dedupe(category for entry in entries for category in entry.get("categories", []))
+  return tags, categories
+
+
+def normalize_intent(vibe: str, event_type: str) -> Dict[str, List[str]]:
+  """Return tags/categories derived from linked vibes metadata to enrich providers."""
+  tags, categories = _normalize((vibe or "").lower(), (event_type or "").lower())
+  # Fresh lists per call so callers can't mutate the memoized result.
+  return {"tags": list(tags), "categories": list(categories)}
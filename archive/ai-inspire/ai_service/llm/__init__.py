@@ -3,7 +3,34 @@ from ai_service.llm.client import (
   OllamaLlmClient,
   HuggingFaceLlmClient,
   GeminiLlmClient,
+  RankStatus,
   get_llm_client,
 )
+from ai_service.llm.prompt import PROMPT_STATS, RankingPrompt, build_prompt, estimate_tokens
+from ai_service.llm.stream_parser import SuggestionStreamParser
+from ai_service.llm.cache import CachedLlmClient, SqliteRankingStore, prompt_fingerprint, wrap_llm_with_cache
+from ai_service.llm.composite import CompositeLlmClient
+from ai_service.llm.local import HybridLlmClient, LocalRankerClient, build_llm_client, build_remote_llm
 
-__all__ = ["LlmClient", "OllamaLlmClient", "HuggingFaceLlmClient", "GeminiLlmClient", "get_llm_client"]
+__all__ = [
+  "LlmClient",
+  "OllamaLlmClient",
+  "HuggingFaceLlmClient",
+  "GeminiLlmClient",
+  "RankStatus",
+  "get_llm_client",
+  "PROMPT_STATS",
+  "RankingPrompt",
+  "build_prompt",
+  "estimate_tokens",
+  "SuggestionStreamParser",
+  "CachedLlmClient",
+  "SqliteRankingStore",
+  "prompt_fingerprint",
+  "wrap_llm_with_cache",
+  "CompositeLlmClient",
+  "HybridLlmClient",
+  "LocalRankerClient",
+  "build_llm_client",
+  "build_remote_llm",
+]
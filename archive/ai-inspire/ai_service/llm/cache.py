@@ -0,0 +1,209 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import AsyncIterator, Callable, List
+
+from ai_service.cache import SingleFlight, TtlLruCache
+from ai_service.llm.client import LlmClient
+from ai_service.llm.prompt import MAX_CANDIDATES, prompt_token_budget
+from ai_service.metrics import LLM_CACHE_LOOKUPS, LLM_CACHE_SAVED_SECONDS
+from ai_service.models import EnrichedSuggestion, UserPreferences, VenueCandidate
+from ai_service.tracing import current_span
+
+logger = logging.getLogger("ai_inspire_service")
+
+
+def prompt_fingerprint(llm: LlmClient, prefs: UserPreferences, raw_results: List[VenueCandidate]) -> str:
+  """Stable hash of everything the ranking prompt is built from, plus the backend and model.
+
+  Hashing the inputs rather than the rendered prompt keeps a miss from building the prompt twice,
+  here and again in the wrapped client. build_prompt reads only the first MAX_CANDIDATES candidates.
+  """
+  dates = prefs.dateRange
+  raw = json.dumps(
+    [
+      llm.name,
+      llm.model,
+      prompt_token_budget(),
+      [prefs.groupSize, prefs.location, dates.label, dates.startDate, dates.endDate, prefs.vibe, prefs.eventType],
+      [prefs.budgetLevel, prefs.accessibility.needsStepFree],
+      [cand.to_dict() for cand in raw_results[:MAX_CANDIDATES]],
+    ],
+    sort_keys=True,
+    ensure_ascii=False,
+    default=str,
+  )
+  return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SqliteRankingStore:
+  """On-disk tier so warm rankings survive restarts and are shared between workers."""
+
+  def __init__(self, path: str, ttl: float) -> None:
+    self.path = path
+    self.ttl = ttl
+    self._conn = sqlite3.connect(path, check_same_thread=False)
+    self._conn.execute("PRAGMA journal_mode=WAL")
+    self._conn.execute(
+      "CREATE TABLE IF NOT EXISTS llm_rankings (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, payload TEXT NOT NULL)"
+    )
+    self._conn.execute("DELETE FROM llm_rankings WHERE stored_at < ?", (time.time() - ttl,))
+    self._conn.commit()
+
+  def get(self, key: str) -> List[EnrichedSuggestion] | None:
+    row = self._conn.execute("SELECT stored_at, payload FROM llm_rankings WHERE key = ?", (key,)).fetchone()
+    if row is None or row[0] < time.time() - self.ttl:
+      return None
+    try:
+      return [EnrichedSuggestion.model_validate(item) for item in json.loads(row[1])]
+    except Exception:
+      logger.warning("Discarding unreadable LLM cache entry %s", key)
+      return None
+
+  def set(self, key: str, suggestions: List[EnrichedSuggestion]) -> None:
+    payload = json.dumps([s.model_dump() for s in suggestions], ensure_ascii=False)
+    self._conn.execute(
+      "INSERT OR REPLACE INTO llm_rankings (key, stored_at, payload) VALUES (?, ?, ?)",
+      (key, time.time(), payload),
+    )
+    self._conn.commit()
+
+  def close(self) -> None:
+    self._conn.close()
+
+
+class CachedLlmClient(LlmClient):
+  """Serve repeated rankings for identical prompt inputs from memory (and optionally disk).
+
+  Only real model output is cached: failures surface from rank()/stream_rank() as exceptions, so the
+  deterministic fallback produced by rank_and_annotate() never ends up in the cache (the pipeline's
+  response cache skips it too, via RankStatus).
+  """
+
+  def __init__(
+    self,
+    inner: LlmClient,
+    ttl: float = 6 * 3600.0,
+    max_entries: int = 512,
+    store: SqliteRankingStore | None = None,
+    clock: Callable[[], float] = time.monotonic,
+  ) -> None:
+    self.inner = inner
+    self.http_pool = inner.http_pool
+    self.model = inner.model
+    self.store = store
+    self.clock = clock
+    self._memory = TtlLruCache(max_entries=max_entries, ttl=ttl)
+    self._flight = SingleFlight()
+    self.hits = 0
+    self.disk_hits = 0
+    self.misses = 0
+    self.miss_seconds = 0.0
+    self._timed_misses = 0
+
+  @property
+  def name(self) -> str:
+    return self.inner.name
+
+  def _lookup(self, key: str) -> List[EnrichedSuggestion] | None:
+    suggestions = self._memory.get(key)
+    if suggestions is None and self.store is not None:
+      suggestions = self.store.get(key)
+      if suggestions is not None:
+        self.disk_hits += 1
+        self._memory.set(key, suggestions)
+        LLM_CACHE_LOOKUPS.inc(result="disk_hit")
+    elif suggestions is not None:
+      LLM_CACHE_LOOKUPS.inc(result="memory_hit")
+    if suggestions is not None:
+      self.hits += 1
+      if self._timed_misses:
+        LLM_CACHE_SAVED_SECONDS.inc(self.miss_seconds / self._timed_misses)
+    current_span().set_attribute("cache.llm", "miss" if suggestions is None else "hit")
+    return suggestions
+
+  def _remember(self, key: str, suggestions: List[EnrichedSuggestion], started: float) -> None:
+    self.miss_seconds += self.clock() - started
+    self._timed_misses += 1
+    if not suggestions:
+      return
+    self._memory.set(key, suggestions)
+    if self.store is not None:
+      try:
+        self.store.set(key, suggestions)
+      except sqlite3.Error as exc:
+        logger.warning("Could not persist LLM ranking: %s", exc)
+
+  async def rank(self, user_query: UserPreferences, raw_results: List[VenueCandidate]) -> List[EnrichedSuggestion]:
+    key = prompt_fingerprint(self.inner, user_query, raw_results)
+    cached = self._lookup(key)
+    if cached is not None:
+      return list(cached)
+
+    async def run() -> List[EnrichedSuggestion]:
+      self.misses += 1
+      LLM_CACHE_LOOKUPS.inc(result="miss")
+      started = self.clock()
+      suggestions = await self.inner.rank(user_query, raw_results)
+      self._remember(key, suggestions, started)
+      return suggestions
+
+    return list(await self._flight.do(key, run))
+
+  async def stream_rank(
+    self, user_query: UserPreferences, raw_results: List[VenueCandidate]
+  ) -> AsyncIterator[EnrichedSuggestion]:
+    key = prompt_fingerprint(self.inner, user_query, raw_results)
+    cached = self._lookup(key)
+    if cached is not None:
+      for suggestion in cached:
+        yield suggestion
+      return
+
+    self.misses += 1
+    LLM_CACHE_LOOKUPS.inc(result="miss")
+    started = self.clock()
+    suggestions: List[EnrichedSuggestion] = []
+    async for suggestion in self.inner.stream_rank(user_query, raw_results):
+      suggestions.append(suggestion)
+      yield suggestion
+    # Reached only when the model finished; a stream cut short by the deadline is not cached.
+    self._remember(key, suggestions, started)
+
+  def stats(self) -> dict:
+    lookups = self.hits + self.misses
+    mean_miss = self.miss_seconds / self._timed_misses if self._timed_misses else 0.0
+    return {
+      **self._memory.stats(),
+      "hits": self.hits,
+      "diskHits": self.disk_hits,
+      "misses": self.misses,
+      "coalesced": self._flight.coalesced,
+      "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+      "meanMissMs": round(mean_miss * 1000, 1),
+      "savedMs": round(self.hits * mean_miss * 1000, 1),
+    }
+
+  def close(self) -> None:
+    if self.store is not None:
+      self.store.close()
+    self.inner.close()
+
+
+def wrap_llm_with_cache(llm: LlmClient) -> LlmClient:
+  """Wrap the LLM client per LLM_CACHE (memory, sqlite or off)."""
+  backend = os.getenv("LLM_CACHE", "memory").lower()
+  if backend in ("off", "none", "false", "0"):
+    return llm
+  ttl = float(os.getenv("LLM_CACHE_TTL", str(6 * 3600)))
+  store: SqliteRankingStore | None = None
+  if backend == "sqlite":
+    path = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+    try:
+      store = SqliteRankingStore(path, ttl=ttl)
+    except sqlite3.Error as exc:
+      logger.warning("SQLite LLM cache unavailable at %s (%s); using memory cache.", path, exc)
+  return CachedLlmClient(llm, ttl=ttl, max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512")), store=store)
@@ -1,11 +1,18 @@
 import json
+import logging
 import os
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from dataclasses import dataclass
+from typing import AsyncIterator, List
 
 import httpx
 
-from ai_service.intent_normalizer import normalize_intent
+from ai_service.geocoding import NO_COORDINATES, Coordinates
+from ai_service.http_pool import HttpClientPool, get_default_pool
+from ai_service.llm.prompt import PROMPT_STATS, RankingPrompt, build_prompt
+from ai_service.metrics import FALLBACKS, LLM_RESULTS, LLM_SECONDS, PROMPT_TOKENS
+from ai_service.llm.stream_parser import SuggestionStreamParser
 from ai_service.models import (
   UserPreferences,
   VenueCandidate,
@@ -13,9 +20,10 @@ from ai_service.models import (
   SuggestionLocation,
   ExternalRef,
 )
+from ai_service.ranking import rank_candidates
+from ai_service.tracing import span
 
-_METADATA_CACHE: List[str] | None = None
-METADATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ai_inspire_me_events_with_metadata.json")
+logger = logging.getLogger("ai_inspire_service")
 
 
 def _resolve_flow(prefs: UserPreferences) -> str:
@@ -29,11 +37,13 @@ def _resolve_flow(prefs: UserPreferences) -> str:
   return "general"
 
 
-def _fallback_rank(prefs: UserPreferences, raw_results: List[VenueCandidate]) -> List[EnrichedSuggestion]:
-  """Simple deterministic ranking used when LLM fails."""
+def _fallback_rank(
+  prefs: UserPreferences, raw_results: List[VenueCandidate], centre: Coordinates = NO_COORDINATES
+) -> List[EnrichedSuggestion]:
+  """Deterministic local ranking, used for AI_BACKEND=local and whenever the LLM fails."""
   results: List[EnrichedSuggestion] = []
   flow = _resolve_flow(prefs)
-  for idx, item in enumerate(raw_results[:5]):
+  for idx, item in enumerate(rank_candidates(prefs, raw_results, centre, limit=5)):
     results.append(
       EnrichedSuggestion(
         id=item.id or f"suggestion-{idx}",
@@ -41,9 +51,9 @@ def _fallback_rank(prefs: UserPreferences, raw_results: List[VenueCandidate]) ->
         category=item.category,
         type=item.type,
         recommendedFlow=flow,
-        location=item.location if isinstance(item.location, SuggestionLocation) else SuggestionLocation(),
-        external=item.external if isinstance(item.external, ExternalRef) else ExternalRef(),
-        dateFitSummary="Good for your chosen dates",
+        location=item.location.to_model(),
+        external=item.external.to_model(),
+        dateFitSummary=f"Starts {item.startTime[:10]}" if item.startTime else "Good for your chosen dates",
         groupFitSummary=f"Works for around {prefs.groupSize} people.",
         whySuitable=_clean_why(item.description) or f"Matches the vibe: {prefs.vibe}.",
         roughPrice=item.roughPrice,
@@ -62,251 +72,298 @@ def _clean_why(text: str | None) -> str | None:
   return text.strip()
 
 
-def _load_metadata_categories() -> List[str]:
-  """Load category/name hints from the local metadata file for prompt enrichment."""
-  global _METADATA_CACHE
-  if _METADATA_CACHE is not None:
-    return _METADATA_CACHE
-  try:
-    with open(METADATA_PATH, "r", encoding="utf-8") as f:
-      data = json.load(f)
-    names = [entry.get("name", "") for entry in data.get("events", []) if entry.get("name")]
-    categories = [entry.get("category", "") for entry in data.get("events", []) if entry.get("category")]
-    merged = [n for n in names + categories if n]
-    seen = set()
-    hints: List[str] = []
-    for item in merged:
-      if item not in seen:
-        seen.add(item)
-        hints.append(item)
-    _METADATA_CACHE = hints
-    return hints
-  except Exception:
-    _METADATA_CACHE = []
-    return _METADATA_CACHE
-
-
-def _build_prompt(prefs: UserPreferences, raw_results: List[VenueCandidate]) -> str:
-  candidates_json = [
-    {
-      "id": c.id,
-      "title": c.title,
-      "category": c.category,
-      "type": c.type,
-      "location": {
-        "name": c.location.name,
-        "address": c.location.address,
-      },
-      "external": {"source": c.external.source, "url": c.external.url},
-      "price": c.roughPrice,
-      "rating": c.rating,
-      "description": c.description,
-    }
-    for c in raw_results[:8]
-  ]
-
-  category_hints = ", ".join(_load_metadata_categories()[:50])
-  normalized = normalize_intent(prefs.vibe, prefs.eventType)
-
-  return f"""
-You are helping people plan group events. Rank the supplied venue/event candidates and respond with JSON only.
-User preferences:
-- group size: {prefs.groupSize}
-- location: {prefs.location}
-- dates: {prefs.dateRange.label or (prefs.dateRange.startDate or '') + ' to ' + (prefs.dateRange.endDate or '')}
-- vibe: {prefs.vibe}
-- event type: {prefs.eventType}
-- budget: {prefs.budgetLevel or 'unknown'}
-- accessibility: step free needed = {prefs.accessibility.needsStepFree}
-Normalized intent hints: categories={normalized.get("categories")} tags={normalized.get("tags")}
-Category hints (use to improve matching): {category_hints}
-
-Candidate options (JSON):
-{json.dumps(candidates_json, ensure_ascii=False)}
-
-Return a JSON object with a single key "suggestions": a list of up to 5 entries. Each entry must include:
-- id (from candidate)
-- title
-- category
-- type ("venue" or "event")
-- recommendedFlow ("meals_drinks", "trip", or "general")
-- location: name and address if known
-- external: source and url
-- dateFitSummary
-- groupFitSummary
-- whySuitable
-- roughPrice
-Respond with valid JSON only and nothing else.
-""".strip()
+def _build_prompt(prefs: UserPreferences, raw_results: List[VenueCandidate]) -> RankingPrompt:
+  with span("llm.build_prompt", candidates=len(raw_results)) as prompt_span:
+    prompt = build_prompt(prefs, raw_results)
+    prompt_span.set_attribute("candidatesKept", len(prompt.candidates))
+    prompt_span.set_attribute("tokens", prompt.tokens)
+  PROMPT_STATS.record(prompt)
+  PROMPT_TOKENS.observe(prompt.tokens)
+  return prompt
+
+
+def _failure_kind(exc: Exception) -> str:
+  # JSON decode and pydantic validation errors are both ValueErrors: the model answered, badly.
+  return "parse_error" if isinstance(exc, ValueError) else "error"
+
+
+def _to_suggestion(item: dict, idx: int, prefix: str, prefs: UserPreferences) -> EnrichedSuggestion:
+  """Build an EnrichedSuggestion from one parsed suggestions[i] object."""
+  return EnrichedSuggestion(
+    id=item.get("id", f"{prefix}-{idx}"),
+    title=item.get("title", "Suggested option"),
+    category=item.get("category"),
+    type=item.get("type", "venue"),
+    recommendedFlow=item.get("recommendedFlow", _resolve_flow(prefs)),  # type: ignore[arg-type]
+    location=SuggestionLocation(**(item.get("location") or {})),
+    external=ExternalRef(**(item.get("external") or {})),
+    dateFitSummary=item.get("dateFitSummary"),
+    groupFitSummary=item.get("groupFitSummary"),
+    whySuitable=_clean_why(item.get("whySuitable")),
+    roughPrice=item.get("roughPrice"),
+    imageUrl=item.get("imageUrl"),
+  )
+
+
+def _parse_suggestions(
+  text: str, prompt: RankingPrompt, prefs: UserPreferences, prefix: str
+) -> List[EnrichedSuggestion]:
+  parsed = json.loads(text or "{}")
+  suggestions = parsed.get("suggestions", [])
+  return [_to_suggestion(prompt.restore(item), idx, prefix, prefs) for idx, item in enumerate(suggestions)]
+
+
+async def _parse_stream(
+  chunks: AsyncIterator[str], prompt: RankingPrompt, prefs: UserPreferences, prefix: str
+) -> AsyncIterator[EnrichedSuggestion]:
+  parser = SuggestionStreamParser()
+  emitted = 0
+  async for chunk in chunks:
+    for item in parser.feed(chunk):
+      yield _to_suggestion(prompt.restore(item), emitted, prefix, prefs)
+      emitted += 1
+    if parser.done:
+      return
+
+
+@dataclass
+class RankStatus:
+  """Filled in by rank_and_annotate()/stream_rank_and_annotate(): answered stays False when the
+  model failed, returned nothing or was cut short, i.e. when the output isn't a full model ranking."""
+
+  answered: bool = False
 
 
 class LlmClient(ABC):
+  """Ranks provider candidates.
+
+  Backends implement rank() (and optionally stream_rank()), which raise on transport or parse
+  errors; rank_and_annotate()/stream_rank_and_annotate() wrap them with the deterministic fallback.
+  """
+
+  http_pool: HttpClientPool | None = None
+  model: str | None = None
+
+  @property
+  def name(self) -> str:
+    return self.__class__.__name__
+
+  def _client(self, url: str) -> httpx.AsyncClient:
+    return (self.http_pool or get_default_pool()).client_for(url)
+
+  def close(self) -> None:
+    """Release resources the client owns (not the shared HTTP pool); called when a registry is retired."""
+
   @abstractmethod
-  async def rank_and_annotate(
+  async def rank(self, user_query: UserPreferences, raw_results: List[VenueCandidate]) -> List[EnrichedSuggestion]:
+    raise NotImplementedError
+
+  async def stream_rank(
     self, user_query: UserPreferences, raw_results: List[VenueCandidate]
+  ) -> AsyncIterator[EnrichedSuggestion]:
+    """Yield suggestions one at a time; backends without token streaming yield the buffered ranking."""
+    for suggestion in await self.rank(user_query, raw_results):
+      yield suggestion
+
+  async def rank_and_annotate(
+    self, user_query: UserPreferences, raw_results: List[VenueCandidate], status: RankStatus | None = None
   ) -> List[EnrichedSuggestion]:
-    raise NotImplementedError
+    if not raw_results:
+      return []
+    with span("llm.rank_and_annotate", backend=self.name, candidates=len(raw_results)) as rank_span:
+      started = time.perf_counter()
+      try:
+        suggestions = await self.rank(user_query, raw_results)
+      except Exception as exc:
+        outcome = _failure_kind(exc)
+        LLM_RESULTS.inc(backend=self.name, outcome=outcome)
+        FALLBACKS.inc(path="fallback_rank")
+        rank_span.set_attribute("outcome", outcome)
+        rank_span.record_error(exc)
+        logger.warning("%s ranking failed: %s", self.name, exc)
+        return _fallback_rank(user_query, raw_results)
+      outcome = "ok" if suggestions else "empty"
+      LLM_SECONDS.observe(time.perf_counter() - started, backend=self.name)
+      LLM_RESULTS.inc(backend=self.name, outcome=outcome)
+      rank_span.set_attribute("outcome", outcome)
+      rank_span.set_attribute("suggestions", len(suggestions))
+      if status is not None:
+        status.answered = bool(suggestions)
+      return suggestions
+
+  async def stream_rank_and_annotate(
+    self, user_query: UserPreferences, raw_results: List[VenueCandidate], status: RankStatus | None = None
+  ) -> AsyncIterator[EnrichedSuggestion]:
+    if not raw_results:
+      return
+    with span("llm.rank_and_annotate", backend=self.name, candidates=len(raw_results), stream=True) as rank_span:
+      started = time.perf_counter()
+      emitted = 0
+      try:
+        async for suggestion in self.stream_rank(user_query, raw_results):
+          emitted += 1
+          rank_span.set_attribute("suggestions", emitted)
+          yield suggestion
+      except Exception as exc:
+        outcome = _failure_kind(exc)
+        LLM_RESULTS.inc(backend=self.name, outcome=outcome)
+        rank_span.set_attribute("outcome", outcome)
+        rank_span.record_error(exc)
+        logger.warning("%s streaming failed after %s suggestions: %s", self.name, emitted, exc)
+      else:
+        outcome = "ok" if emitted else "empty"
+        LLM_SECONDS.observe(time.perf_counter() - started, backend=self.name)
+        LLM_RESULTS.inc(backend=self.name, outcome=outcome)
+        rank_span.set_attribute("outcome", outcome)
+        if status is not None:
+          status.answered = bool(emitted)
+    if not emitted:
+      FALLBACKS.inc(path="fallback_rank")
+      for suggestion in _fallback_rank(user_query, raw_results):
+        yield suggestion
 
 
 class OllamaLlmClient(LlmClient):
-  def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3") -> None:
+  def __init__(
+    self, base_url: str = "http://localhost:11434", model: str = "llama3", http_pool: HttpClientPool | None = None
+  ) -> None:
     self.base_url = base_url.rstrip("/")
     self.model = model
+    self.http_pool = http_pool
 
-  async def rank_and_annotate(
+  async def rank(self, user_query: UserPreferences, raw_results: List[VenueCandidate]) -> List[EnrichedSuggestion]:
+    prompt = _build_prompt(user_query, raw_results)
+    payload = {"model": self.model, "prompt": prompt.text, "stream": False}
+    url = f"{self.base_url}/api/generate"
+    client = self._client(url)
+    resp = await client.post(url, json=payload, timeout=30.0)
+    resp.raise_for_status()
+    data = resp.json()
+    return _parse_suggestions(data.get("response") or "", prompt, user_query, "ollama")
+
+  async def _stream_text(self, prompt: str) -> AsyncIterator[str]:
+    payload = {"model": self.model, "prompt": prompt, "stream": True}
+    url = f"{self.base_url}/api/generate"
+    async with self._client(url).stream("POST", url, json=payload, timeout=30.0) as resp:
+      resp.raise_for_status()
+      # Ollama streams one JSON object per line: {"response": "<text chunk>", "done": false}
+      async for line in resp.aiter_lines():
+        if not line.strip():
+          continue
+        chunk = json.loads(line)
+        yield chunk.get("response") or ""
+        if chunk.get("done"):
+          return
+
+  async def stream_rank(
     self, user_query: UserPreferences, raw_results: List[VenueCandidate]
-  ) -> List[EnrichedSuggestion]:
-    if not raw_results:
-      return []
+  ) -> AsyncIterator[EnrichedSuggestion]:
     prompt = _build_prompt(user_query, raw_results)
-    payload = {"model": self.model, "prompt": prompt, "stream": False}
-    try:
-      async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.post(f"{self.base_url}/api/generate", json=payload)
-        resp.raise_for_status()
-        data = resp.json()
-        content = data.get("response") or ""
-        parsed = json.loads(content)
-        suggestions = parsed.get("suggestions", [])
-        return [
-          EnrichedSuggestion(
-            id=item.get("id", f"ollama-{idx}"),
-            title=item.get("title", "Suggested option"),
-            category=item.get("category"),
-            type=item.get("type", "venue"),
-            recommendedFlow=item.get("recommendedFlow", _resolve_flow(user_query)),  # type: ignore[arg-type]
-            location=SuggestionLocation(**(item.get("location") or {})),
-            external=ExternalRef(**(item.get("external") or {})),
-            dateFitSummary=item.get("dateFitSummary"),
-            groupFitSummary=item.get("groupFitSummary"),
-            whySuitable=item.get("whySuitable"),
-            roughPrice=item.get("roughPrice"),
-            imageUrl=item.get("imageUrl"),
-          )
-          for idx, item in enumerate(suggestions)
-        ]
-    except Exception:
-      return _fallback_rank(user_query, raw_results)
+    chunks = self._stream_text(prompt.text)
+    async for suggestion in _parse_stream(chunks, prompt, user_query, "ollama"):
+      yield suggestion
 
 
 class HuggingFaceLlmClient(LlmClient):
-  def __init__(self, api_token: str, model: str = "tiiuae/falcon-7b-instruct") -> None:
+  def __init__(
+    self, api_token: str, model: str = "tiiuae/falcon-7b-instruct", http_pool: HttpClientPool | None = None
+  ) -> None:
     self.api_token = api_token
     self.model = model
+    self.http_pool = http_pool
     self.api_url = f"https://api-inference.huggingface.co/models/{model}"
 
-  async def rank_and_annotate(
-    self, user_query: UserPreferences, raw_results: List[VenueCandidate]
-  ) -> List[EnrichedSuggestion]:
-    if not raw_results:
-      return []
+  async def rank(self, user_query: UserPreferences, raw_results: List[VenueCandidate]) -> List[EnrichedSuggestion]:
     prompt = _build_prompt(user_query, raw_results)
     headers = {"Authorization": f"Bearer {self.api_token}"}
     payload = {
-      "inputs": prompt,
+      "inputs": prompt.text,
       "parameters": {"max_new_tokens": 400, "temperature": 0.2},
     }
-    try:
-      async with httpx.AsyncClient(timeout=30.0, headers=headers) as client:
-        resp = await client.post(self.api_url, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
-        if isinstance(data, list) and data and "generated_text" in data[0]:
-          text = data[0]["generated_text"]
-        else:
-          text = json.dumps(data)
-        parsed = json.loads(text)
-        suggestions = parsed.get("suggestions", [])
-        return [
-          EnrichedSuggestion(
-            id=item.get("id", f"huggingface-{idx}"),
-            title=item.get("title", "Suggested option"),
-            category=item.get("category"),
-            type=item.get("type", "venue"),
-            recommendedFlow=item.get("recommendedFlow", _resolve_flow(user_query)),  # type: ignore[arg-type]
-            location=SuggestionLocation(**(item.get("location") or {})),
-            external=ExternalRef(**(item.get("external") or {})),
-            dateFitSummary=item.get("dateFitSummary"),
-            groupFitSummary=item.get("groupFitSummary"),
-            whySuitable=_clean_why(item.get("whySuitable")),
-            roughPrice=item.get("roughPrice"),
-            imageUrl=item.get("imageUrl"),
-          )
-          for idx, item in enumerate(suggestions)
-        ]
-    except Exception:
-      return _fallback_rank(user_query, raw_results)
+    client = self._client(self.api_url)
+    resp = await client.post(self.api_url, json=payload, headers=headers, timeout=30.0)
+    resp.raise_for_status()
+    data = resp.json()
+    if isinstance(data, list) and data and "generated_text" in data[0]:
+      text = data[0]["generated_text"]
+    else:
+      text = json.dumps(data)
+    return _parse_suggestions(text, prompt, user_query, "huggingface")
 
 
 class GeminiLlmClient(LlmClient):
   # Default to a broadly available, fast model.
-  def __init__(self, api_key: str, model: str = "models/gemini-2.5-flash") -> None:
+  def __init__(
+    self, api_key: str, model: str = "models/gemini-2.5-flash", http_pool: HttpClientPool | None = None
+  ) -> None:
     self.api_key = api_key
     self.model = model
+    self.http_pool = http_pool
 
-  async def rank_and_annotate(
-    self, user_query: UserPreferences, raw_results: List[VenueCandidate]
-  ) -> List[EnrichedSuggestion]:
-    if not raw_results:
-      return []
-    prompt = _build_prompt(user_query, raw_results)
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent?key={self.api_key}"
-    payload = {
+  def _payload(self, prompt: str) -> dict:
+    return {
       "contents": [{"parts": [{"text": prompt}]}],
       "generationConfig": {"temperature": 0.2, "maxOutputTokens": 500},
     }
-    try:
-      async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.post(url, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
-        parts = (
-          data.get("candidates", [{}])[0]
-          .get("content", {})
-          .get("parts", [])
-        )
-        text = ""
-        for part in parts:
-          if isinstance(part, dict) and "text" in part:
-            text += part["text"]
-        parsed = json.loads(text or "{}")
-        suggestions = parsed.get("suggestions", [])
-        return [
-          EnrichedSuggestion(
-            id=item.get("id", f"gemini-{idx}"),
-            title=item.get("title", "Suggested option"),
-            category=item.get("category"),
-            type=item.get("type", "venue"),
-            recommendedFlow=item.get("recommendedFlow", _resolve_flow(user_query)),  # type: ignore[arg-type]
-            location=SuggestionLocation(**(item.get("location") or {})),
-            external=ExternalRef(**(item.get("external") or {})),
-            dateFitSummary=item.get("dateFitSummary"),
-            groupFitSummary=item.get("groupFitSummary"),
-            whySuitable=_clean_why(item.get("whySuitable")),
-            roughPrice=item.get("roughPrice"),
-            imageUrl=item.get("imageUrl"),
-          )
-          for idx, item in enumerate(suggestions)
-        ]
-    except Exception:
-      return _fallback_rank(user_query, raw_results)
-
-
-def get_llm_client() -> LlmClient:
-  backend = os.getenv("AI_BACKEND", "ollama").lower()
+
+  @staticmethod
+  def _candidate_text(data: dict) -> str:
+    parts = (
+      data.get("candidates", [{}])[0]
+      .get("content", {})
+      .get("parts", [])
+    )
+    text = ""
+    for part in parts:
+      if isinstance(part, dict) and "text" in part:
+        text += part["text"]
+    return text
+
+  async def rank(self, user_query: UserPreferences, raw_results: List[VenueCandidate]) -> List[EnrichedSuggestion]:
+    prompt = _build_prompt(user_query, raw_results)
+    url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent?key={self.api_key}"
+    client = self._client(url)
+    resp = await client.post(url, json=self._payload(prompt.text), timeout=30.0)
+    resp.raise_for_status()
+    return _parse_suggestions(self._candidate_text(resp.json()), prompt, user_query, "gemini")
+
+  async def _stream_text(self, prompt: str) -> AsyncIterator[str]:
+    url = (
+      f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:streamGenerateContent"
+      f"?alt=sse&key={self.api_key}"
+    )
+    async with self._client(url).stream("POST", url, json=self._payload(prompt), timeout=30.0) as resp:
+      resp.raise_for_status()
+      # Server-sent events: each "data:" line is a partial GenerateContentResponse.
+      async for line in resp.aiter_lines():
+        if line.startswith("data:"):
+          yield self._candidate_text(json.loads(line[5:]))
+
+  async def stream_rank(
+    self, user_query: UserPreferences, raw_results: List[VenueCandidate]
+  ) -> AsyncIterator[EnrichedSuggestion]:
+    prompt = _build_prompt(user_query, raw_results)
+    chunks = self._stream_text(prompt.text)
+    async for suggestion in _parse_stream(chunks, prompt, user_query, "gemini"):
+      yield suggestion
+
+
+def get_llm_client(http_pool: HttpClientPool | None = None, backend: str | None = None) -> LlmClient:
+  """Build the remote LLM client for backend (default AI_BACKEND); local/hybrid live in llm.local."""
+  backend = (backend or os.getenv("AI_BACKEND", "ollama")).lower()
   if backend in ("gemini", "google"):
     token = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_GEMINI_API_KEY")
     model = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
     if not token:
       raise RuntimeError("GEMINI_API_KEY is required for Gemini backend")
-    return GeminiLlmClient(api_key=token, model=model)
+    return GeminiLlmClient(api_key=token, model=model, http_pool=http_pool)
   if backend == "huggingface":
     token = os.getenv("HUGGINGFACE_API_TOKEN")
     model = os.getenv("HUGGINGFACE_MODEL", "tiiuae/falcon-7b-instruct")
     if not token:
       raise RuntimeError("HUGGINGFACE_API_TOKEN is required for Hugging Face backend")
-    return HuggingFaceLlmClient(api_token=token, model=model)
+    return HuggingFaceLlmClient(api_token=token, model=model, http_pool=http_pool)
 
   model = os.getenv("OLLAMA_MODEL", "llama3")
   host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
-  return OllamaLlmClient(base_url=host, model=model)
+  return OllamaLlmClient(base_url=host, model=model, http_pool=http_pool)
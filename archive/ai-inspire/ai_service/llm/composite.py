@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Callable, Dict, List, Tuple
+
+from ai_service.llm.client import LlmClient
+from ai_service.models import EnrichedSuggestion, UserPreferences, VenueCandidate
+from ai_service.resilience import CircuitBreaker, CircuitOpenError
+
+logger = logging.getLogger("ai_inspire_service")
+
+# Hedge delay used until a backend has enough successful calls for a p95.
+MIN_LATENCY_SAMPLES = 5
+
+
+class _Attempt:
+  """One backend's in-flight stream, pumped into the shared queue by a task."""
+
+  def __init__(self, backend: LlmClient, breaker: CircuitBreaker, started: float) -> None:
+    self.backend = backend
+    self.breaker = breaker
+    self.started = started
+    self.task: "asyncio.Task[None] | None" = None
+
+
+class CompositeLlmClient(LlmClient):
+  """Try an ordered list of backends, skipping any whose circuit breaker is open.
+
+  A backend that fails before its first suggestion hands over to the next one. With hedging on,
+  the next backend is also started when the current one hasn't produced a suggestion within its
+  p95 time-to-first-suggestion; whichever emits a valid suggestion first wins and the others are
+  cancelled. Once a backend has won, its errors are not retried elsewhere (suggestions already
+  went out), they end the stream.
+  """
+
+  def __init__(
+    self,
+    backends: List[LlmClient],
+    breakers: List[CircuitBreaker] | None = None,
+    hedge: bool = False,
+    hedge_delay: float = 4.0,
+    clock: Callable[[], float] = time.monotonic,
+  ) -> None:
+    if not backends:
+      raise ValueError("CompositeLlmClient needs at least one backend")
+    self.backends = backends
+    self.breakers = breakers or [CircuitBreaker(backend.name) for backend in backends]
+    self.hedge = hedge
+    self.hedge_delay = hedge_delay
+    self.clock = clock
+    self.http_pool = backends[0].http_pool
+    self.model = ",".join(str(backend.model) for backend in backends)
+    self.hedges = 0
+    self.hedge_wins = 0
+    self.failovers = 0
+
+  @property
+  def name(self) -> str:
+    return f"Failover({', '.join(backend.name for backend in self.backends)})"
+
+  def _delay(self, breaker: CircuitBreaker) -> float:
+    p95 = breaker.p95(min_samples=MIN_LATENCY_SAMPLES)
+    return self.hedge_delay if p95 is None else max(0.05, p95)
+
+  async def rank(self, user_query: UserPreferences, raw_results: List[VenueCandidate]) -> List[EnrichedSuggestion]:
+    return [suggestion async for suggestion in self.stream_rank(user_query, raw_results)]
+
+  async def stream_rank(
+    self, user_query: UserPreferences, raw_results: List[VenueCandidate]
+  ) -> AsyncIterator[EnrichedSuggestion]:
+    queue: "asyncio.Queue[Tuple[_Attempt, str, object]]" = asyncio.Queue()
+    remaining = list(zip(self.backends, self.breakers))
+    running: Dict[int, _Attempt] = {}
+    errors: List[str] = []
+
+    async def pump(attempt: _Attempt) -> None:
+      try:
+        async for suggestion in attempt.backend.stream_rank(user_query, raw_results):
+          await queue.put((attempt, "item", suggestion))
+        await queue.put((attempt, "done", None))
+      except Exception as exc:
+        await queue.put((attempt, "error", exc))
+
+    def launch() -> bool:
+      while remaining:
+        backend, breaker = remaining.pop(0)
+        if not breaker.allow():
+          errors.append(f"{backend.name}: circuit open")
+          continue
+        attempt = _Attempt(backend, breaker, self.clock())
+        attempt.task = asyncio.ensure_future(pump(attempt))
+        running[id(attempt)] = attempt
+        return True
+      return False
+
+    def abandon(attempt: _Attempt) -> None:
+      running.pop(id(attempt), None)
+      if attempt.task is not None:
+        attempt.task.cancel()
+      attempt.breaker.release()
+
+    winner: _Attempt | None = None
+    if not launch():
+      raise CircuitOpenError(f"No LLM backend available ({'; '.join(errors)})")
+    try:
+      while True:
+        hedging = self.hedge and winner is None and bool(remaining)
+        primary = next(iter(running.values()), None)
+        timeout = None
+        if hedging and running:
+          # One absolute deadline per attempt, counted from when the newest one started, so events
+          # that don't settle the race (a slow trickle, leftovers) can't keep pushing the hedge back.
+          newest = next(reversed(running.values()))
+          timeout = newest.started + self._delay(newest.breaker) - self.clock()
+        try:
+          if timeout is not None and timeout <= 0:
+            attempt, kind, payload = queue.get_nowait()
+          else:
+            attempt, kind, payload = await asyncio.wait_for(queue.get(), timeout)
+        except (asyncio.TimeoutError, asyncio.QueueEmpty):
+          if launch():
+            self.hedges += 1
+          continue
+        if id(attempt) not in running:
+          continue  # leftovers from a cancelled attempt
+        elapsed = self.clock() - attempt.started
+
+        if kind == "item":
+          if winner is None:
+            winner = attempt
+            attempt.breaker.record_success(elapsed)
+            if attempt is not primary:
+              self.hedge_wins += 1
+            for other in list(running.values()):
+              if other is not attempt:
+                abandon(other)
+          yield payload
+          continue
+
+        running.pop(id(attempt), None)
+        if attempt is winner:
+          if kind == "error":
+            raise payload  # type: ignore[misc]
+          return
+        # Finished or failed without a single suggestion: count it against the backend, move on.
+        attempt.breaker.record_failure(elapsed)
+        reason = payload if kind == "error" else "empty answer"
+        errors.append(f"{attempt.backend.name}: {reason}")
+        logger.warning("LLM backend %s gave no suggestions: %s", attempt.backend.name, reason)
+        if launch():
+          self.failovers += 1
+        elif not running:
+          raise RuntimeError(f"All LLM backends failed ({'; '.join(errors)})")
+    finally:
+      for attempt in list(running.values()):
+        abandon(attempt)
+
+  def stats(self) -> dict:
+    """Per-backend stats (e.g. cache) keyed by backend name."""
+    return {backend.name: backend.stats() for backend in self.backends if hasattr(backend, "stats")}
+
+  def close(self) -> None:
+    for backend in self.backends:
+      backend.close()
+
+  def breaker_stats(self) -> dict:
+    return {
+      "hedge": self.hedge,
+      "hedges": self.hedges,
+      "hedgeWins": self.hedge_wins,
+      "failovers": self.failovers,
+      "backends": {breaker.name: breaker.stats() for breaker in self.breakers},
+    }
@@ -0,0 +1,130 @@
+import logging
+import os
+from typing import AsyncIterator, List
+
+from ai_service.geocoding import NO_COORDINATES, Coordinates, Geocoder
+from ai_service.http_pool import HttpClientPool
+from ai_service.llm.cache import wrap_llm_with_cache
+from ai_service.llm.client import LlmClient, _fallback_rank, get_llm_client
+from ai_service.llm.composite import CompositeLlmClient
+from ai_service.models import EnrichedSuggestion, UserPreferences, VenueCandidate
+from ai_service.ranking import rank_candidates
+from ai_service.resilience import CircuitBreaker
+
+logger = logging.getLogger("ai_inspire_service")
+
+
+class LocalRankerClient(LlmClient):
+  """Rank candidates with the deterministic scorer in ai_service.ranking; no network round trip."""
+
+  model = "local"
+
+  def __init__(self, geocoder: Geocoder | None = None) -> None:
+    self.geocoder = geocoder
+
+  async def _centre(self, prefs: UserPreferences) -> Coordinates:
+    # Providers geocode the same location first, so this is normally a memory hit.
+    if self.geocoder is None:
+      return NO_COORDINATES
+    try:
+      return await self.geocoder.geocode(prefs.location)
+    except Exception as exc:
+      logger.warning("Local ranker could not geocode %s: %s", prefs.location, exc)
+      return NO_COORDINATES
+
+  async def shortlist(
+    self, prefs: UserPreferences, raw_results: List[VenueCandidate], limit: int
+  ) -> List[VenueCandidate]:
+    return rank_candidates(prefs, raw_results, await self._centre(prefs), limit=limit)
+
+  async def rank(self, user_query: UserPreferences, raw_results: List[VenueCandidate]) -> List[EnrichedSuggestion]:
+    return _fallback_rank(user_query, raw_results, await self._centre(user_query))
+
+
+class HybridLlmClient(LlmClient):
+  """Pre-rank locally and send only the best candidates to the LLM, keeping prompts short and focused."""
+
+  def __init__(self, local: LocalRankerClient, llm: LlmClient, shortlist: int = 8) -> None:
+    self.local = local
+    self.llm = llm
+    self.shortlist_size = shortlist
+    self.http_pool = llm.http_pool
+    self.model = llm.model
+
+  @property
+  def name(self) -> str:
+    return f"Hybrid({self.llm.name})"
+
+  async def rank(self, user_query: UserPreferences, raw_results: List[VenueCandidate]) -> List[EnrichedSuggestion]:
+    shortlist = await self.local.shortlist(user_query, raw_results, self.shortlist_size)
+    return await self.llm.rank(user_query, shortlist)
+
+  async def stream_rank(
+    self, user_query: UserPreferences, raw_results: List[VenueCandidate]
+  ) -> AsyncIterator[EnrichedSuggestion]:
+    shortlist = await self.local.shortlist(user_query, raw_results, self.shortlist_size)
+    async for suggestion in self.llm.stream_rank(user_query, shortlist):
+      yield suggestion
+
+  def stats(self) -> dict:
+    return self.llm.stats() if hasattr(self.llm, "stats") else {}
+
+  def breaker_stats(self) -> dict:
+    return self.llm.breaker_stats() if hasattr(self.llm, "breaker_stats") else {}
+
+  def close(self) -> None:
+    self.llm.close()
+
+
+def _llm_breaker(name: str) -> CircuitBreaker:
+  slow = float(os.getenv("LLM_BREAKER_SLOW_SECONDS", "20"))
+  return CircuitBreaker(
+    name,
+    window=int(os.getenv("LLM_BREAKER_WINDOW", "20")),
+    min_calls=int(os.getenv("LLM_BREAKER_MIN_CALLS", "5")),
+    failure_ratio=float(os.getenv("LLM_BREAKER_FAILURE_RATIO", "0.5")),
+    slow_seconds=slow if slow > 0 else None,
+    cooldown=float(os.getenv("LLM_BREAKER_COOLDOWN", "30")),
+  )
+
+
+def build_remote_llm(http_pool: HttpClientPool | None, backends: str) -> LlmClient:
+  """One cached remote backend, or a CompositeLlmClient over a comma-separated list ("gemini,ollama")."""
+  names = [name.strip() for name in backends.split(",") if name.strip()]
+  if len(names) <= 1:
+    return wrap_llm_with_cache(get_llm_client(http_pool, names[0] if names else None))
+  clients: List[LlmClient] = []
+  for name in names:
+    try:
+      clients.append(wrap_llm_with_cache(get_llm_client(http_pool, name)))
+    except RuntimeError as exc:
+      logger.warning("Skipping LLM backend %s: %s", name, exc)
+  if not clients:
+    raise RuntimeError(f"No usable LLM backend in {backends!r}")
+  if len(clients) == 1:
+    return clients[0]
+  return CompositeLlmClient(
+    clients,
+    breakers=[_llm_breaker(client.name) for client in clients],
+    hedge=os.getenv("LLM_HEDGE", "false").lower() not in ("0", "false", "no"),
+    hedge_delay=float(os.getenv("LLM_HEDGE_DELAY", "4")),
+  )
+
+
+def build_llm_client(http_pool: HttpClientPool | None = None, geocoder: Geocoder | None = None) -> LlmClient:
+  """Select the ranking backend from AI_BACKEND: local, hybrid (local shortlist + LLM), or remote LLMs.
+
+  Remote backends may be a comma-separated failover list, e.g. AI_BACKEND=gemini,ollama.
+  """
+  backend = os.getenv("AI_BACKEND", "ollama").lower()
+  if backend == "local":
+    return LocalRankerClient(geocoder)
+  if backend == "hybrid":
+    local = LocalRankerClient(geocoder)
+    try:
+      llm = build_remote_llm(http_pool, os.getenv("HYBRID_LLM_BACKEND", "ollama"))
+    except RuntimeError as exc:
+      logger.warning("Hybrid ranking LLM unavailable (%s); ranking locally only.", exc)
+      return local
+    return HybridLlmClient(local, llm, shortlist=int(os.getenv("HYBRID_SHORTLIST", "8")))
+  return build_remote_llm(http_pool, backend)
@@ -0,0 +1,193 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from ai_service.catalogue import DATA_PATH as METADATA_PATH, get_catalogue
+from ai_service.intent_normalizer import normalize_intent
+from ai_service.models import UserPreferences, VenueCandidate
+
+MAX_CANDIDATES = 8
+MIN_CANDIDATES = 3
+MAX_HINTS = 12
+# Description lengths tried in turn while the prompt is over budget.
+DESCRIPTION_STEPS = (280, 120, 0)
+
+
+def prompt_token_budget() -> int:
+  return int(os.getenv("PROMPT_TOKEN_BUDGET", "900"))
+
+
+def estimate_tokens(text: str) -> int:
+  """Rough token count (about 4 characters per token for English JSON); good enough for budgeting."""
+  return (len(text) + 3) // 4
+
+
+def _truncate(text: str | None, limit: int) -> str | None:
+  if not text or limit <= 0:
+    return None
+  text = " ".join(text.split())
+  if len(text) <= limit:
+    return text
+  cut = text[:limit].rsplit(" ", 1)[0]
+  return cut.rstrip(",.;:") + "…"
+
+
+def category_hints(prefs: UserPreferences, limit: int = MAX_HINTS) -> List[str]:
+  """Names and categories of local ideas matching the request's vibe or event type, most relevant first.
+
+  Ideas that share no token with the request are left out rather than padding the prompt.
+  """
+  catalogue = get_catalogue(os.getenv("LOCAL_METADATA_PATH") or METADATA_PATH)
+  ideas = [idea for _score, idea in catalogue.select(prefs, limit)]
+  merged = [idea.get("name") for idea in ideas] + [idea.get("category") for idea in ideas]
+  return list(dict.fromkeys(item for item in merged if item))
+
+
+def _compact_candidate(short_id: str, cand: VenueCandidate, description_chars: int) -> dict:
+  """What the model needs to rank a candidate; urls and ids are restored from the candidate after parsing."""
+  entry = {
+    "id": short_id,
+    "title": cand.title,
+    "category": cand.category,
+    "type": cand.type,
+    "where": cand.location.address or cand.location.name,
+    "price": cand.roughPrice,
+    "rating": cand.rating,
+    "starts": cand.startTime,
+    "about": _truncate(cand.description, description_chars),
+  }
+  return {key: value for key, value in entry.items() if value not in (None, "")}
+
+
+@dataclass
+class RankingPrompt:
+  """A compacted ranking prompt plus the short-id mapping needed to read the answer."""
+
+  text: str
+  candidates: Dict[str, VenueCandidate] = field(default_factory=dict)
+
+  @property
+  def tokens(self) -> int:
+    return estimate_tokens(self.text)
+
+  def restore(self, item: dict) -> dict:
+    """Map a short id back to its candidate and refill the fields the prompt left out."""
+    cand = self.candidates.get(str(item.get("id")))
+    if cand is None:
+      return item
+    restored = {
+      "title": cand.title,
+      "category": cand.category,
+      "type": cand.type,
+      "location": cand.location.to_dict(),
+      "external": cand.external.to_dict(),
+      "roughPrice": cand.roughPrice,
+    }
+    restored.update({key: value for key, value in item.items() if value not in (None, "")})
+    restored["id"] = cand.id
+    # Provider links are authoritative; the model never saw them.
+    restored["location"] = cand.location.to_dict()
+    restored["external"] = cand.external.to_dict()
+    return restored
+
+
+def _render(prefs: UserPreferences, candidates: List[dict], hints: List[str]) -> str:
+  normalized = normalize_intent(prefs.vibe, prefs.eventType)
+  dates = prefs.dateRange.label or f"{prefs.dateRange.startDate or ''} to {prefs.dateRange.endDate or ''}"
+  lines = [
+    "You are helping people plan group events. Rank the supplied venue/event candidates and respond with JSON only.",
+    "User preferences:",
+    f"- group size: {prefs.groupSize}",
+    f"- location: {prefs.location}",
+    f"- dates: {dates}",
+    f"- vibe: {prefs.vibe}",
+    f"- event type: {prefs.eventType}",
+    f"- budget: {prefs.budgetLevel or 'unknown'}",
+    f"- accessibility: step free needed = {prefs.accessibility.needsStepFree}",
+  ]
+  if normalized.get("categories") or normalized.get("tags"):
+    lines.append(f"Normalized intent hints: categories={normalized.get('categories')} tags={normalized.get('tags')}")
+  if hints:
+    lines.append(f"Category hints (use to improve matching): {', '.join(hints)}")
+  lines += [
+    "",
+    "Candidate options (JSON):",
+    json.dumps(candidates, ensure_ascii=False, separators=(",", ":")),
+    "",
+    'Return a JSON object with a single key "suggestions": a list of up to 5 entries. Each entry must include:',
+    "- id (the candidate's id exactly as given, e.g. c1)",
+    '- recommendedFlow ("meals_drinks", "trip", or "general")',
+    "- dateFitSummary",
+    "- groupFitSummary",
+    "- whySuitable",
+    "Respond with valid JSON only and nothing else.",
+  ]
+  return "\n".join(lines)
+
+
+def build_prompt(
+  prefs: UserPreferences, raw_results: List[VenueCandidate], budget: int | None = None
+) -> RankingPrompt:
+  """Build the ranking prompt, compacting it step by step until it fits the token budget.
+
+  Null fields, urls and long ids are always left out. While over budget, hints go first, then
+  descriptions are shortened and dropped, then candidates are dropped from the tail.
+  """
+  budget = prompt_token_budget() if budget is None else budget
+  selected = list(raw_results[:MAX_CANDIDATES])
+  hints = category_hints(prefs)
+  hint_limits = [len(hints), len(hints) // 2, 0]
+  best: RankingPrompt | None = None
+  for description_chars in DESCRIPTION_STEPS:
+    for hint_limit in hint_limits:
+      prompt = _make(prefs, selected, hints[:hint_limit], description_chars)
+      if prompt.tokens <= budget:
+        return prompt
+      best = prompt
+  while len(selected) > MIN_CANDIDATES:
+    selected.pop()
+    best = _make(prefs, selected, [], 0)
+    if best.tokens <= budget:
+      break
+  return best
+
+
+def _make(prefs: UserPreferences, selected: List[VenueCandidate], hints: List[str], description_chars: int) -> RankingPrompt:
+  ids = {f"c{idx + 1}": cand for idx, cand in enumerate(selected)}
+  compact = [_compact_candidate(short_id, cand, description_chars) for short_id, cand in ids.items()]
+  return RankingPrompt(text=_render(prefs, compact, hints), candidates=ids)
+
+
+class PromptStats:
+  """Running prompt-size figures for diagnostics."""
+
+  def __init__(self) -> None:
+    self.prompts = 0
+    self.tokens = 0
+    self.max_tokens = 0
+    self.last_tokens = 0
+    self.over_budget = 0
+
+  def record(self, prompt: RankingPrompt) -> None:
+    tokens = prompt.tokens
+    budget = prompt_token_budget()
+    self.prompts += 1
+    self.tokens += tokens
+    self.last_tokens = tokens
+    self.max_tokens = max(self.max_tokens, tokens)
+    if tokens > budget:
+      self.over_budget += 1
+
+  def stats(self) -> dict:
+    return {
+      "prompts": self.prompts,
+      "meanTokens": round(self.tokens / self.prompts, 1) if self.prompts else 0.0,
+      "maxTokens": self.max_tokens,
+      "lastTokens": self.last_tokens,
+      "overBudget": self.over_budget,
+      "budget": prompt_token_budget(),
+    }
+
+
+PROMPT_STATS = PromptStats()
@@ -0,0 +1,82 @@
+import json
+import logging
+from typing import List
+
+logger = logging.getLogger("ai_inspire_service")
+
+
+class SuggestionStreamParser:
+  """Incrementally parse {"suggestions": [{...}, ...]} from streamed LLM text.
+
+  feed() returns each suggestions[i] object as soon as its closing brace arrives, so callers
+  can render suggestions before the model has finished generating. A bare top-level array of
+  objects is accepted too, and any prose or code fences before the JSON are ignored.
+  """
+
+  def __init__(self) -> None:
+    self._text = ""
+    self._pos = 0
+    self._depth = 0
+    self._in_string = False
+    self._escape = False
+    self._string_start = 0
+    self._last_string: str | None = None
+    self._array_depth: int | None = None
+    self._object_start: int | None = None
+    self.done = False
+
+  def feed(self, chunk: str) -> List[dict]:
+    items: List[dict] = []
+    if self.done or not chunk:
+      return items
+    self._text += chunk
+    text = self._text
+    pos = self._pos
+    while pos < len(text):
+      char = text[pos]
+      if self._in_string:
+        if self._escape:
+          self._escape = False
+        elif char == "\\":
+          self._escape = True
+        elif char == '"':
+          self._in_string = False
+          if self._depth == 1 and self._array_depth is None:
+            self._last_string = text[self._string_start:pos]
+      elif char == '"':
+        self._in_string = True
+        self._string_start = pos + 1
+      elif char in "{[":
+        if self._array_depth is None and char == "[" and (
+          self._depth == 0 or (self._depth == 1 and self._last_string == "suggestions")
+        ):
+          self._array_depth = self._depth + 1
+        elif char == "{" and self._array_depth is not None and self._depth == self._array_depth:
+          self._object_start = pos
+        self._depth += 1
+      elif char in "}]":
+        self._depth -= 1
+        if self._array_depth is not None:
+          if char == "}" and self._depth == self._array_depth and self._object_start is not None:
+            try:
+              item = json.loads(text[self._object_start:pos + 1])
+              if isinstance(item, dict):
+                items.append(item)
+            except ValueError:
+              logger.warning("Skipping unparseable streamed suggestion")
+            self._object_start = None
+          elif char == "]" and self._depth == self._array_depth - 1:
+            self.done = True
+            break
+      pos += 1
+
+    # Drop consumed text that can't be part of an open object so the buffer stays small.
+    keep_from = self._object_start if self._object_start is not None else pos
+    if self._in_string and self._object_start is None:
+      keep_from = min(keep_from, self._string_start)
+    self._text = text[keep_from:]
+    self._pos = pos - keep_from
+    self._string_start -= keep_from
+    if self._object_start is not None:
+      self._object_start -= keep_from
+    return items
@@ -1,23 +1,32 @@
 import asyncio
+import hmac
+import json
 import logging
 import os
-import random
-from typing import List
-from urllib.parse import quote
+import signal
+import time
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-
-from ai_service.llm import get_llm_client
-from ai_service.models import (
-  UserPreferences,
-  SuggestEventsResponse,
-  EnrichedSuggestion,
-  VenueCandidate,
-  SuggestionLocation,
-  ExternalRef,
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from ai_service.cache import SingleFlight, TtlLruCache, preferences_key
+from ai_service.deadline import request_deadline_seconds
+from ai_service.http_pool import build_http_pool
+from ai_service.metrics import (
+  COALESCED_REQUESTS,
+  PROVIDER_CIRCUIT_OPEN,
+  PROVIDER_QUOTA_REMAINING,
+  PROVIDER_QUOTA_USED,
+  REGISTRY,
+  REQUEST_SECONDS,
+  Timeline,
 )
-from ai_service.providers import build_providers, VenueProvider
+from ai_service.models import UserPreferences, SuggestEventsResponse
+from ai_service.pipeline import ResponseCaches, run_suggestions, stream_suggestions
+from ai_service.registry import build_registry, reload_registry
+from ai_service.tracing import TRACER
 from dotenv import load_dotenv
 
 # Load .env file when running locally so provider/LLM keys are picked up.
@@ -28,10 +37,57 @@ load_dotenv(".env.local")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("ai_inspire_service")
 
+
+def _build_response_caches(app: FastAPI) -> None:
+  ttl = float(os.getenv("RESPONSE_CACHE_TTL", "600"))
+  max_entries = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+  max_bytes = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+  app.state.response_caches = ResponseCaches(
+    candidate_pool=TtlLruCache(max_entries=max_entries, ttl=ttl, max_bytes=max_bytes),
+    response=TtlLruCache(max_entries=max_entries, ttl=ttl, max_bytes=max_bytes),
+  )
+
+
+def _reload(app: FastAPI) -> None:
+  retired = app.state.registry
+  app.state.registry = reload_registry(retired, app.state.http_pool)
+  # Results produced with the old providers/keys should not outlive them.
+  app.state.response_caches.clear()
+  # Requests already running hold the old registry until their deadline; close its SQLite
+  # connections once they are done instead of leaking one set per reload.
+  asyncio.get_running_loop().call_later(request_deadline_seconds(), retired.close)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  # One keep-alive client pool per upstream host for the lifetime of the process.
+  app.state.http_pool = build_http_pool()
+  app.state.registry = build_registry(app.state.http_pool)
+  _build_response_caches(app)
+  # Identical /suggest-events requests in flight at the same time share one pipeline run.
+  app.state.suggest_flight = SingleFlight()
+  loop = asyncio.get_running_loop()
+  try:
+    # SIGHUP rebuilds providers/LLM from a fresh environment (key rotation without restart).
+    loop.add_signal_handler(signal.SIGHUP, _reload, app)
+  except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+    pass
+  try:
+    yield
+  finally:
+    try:
+      loop.remove_signal_handler(signal.SIGHUP)
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+      pass
+    app.state.registry.close()
+    await app.state.http_pool.aclose()
+
+
 app = FastAPI(
   title="Set The Date AI Inspire Service",
   version="0.1.0",
   description="Ranks venue and event ideas using LLMs plus provider data.",
+  lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -43,174 +99,106 @@ app.add_middleware(
 )
 
 
-def _prefilter_candidates(candidates: List[VenueCandidate]) -> List[VenueCandidate]:
-  seen = set()
-  filtered: List[VenueCandidate] = []
-  for cand in candidates:
-    key = cand.external.sourceId or cand.title.lower()
-    if key in seen:
-      continue
-    seen.add(key)
-    filtered.append(cand)
-  return filtered
-
-
-def _select_candidates(candidates: List[VenueCandidate], refresh_token: str | None, limit: int = 10) -> List[VenueCandidate]:
-  if not candidates:
-    return []
-  pool = list(candidates)
-  if refresh_token:
-    rng = random.Random(str(refresh_token))
-    rng.shuffle(pool)
-    start = abs(hash(str(refresh_token))) % len(pool)
-    pool = pool[start:] + pool[:start]
-  return pool[:limit]
-
-
-def _fallback_suggestions(prefs: UserPreferences) -> List[EnrichedSuggestion]:
-  """Return simple built-in suggestions when providers/LLM fail (useful for offline/dev)."""
-  vibe_lower = prefs.vibe.lower()
-  location_text = prefs.location or "nearby"
-  base = [
-    {
-      "title": "Local Pub Night",
-      "category": "pub",
-      "why": "Easy for a small group to meet up and grab drinks together.",
-      "flow": "meals_drinks",
-      "query": f"{location_text} pub",
-    },
-    {
-      "title": "Casual Dinner",
-      "category": "restaurant",
-      "why": "Sit-down spot that works for conversation and food.",
-      "flow": "meals_drinks",
-      "query": f"{location_text} restaurant",
-    },
-    {
-      "title": "Outdoor Walk",
-      "category": "outdoors",
-      "why": "Stretch your legs and catch up without needing a booking.",
-      "flow": "general",
-      "query": f"{location_text} park",
-    },
-  ]
-  if "music" in vibe_lower or "gig" in vibe_lower:
-    base.insert(
-      0,
-      {
-        "title": "Live Music Spot",
-        "category": "music",
-        "why": "Good pick if you want a band and a lively vibe.",
-        "flow": "general",
-        "query": f"{location_text} live music",
-      },
-    )
-  if "game" in vibe_lower or "board" in vibe_lower:
-    base.insert(
-      0,
-      {
-        "title": "Board Game Cafe",
-        "category": "games",
-        "why": "Tables, games, and snacks make it easy for everyone to join.",
-        "flow": "general",
-        "query": f"{location_text} board game cafe",
-      },
-    )
-
-  results: List[EnrichedSuggestion] = []
-  for idx, item in enumerate(base[:4]):
-    query = item["query"]
-    maps_url = f"https://www.google.com/maps/search/?api=1&query={quote(query)}"
-    results.append(
-      EnrichedSuggestion(
-        id=f"fallback-{idx}",
-        title=item["title"],
-        category=item["category"],
-        type="venue",
-        recommendedFlow=item["flow"],  # type: ignore[arg-type]
-        location=SuggestionLocation(name=location_text, address=None),
-        external=ExternalRef(source="fallback", url=maps_url, sourceId=None),
-        dateFitSummary="Good for your chosen dates",
-        groupFitSummary=f"Works for around {prefs.groupSize} people.",
-        whySuitable=item["why"],
-        roughPrice=None,
-        imageUrl=None,
-      )
-    )
-  return results
-
-
-async def _gather_provider_results(prefs: UserPreferences, providers: List[VenueProvider]) -> List[VenueCandidate]:
-  tasks = [provider.search(prefs) for provider in providers]
-  results: List[VenueCandidate] = []
-  if not tasks:
-    return results
-
-  gathered = await asyncio.gather(*tasks, return_exceptions=True)
-  for provider, outcome in zip(providers, gathered):
-    if isinstance(outcome, Exception):
-      logger.warning("Provider %s failed: %s", provider.__class__.__name__, outcome)
-      continue
-    results.extend(outcome)
-  return results
-
-
 @app.get("/health")
 async def health() -> dict:
   return {"ok": True}
 
 
-@app.post("/suggest-events", response_model=SuggestEventsResponse)
-async def suggest_events(payload: UserPreferences) -> SuggestEventsResponse:
-  providers = build_providers()
-  if not providers:
-    logger.warning("No providers configured; returning empty suggestion list.")
+@app.get("/diagnostics")
+async def diagnostics(request: Request) -> dict:
+  return {
+    "registry": request.app.state.registry.describe(),
+    "httpOrigins": request.app.state.http_pool.origins(),
+    "caches": request.app.state.response_caches.stats(),
+    "coalescedRequests": request.app.state.suggest_flight.coalesced,
+    "tracing": TRACER.describe(),
+  }
 
-  try:
-    raw_candidates = await _gather_provider_results(payload, providers)
-  except Exception as exc:
-    logger.exception("Provider lookup failed")
-    raise HTTPException(status_code=502, detail=f"Provider lookup failed: {exc}") from exc
 
-  # Widen candidate pool slightly on refresh attempts
-  max_results = 10
-  try:
-    refresh_level = max(0, min(3, int(payload.refreshToken or 0)))
-    max_results = 10 + (refresh_level * 2)
-  except Exception:
-    max_results = 10
+@app.get("/metrics")
+async def metrics(request: Request) -> PlainTextResponse:
+  """Prometheus text exposition; gauges are sampled from the live registry at scrape time."""
+  for provider in request.app.state.registry.providers:
+    quota = provider.quota_stats()
+    if quota is not None:
+      PROVIDER_QUOTA_USED.set(quota["quotaUsed"], provider=provider.name)
+      if quota["quotaRemaining"] is not None:
+        PROVIDER_QUOTA_REMAINING.set(quota["quotaRemaining"], provider=provider.name)
+    upstream = provider.upstream_stats()
+    if upstream is not None:
+      PROVIDER_CIRCUIT_OPEN.set(0 if upstream["state"] == "closed" else 1, provider=provider.name)
+  COALESCED_REQUESTS.set(request.app.state.suggest_flight.coalesced)
+  return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
-  raw_candidates = _select_candidates(_prefilter_candidates(raw_candidates), payload.refreshToken, limit=max_results)
-  llm = get_llm_client()
-  try:
-    suggestions = await llm.rank_and_annotate(payload, raw_candidates)
-  except Exception as exc:
-    logger.exception("LLM ranking failed")
-    suggestions = []
-
-  if not suggestions and raw_candidates:
-    # Fallback: return sanitized provider output even if LLM parsing failed.
-    for idx, cand in enumerate(raw_candidates[:5]):
-      suggestions.append(
-        EnrichedSuggestion(
-          id=cand.id or f"direct-{idx}",
-          title=cand.title,
-          category=cand.category,
-          type=cand.type,
-          recommendedFlow="general",
-          location=cand.location if isinstance(cand.location, SuggestionLocation) else SuggestionLocation(),
-          external=cand.external if isinstance(cand.external, ExternalRef) else ExternalRef(),
-          dateFitSummary=payload.dateRange.label or "Within your time window",
-          groupFitSummary=f"Good for {payload.groupSize} people.",
-          whySuitable=cand.description or f"Matches your vibe: {payload.vibe}",
-          roughPrice=cand.roughPrice,
-        )
-      )
-
-  if not suggestions:
-    suggestions = _fallback_suggestions(payload)
-
-  return SuggestEventsResponse(suggestions=suggestions or [])
+
+@app.post("/admin/reload")
+async def admin_reload(request: Request, x_admin_token: str | None = Header(default=None)) -> dict:
+  admin_token = os.getenv("ADMIN_TOKEN")
+  if not admin_token:
+    raise HTTPException(status_code=404, detail="Not found")
+  if not hmac.compare_digest((x_admin_token or "").encode("utf-8"), admin_token.encode("utf-8")):
+    raise HTTPException(status_code=403, detail="Invalid admin token")
+  _reload(request.app)
+  return request.app.state.registry.describe()
+
+
+def _flight_key(payload: UserPreferences, generation: int) -> tuple:
+  # Canonical preferences plus the exact refresh token; the generation keeps a reload from
+  # handing out results computed with the old providers/keys.
+  return preferences_key(payload, include_refresh=True) + (generation,)
+
+
+async def _run_timed(payload: UserPreferences, registry, caches) -> tuple:
+  timeline = Timeline()
+  return await run_suggestions(payload, registry, caches, timeline), timeline
+
+
+@app.post("/suggest-events", response_model=SuggestEventsResponse)
+async def suggest_events(payload: UserPreferences, request: Request, response: Response) -> SuggestEventsResponse:
+  started = time.perf_counter()
+  # Read the registry once so a concurrent reload cannot mix old and new clients mid-request.
+  registry = request.app.state.registry
+  caches = request.app.state.response_caches
+  result, timeline = await request.app.state.suggest_flight.do(
+    _flight_key(payload, registry.generation), lambda: _run_timed(payload, registry, caches)
+  )
+  # Coalesced requests report the stages of the run they joined.
+  response.headers["Server-Timing"] = timeline.header()
+  REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint="suggest-events")
+  return result
+
+
+def _ndjson(event: dict) -> bytes:
+  if event["event"] == "candidates":
+    body = {**event, "candidates": [cand.to_dict() for cand in event["candidates"]]}
+  elif event["event"] == "suggestion":
+    body = {"event": "suggestion", "suggestion": event["suggestion"].model_dump(mode="json")}
+  else:
+    body = {"event": event["event"], **event["response"].model_dump(mode="json")}
+  return (json.dumps(body, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+@app.post("/suggest-events/stream")
+async def suggest_events_stream(payload: UserPreferences, request: Request) -> StreamingResponse:
+  """NDJSON stream: "candidates" lines as providers finish, "suggestion" lines as the LLM ranks, then "suggestions"."""
+  registry = request.app.state.registry
+  caches = request.app.state.response_caches
+  flight = request.app.state.suggest_flight
+  key = _flight_key(payload, registry.generation)
+
+  async def body():
+    started = time.perf_counter()
+    if key in flight:
+      # An identical buffered request is already running: wait for its result instead of
+      # starting a second fan-out, and send just the final line.
+      response, _timeline = await flight.do(key, lambda: _run_timed(payload, registry, caches))
+      yield _ndjson({"event": "suggestions", "response": response})
+    else:
+      async for event in stream_suggestions(payload, registry, caches):
+        yield _ndjson(event)
+    REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint="suggest-events-stream")
+
+  return StreamingResponse(body(), media_type="application/x-ndjson")
 
 
 if __name__ == "__main__":
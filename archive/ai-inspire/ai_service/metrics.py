@@ -0,0 +1,211 @@
+import bisect
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Seconds; spans cache hits through the 20s proxy timeout.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+  return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+  parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+  if extra:
+    parts.append(extra)
+  return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+  if value == float("inf"):
+    return "+Inf"
+  return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+  kind = "untyped"
+
+  def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+    self.name = name
+    self.help = help_text
+    self.label_names = tuple(labels)
+
+  def _key(self, labels: Dict[str, str]) -> LabelValues:
+    return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+  def samples(self) -> List[str]:
+    raise NotImplementedError
+
+  def render(self) -> str:
+    lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+    return "\n".join(lines + self.samples())
+
+
+class Counter(_Metric):
+  kind = "counter"
+
+  def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+    super().__init__(name, help_text, labels)
+    self._values: Dict[LabelValues, float] = {}
+
+  def inc(self, amount: float = 1.0, **labels: str) -> None:
+    key = self._key(labels)
+    self._values[key] = self._values.get(key, 0.0) + amount
+
+  def value(self, **labels: str) -> float:
+    return self._values.get(self._key(labels), 0.0)
+
+  def samples(self) -> List[str]:
+    return [
+      f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+      for key, value in sorted(self._values.items())
+    ]
+
+
+class Gauge(Counter):
+  kind = "gauge"
+
+  def set(self, value: float, **labels: str) -> None:
+    self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+  kind = "histogram"
+
+  def __init__(
+    self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+  ) -> None:
+    super().__init__(name, help_text, labels)
+    self.buckets = tuple(sorted(buckets))
+    # Per label set: [per-bucket counts (non-cumulative, last slot is +Inf), sum]
+    self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+  def observe(self, value: float, **labels: str) -> None:
+    key = self._key(labels)
+    series = self._series.get(key)
+    if series is None:
+      series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+    series[0][bisect.bisect_left(self.buckets, value)] += 1
+    series[1][0] += value
+
+  def count(self, **labels: str) -> int:
+    series = self._series.get(self._key(labels))
+    return sum(series[0]) if series else 0
+
+  def samples(self) -> List[str]:
+    lines: List[str] = []
+    for key, (counts, total) in sorted(self._series.items()):
+      cumulative = 0
+      for bound, count in zip(self.buckets + (float("inf"),), counts):
+        cumulative += count
+        le = f'le="{_format_value(bound)}"'
+        lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+      lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(round(total[0], 6))}")
+      lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+    return lines
+
+
+class MetricsRegistry:
+  """In-process metrics rendered in the Prometheus text exposition format (version 0.0.4)."""
+
+  def __init__(self) -> None:
+    self._metrics: Dict[str, _Metric] = {}
+
+  def _register(self, metric: _Metric) -> _Metric:
+    if metric.name in self._metrics:
+      raise ValueError(f"Metric {metric.name} already registered")
+    self._metrics[metric.name] = metric
+    return metric
+
+  def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+    return self._register(Counter(name, help_text, labels))  # type: ignore[return-value]
+
+  def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+    return self._register(Gauge(name, help_text, labels))  # type: ignore[return-value]
+
+  def histogram(
+    self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+  ) -> Histogram:
+    return self._register(Histogram(name, help_text, labels, buckets))  # type: ignore[return-value]
+
+  def render(self) -> str:
+    return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+  "ai_inspire_request_seconds", "End-to-end /suggest-events latency.", ["endpoint"]
+)
+PROVIDER_SECONDS = REGISTRY.histogram(
+  "ai_inspire_provider_seconds", "Provider search latency by outcome (ok, error, timeout).", ["provider", "outcome"]
+)
+PROVIDER_RESULTS = REGISTRY.counter(
+  "ai_inspire_provider_results_total", "Candidates returned by each provider.", ["provider"]
+)
+PROVIDER_FAILURES = REGISTRY.counter(
+  "ai_inspire_provider_failures_total", "Provider searches that failed or hit their time budget.", ["provider", "kind"]
+)
+GEOCODE_SECONDS = REGISTRY.histogram(
+  "ai_inspire_geocode_seconds", "Upstream geocoding call latency.", ["outcome"]
+)
+LLM_SECONDS = REGISTRY.histogram(
+  "ai_inspire_llm_seconds", "LLM ranking latency, first request to last suggestion.", ["backend"]
+)
+LLM_RESULTS = REGISTRY.counter(
+  "ai_inspire_llm_results_total",
+  "LLM ranking outcomes (ok, parse_error, error, empty, timeout); parse_error/total is the parse-failure rate.",
+  ["backend", "outcome"],
+)
+LLM_CACHE_LOOKUPS = REGISTRY.counter(
+  "ai_inspire_llm_cache_lookups_total",
+  "LLM ranking cache lookups (memory_hit, disk_hit, miss); hits over all lookups is the hit rate.",
+  ["result"],
+)
+LLM_CACHE_SAVED_SECONDS = REGISTRY.counter(
+  "ai_inspire_llm_cache_saved_seconds_total", "Estimated LLM latency saved by cache hits (mean miss time per hit)."
+)
+PROMPT_TOKENS = REGISTRY.histogram(
+  "ai_inspire_prompt_tokens", "Estimated tokens per ranking prompt.", buckets=(250, 500, 750, 1000, 1500, 2000, 4000)
+)
+FALLBACKS = REGISTRY.counter(
+  "ai_inspire_fallbacks_total",
+  "Requests served by a fallback path: fallback_rank (LLM failed), direct (provider output), builtin.",
+  ["path"],
+)
+COALESCED_REQUESTS = REGISTRY.gauge(
+  "ai_inspire_coalesced_requests", "Requests that joined an identical in-flight request since start."
+)
+PROVIDER_QUOTA_USED = REGISTRY.gauge(
+  "ai_inspire_provider_quota_used", "Calls charged to each provider key today (UTC).", ["provider"]
+)
+PROVIDER_QUOTA_REMAINING = REGISTRY.gauge(
+  "ai_inspire_provider_quota_remaining", "Daily calls left per provider key, where a quota is configured.", ["provider"]
+)
+PROVIDER_CIRCUIT_OPEN = REGISTRY.gauge(
+  "ai_inspire_provider_circuit_open", "1 while a provider's circuit breaker is open or half open.", ["provider"]
+)
+
+
+class Timeline:
+  """Stage durations for one request, rendered as a Server-Timing header."""
+
+  def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+    self.clock = clock
+    self.started = clock()
+    self.stages: List[Tuple[str, float, str | None]] = []
+
+  def add(self, name: str, seconds: float, desc: str | None = None) -> None:
+    self.stages.append((name, seconds, desc))
+
+  def header(self) -> str:
+    entries = []
+    for name, seconds, desc in self.stages + [("total", self.clock() - self.started, None)]:
+      entry = f"{name};dur={seconds * 1000:.1f}"
+      if desc:
+        entry += f';desc="{_escape(desc)}"'
+      entries.append(entry)
+    return ", ".join(entries)
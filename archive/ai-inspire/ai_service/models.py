@@ -1,3 +1,4 @@
+from dataclasses import dataclass, field
 from typing import List, Optional, Literal
 from pydantic import BaseModel, Field
 
@@ -42,18 +43,85 @@ class ExternalRef(BaseModel):
   sourceId: Optional[str] = None
 
 
-class VenueCandidate(BaseModel):
-  """Raw venue or event record returned by a provider before LLM ranking."""
+@dataclass(slots=True)
+class CandidateLocation:
+  """Slotted counterpart of SuggestionLocation, used while candidates are being processed."""
+
+  name: Optional[str] = None
+  address: Optional[str] = None
+  lat: Optional[float] = None
+  lng: Optional[float] = None
+
+  def to_dict(self) -> dict:
+    return {"name": self.name, "address": self.address, "lat": self.lat, "lng": self.lng}
+
+  def to_model(self) -> SuggestionLocation:
+    return SuggestionLocation(name=self.name, address=self.address, lat=self.lat, lng=self.lng)
+
+
+@dataclass(slots=True)
+class CandidateRef:
+  """Slotted counterpart of ExternalRef, used while candidates are being processed."""
+
+  source: Optional[str] = None
+  url: Optional[str] = None
+  sourceId: Optional[str] = None
+
+  def to_dict(self) -> dict:
+    return {"source": self.source, "url": self.url, "sourceId": self.sourceId}
+
+  def to_model(self) -> ExternalRef:
+    return ExternalRef(source=self.source, url=self.url, sourceId=self.sourceId)
+
+
+@dataclass(slots=True)
+class VenueCandidate:
+  """Raw venue or event record returned by a provider before LLM ranking.
+
+  A slotted dataclass rather than a model: providers build hundreds per request and dedupe,
+  filtering and selection drop most of them, so validation is paid only by the EnrichedSuggestions
+  that are returned. Providers must pass values of the declared types.
+  """
 
   id: str
   title: str
   category: Optional[str] = None
   type: Literal["venue", "event"] = "venue"
-  location: SuggestionLocation = SuggestionLocation()
-  external: ExternalRef = ExternalRef()
+  location: CandidateLocation = field(default_factory=CandidateLocation)
+  external: CandidateRef = field(default_factory=CandidateRef)
   roughPrice: Optional[str] = None
   rating: Optional[float] = None
   description: Optional[str] = None
+  # Google-style 0-4 price level when the provider reports one.
+  priceLevel: Optional[int] = None
+  # ISO 8601 start time for events, used for date-fit scoring.
+  startTime: Optional[str] = None
+
+  def to_dict(self) -> dict:
+    """JSON-ready dict in the same shape the VenueCandidate model used to dump."""
+    return {
+      "id": self.id,
+      "title": self.title,
+      "category": self.category,
+      "type": self.type,
+      "location": self.location.to_dict(),
+      "external": self.external.to_dict(),
+      "roughPrice": self.roughPrice,
+      "rating": self.rating,
+      "description": self.description,
+      "priceLevel": self.priceLevel,
+      "startTime": self.startTime,
+    }
+
+  @classmethod
+  def from_dict(cls, data: dict) -> "VenueCandidate":
+    return cls(
+      **{
+        **data,
+        "location": CandidateLocation(**(data.get("location") or {})),
+        "external": CandidateRef(**(data.get("external") or {})),
+      }
+    )
 
 
 class EnrichedSuggestion(BaseModel):
@@ -75,3 +143,5 @@ class EnrichedSuggestion(BaseModel):
 
 class SuggestEventsResponse(BaseModel):
   suggestions: List[EnrichedSuggestion] = []
+  # Providers that timed out or failed, so the UI can hint that results may be partial.
+  droppedProviders: List[str] = []
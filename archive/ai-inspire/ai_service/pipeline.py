@@ -0,0 +1,382 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Tuple
+from urllib.parse import quote
+
+from ai_service.cache import TtlLruCache, preferences_key, refresh_level
+from ai_service.context import SearchContext
+from ai_service.deadline import Deadline, llm_stage_seconds, provider_stage_seconds, request_deadline
+from ai_service.llm import RankStatus
+from ai_service.metrics import (
+  FALLBACKS,
+  LLM_RESULTS,
+  PROVIDER_FAILURES,
+  PROVIDER_RESULTS,
+  PROVIDER_SECONDS,
+  Timeline,
+)
+from ai_service.models import (
+  UserPreferences,
+  SuggestEventsResponse,
+  EnrichedSuggestion,
+  VenueCandidate,
+  SuggestionLocation,
+  ExternalRef,
+)
+from ai_service.providers import VenueProvider
+from ai_service.ranking import rank_candidates
+from ai_service.registry import ServiceRegistry
+from ai_service.tracing import current_span, span
+
+logger = logging.getLogger("ai_inspire_service")
+
+
+@dataclass
+class ResponseCaches:
+  """Result caches in front of the pipeline; they outlive registry reloads but are cleared by them."""
+
+  # Deduplicated provider candidates per canonical preferences + refresh level, shared by every
+  # refreshToken at that level so each token still gets its own page from the same pool.
+  candidate_pool: TtlLruCache
+  # Final ranked responses per canonical preferences + exact refreshToken.
+  response: TtlLruCache
+
+  def clear(self) -> None:
+    self.candidate_pool.clear()
+    self.response.clear()
+
+  def stats(self) -> dict:
+    return {"candidatePool": self.candidate_pool.stats(), "response": self.response.stats()}
+
+
+def _candidate_key(cand: VenueCandidate) -> str:
+  return cand.external.sourceId or cand.title.lower()
+
+
+def _prefilter_candidates(candidates: List[VenueCandidate]) -> List[VenueCandidate]:
+  seen = set()
+  filtered: List[VenueCandidate] = []
+  for cand in candidates:
+    key = _candidate_key(cand)
+    if key in seen:
+      continue
+    seen.add(key)
+    filtered.append(cand)
+  return filtered
+
+
+def _select_candidates(candidates: List[VenueCandidate], refresh_token: str | None, limit: int = 10) -> List[VenueCandidate]:
+  if not candidates:
+    return []
+  pool = list(candidates)
+  if refresh_token:
+    rng = random.Random(str(refresh_token))
+    rng.shuffle(pool)
+    start = abs(hash(str(refresh_token))) % len(pool)
+    pool = pool[start:] + pool[:start]
+  return pool[:limit]
+
+
+def _fallback_suggestions(prefs: UserPreferences) -> List[EnrichedSuggestion]:
+  """Return simple built-in suggestions when providers/LLM fail (useful for offline/dev)."""
+  vibe_lower = prefs.vibe.lower()
+  location_text = prefs.location or "nearby"
+  base = [
+    {
+      "title": "Local Pub Night",
+      "category": "pub",
+      "why": "Easy for a small group to meet up and grab drinks together.",
+      "flow": "meals_drinks",
+      "query": f"{location_text} pub",
+    },
+    {
+      "title": "Casual Dinner",
+      "category": "restaurant",
+      "why": "Sit-down spot that works for conversation and food.",
+      "flow": "meals_drinks",
+      "query": f"{location_text} restaurant",
+    },
+    {
+      "title": "Outdoor Walk",
+      "category": "outdoors",
+      "why": "Stretch your legs and catch up without needing a booking.",
+      "flow": "general",
+      "query": f"{location_text} park",
+    },
+  ]
+  if "music" in vibe_lower or "gig" in vibe_lower:
+    base.insert(
+      0,
+      {
+        "title": "Live Music Spot",
+        "category": "music",
+        "why": "Good pick if you want a band and a lively vibe.",
+        "flow": "general",
+        "query": f"{location_text} live music",
+      },
+    )
+  if "game" in vibe_lower or "board" in vibe_lower:
+    base.insert(
+      0,
+      {
+        "title": "Board Game Cafe",
+        "category": "games",
+        "why": "Tables, games, and snacks make it easy for everyone to join.",
+        "flow": "general",
+        "query": f"{location_text} board game cafe",
+      },
+    )
+
+  results: List[EnrichedSuggestion] = []
+  for idx, item in enumerate(base[:4]):
+    query = item["query"]
+    maps_url = f"https://www.google.com/maps/search/?api=1&query={quote(query)}"
+    results.append(
+      EnrichedSuggestion(
+        id=f"fallback-{idx}",
+        title=item["title"],
+        category=item["category"],
+        type="venue",
+        recommendedFlow=item["flow"],  # type: ignore[arg-type]
+        location=SuggestionLocation(name=location_text, address=None),
+        external=ExternalRef(source="fallback", url=maps_url, sourceId=None),
+        dateFitSummary="Good for your chosen dates",
+        groupFitSummary=f"Works for around {prefs.groupSize} people.",
+        whySuitable=item["why"],
+        roughPrice=None,
+        imageUrl=None,
+      )
+    )
+  return results
+
+
+async def _iter_provider_results(
+  prefs: UserPreferences,
+  providers: List[VenueProvider],
+  context: SearchContext | None = None,
+  deadline: Deadline | None = None,
+) -> AsyncIterator[Tuple[int, VenueProvider, List[VenueCandidate] | None]]:
+  """Yield (index, provider, candidates) as each provider finishes; candidates is None when it was dropped.
+
+  Every provider is capped by its own budget and cancelled when that runs out. Behind a
+  CachedProvider the upstream fetch is shared through a SingleFlight, so it is cancelled too unless
+  another request or a background refresh is still waiting on it.
+  """
+  stage = deadline.budget(provider_stage_seconds()) if deadline else provider_stage_seconds()
+
+  async def bounded(idx: int, provider: VenueProvider):
+    budget = min(stage, provider.time_budget) if provider.time_budget else stage
+    started = time.perf_counter()
+    candidates = None
+    with span("provider.search", provider=provider.name, budgetSeconds=budget) as search_span:
+      try:
+        candidates = await asyncio.wait_for(provider.search(prefs, context), timeout=budget)
+        outcome = "ok"
+        PROVIDER_RESULTS.inc(len(candidates), provider=provider.name)
+        search_span.set_attribute("candidates", len(candidates))
+      except asyncio.TimeoutError as exc:
+        outcome = "timeout"
+        search_span.record_error(exc)
+        logger.warning("Provider %s dropped: exceeded its time budget", provider.name)
+      except Exception as exc:
+        outcome = "error"
+        search_span.record_error(exc)
+        logger.warning("Provider %s failed: %s", provider.name, exc)
+      search_span.set_attribute("outcome", outcome)
+    elapsed = time.perf_counter() - started
+    PROVIDER_SECONDS.observe(elapsed, provider=provider.name, outcome=outcome)
+    if outcome != "ok":
+      PROVIDER_FAILURES.inc(provider=provider.name, kind=outcome)
+    if context is not None and context.timeline is not None:
+      context.timeline.add(f"p-{provider.name}", elapsed, None if outcome == "ok" else outcome)
+    return idx, provider, candidates
+
+  # Tasks copy the current context, so each provider.search span is a child of this one.
+  with span("providers.gather", providers=len(providers), budgetSeconds=stage) as gather:
+    tasks = [asyncio.ensure_future(bounded(idx, provider)) for idx, provider in enumerate(providers)]
+    try:
+      for next_done in asyncio.as_completed(tasks):
+        result = await next_done
+        if result[2] is None:
+          gather.add("providersDropped")
+        else:
+          gather.add("candidates", len(result[2]))
+        yield result
+    finally:
+      # A streaming client that disconnects mid-fan-out shouldn't leave provider calls running.
+      for task in tasks:
+        task.cancel()
+
+
+def _direct_suggestions(prefs: UserPreferences, raw_candidates: List[VenueCandidate]) -> List[EnrichedSuggestion]:
+  """Sanitized provider output used when the LLM is unavailable, slow or unparseable."""
+  suggestions: List[EnrichedSuggestion] = []
+  for idx, cand in enumerate(rank_candidates(prefs, raw_candidates, limit=5)):
+    suggestions.append(
+      EnrichedSuggestion(
+        id=cand.id or f"direct-{idx}",
+        title=cand.title,
+        category=cand.category,
+        type=cand.type,
+        recommendedFlow="general",
+        location=cand.location.to_model(),
+        external=cand.external.to_model(),
+        dateFitSummary=prefs.dateRange.label or "Within your time window",
+        groupFitSummary=f"Good for {prefs.groupSize} people.",
+        whySuitable=cand.description or f"Matches your vibe: {prefs.vibe}",
+        roughPrice=cand.roughPrice,
+      )
+    )
+  return suggestions
+
+
+async def _rank(
+  prefs: UserPreferences,
+  registry: ServiceRegistry,
+  raw_candidates: List[VenueCandidate],
+  deadline: Deadline,
+  status: RankStatus,
+) -> AsyncIterator[EnrichedSuggestion]:
+  """Yield ranked suggestions as the LLM produces them, falling back when it yields nothing in budget.
+
+  status.answered is True only when the model finished its ranking within the LLM stage budget.
+  """
+  emitted = 0
+  llm_budget = deadline.budget(llm_stage_seconds(), reserve=0.25)
+  if registry.llm is not None and llm_budget > 0:
+    stage = Deadline(llm_budget, clock=deadline.clock)
+    ranked = registry.llm.stream_rank_and_annotate(prefs, raw_candidates, status)
+    try:
+      while True:
+        # Bound each step rather than wrapping the loop so the timeout never fires while we're yielding.
+        suggestion = await asyncio.wait_for(ranked.__anext__(), timeout=stage.remaining())
+        emitted += 1
+        yield suggestion
+    except StopAsyncIteration:
+      pass
+    except asyncio.TimeoutError:
+      status.answered = False
+      LLM_RESULTS.inc(backend=registry.llm.name, outcome="timeout")
+      logger.warning("LLM ranking exceeded its %.1fs budget after %s suggestions", llm_budget, emitted)
+    except Exception:
+      logger.exception("LLM ranking failed")
+    finally:
+      await ranked.aclose()
+
+  if emitted:
+    return
+  # Fallback: return sanitized provider output even if LLM parsing failed.
+  direct = _direct_suggestions(prefs, raw_candidates)
+  FALLBACKS.inc(path="direct" if direct else "builtin")
+  for suggestion in direct or _fallback_suggestions(prefs):
+    yield suggestion
+
+
+async def stream_suggestions(
+  prefs: UserPreferences, registry: ServiceRegistry, caches: ResponseCaches, timeline: Timeline | None = None
+) -> AsyncIterator[dict]:
+  """Run the suggestion pipeline, yielding events as work completes.
+
+  Emits {"event": "candidates", ...} with newly seen, deduplicated candidates as each provider
+  finishes, {"event": "suggestion", ...} for each ranked suggestion as the LLM produces it, then
+  a single {"event": "suggestions", "response": SuggestEventsResponse} with the full result.
+  Stage durations (cache, geocode, each provider, providers, llm) are recorded on `timeline`,
+  and the whole run is traced under one "suggest_events" span.
+  """
+  with span("suggest_events", refreshLevel=refresh_level(prefs)) as root:
+    async for event in _pipeline_events(prefs, registry, caches, timeline or Timeline()):
+      if event["event"] == "suggestions":
+        root.set_attribute("suggestions", len(event["response"].suggestions))
+      yield event
+
+
+async def _pipeline_events(
+  prefs: UserPreferences, registry: ServiceRegistry, caches: ResponseCaches, timeline: Timeline
+) -> AsyncIterator[dict]:
+  deadline = request_deadline()
+  trace = current_span()
+  response_key = preferences_key(prefs, include_refresh=True)
+  started = timeline.clock()
+  cached_response = caches.response.get(response_key)
+  timeline.add("cache", timeline.clock() - started, "miss" if cached_response is None else "hit")
+  trace.set_attribute("cache.response", "miss" if cached_response is None else "hit")
+  if cached_response is not None:
+    yield {"event": "suggestions", "response": cached_response}
+    return
+
+  # Widen candidate pool slightly on refresh attempts
+  level = refresh_level(prefs)
+  max_results = 10 + (level * 2)
+
+  # Providers widen their queries by refresh level, so the pool is shared per level.
+  pool_key = preferences_key(prefs) + (level,)
+  candidate_pool = caches.candidate_pool.get(pool_key)
+  trace.set_attribute("cache.candidatePool", "miss" if candidate_pool is None else "hit")
+  dropped: List[str] = []
+  if candidate_pool is not None:
+    yield {"event": "candidates", "provider": None, "candidates": candidate_pool}
+  else:
+    started = timeline.clock()
+    # Shared per-request state: the location is geocoded at most once for all providers.
+    context = SearchContext.for_request(prefs, registry.geocoder, timeline)
+    by_index: dict = {}
+    seen = set()
+    async for idx, provider, candidates in _iter_provider_results(prefs, registry.providers, context, deadline):
+      if candidates is None:
+        dropped.append(provider.name)
+        continue
+      by_index[idx] = candidates
+      fresh = []
+      for cand in candidates:
+        key = _candidate_key(cand)
+        if key not in seen:
+          seen.add(key)
+          fresh.append(cand)
+      if fresh:
+        yield {"event": "candidates", "provider": provider.name, "candidates": fresh}
+    # The pool is assembled in provider order (not arrival order) so refresh pages stay stable.
+    raw_candidates: List[VenueCandidate] = []
+    for idx in sorted(by_index):
+      raw_candidates.extend(by_index[idx])
+    candidate_pool = _prefilter_candidates(raw_candidates)
+    trace.set_attribute("candidates.duplicatesDropped", len(raw_candidates) - len(candidate_pool))
+    # Partial pools are not cached so the next request gets another chance at the slow providers.
+    if candidate_pool and not dropped:
+      caches.candidate_pool.set(pool_key, candidate_pool)
+    timeline.add("providers", timeline.clock() - started, f"{len(candidate_pool)} candidates")
+
+  raw_candidates = _select_candidates(candidate_pool, prefs.refreshToken, limit=max_results)
+  trace.set_attribute("candidates.pool", len(candidate_pool))
+  trace.set_attribute("candidates.selected", len(raw_candidates))
+  suggestions: List[EnrichedSuggestion] = []
+  status = RankStatus()
+  started = timeline.clock()
+  async for suggestion in _rank(prefs, registry, raw_candidates, deadline, status):
+    suggestions.append(suggestion)
+    yield {"event": "suggestion", "suggestion": suggestion}
+  timeline.add("llm", timeline.clock() - started)
+
+  response = SuggestEventsResponse(suggestions=suggestions or [], droppedProviders=dropped)
+  trace.set_attribute("llm.answered", status.answered)
+  if raw_candidates and not dropped and status.answered:
+    # Partial or fallback responses (a dropped provider, an LLM error or timeout) are not cached, so
+    # an outage doesn't stick for the TTL and the next request gets another chance.
+    caches.response.set(response_key, response)
+  yield {"event": "suggestions", "response": response}
+
+
+async def run_suggestions(
+  prefs: UserPreferences, registry: ServiceRegistry, caches: ResponseCaches, timeline: Timeline | None = None
+) -> SuggestEventsResponse:
+  """Buffered wrapper over stream_suggestions used by /suggest-events."""
+  response: SuggestEventsResponse | None = None
+  async for event in stream_suggestions(prefs, registry, caches, timeline):
+    if event["event"] == "suggestions":
+      response = event["response"]
+  if response is None:
+    FALLBACKS.inc(path="builtin")
+    return SuggestEventsResponse(suggestions=_fallback_suggestions(prefs))
+  return response
@@ -1,11 +1,20 @@
+from ai_service.providers.base import VenueProvider
+from ai_service.providers.local_metadata import LocalMetadataProvider
 from ai_service.providers.venues import (
-  VenueProvider,
   GooglePlacesProvider,
   EventbriteProvider,
   MeetupProvider,
   FacebookEventsProvider,
   build_providers,
 )
+from ai_service.providers.cache import (
+  CandidateStore,
+  MemoryCandidateStore,
+  SqliteCandidateStore,
+  CachedProvider,
+  build_candidate_store,
+  wrap_with_cache,
+)
 
 __all__ = [
   "VenueProvider",
@@ -13,5 +22,12 @@ __all__ = [
   "EventbriteProvider",
   "MeetupProvider",
   "FacebookEventsProvider",
+  "LocalMetadataProvider",
   "build_providers",
+  "CandidateStore",
+  "MemoryCandidateStore",
+  "SqliteCandidateStore",
+  "CachedProvider",
+  "build_candidate_store",
+  "wrap_with_cache",
 ]
@@ -0,0 +1,74 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+import httpx
+
+from ai_service.context import SearchContext
+from ai_service.http_pool import HttpClientPool, get_default_pool
+from ai_service.models import UserPreferences, VenueCandidate
+from ai_service.rate_limit import RateLimiter, get_rate_limiter
+from ai_service.resilience import ResilientUpstream, provider_upstream
+
+
+class VenueProvider(ABC):
+  """Provider interface for fetching candidate venues or events."""
+
+  http_pool: HttpClientPool | None = None
+  # Seconds a result set stays fresh in the provider cache (see providers/cache.py).
+  cache_ttl: float = 900.0
+  # Longest this provider may hold up a request; None means the whole provider stage budget.
+  time_budget: float | None = None
+  # Client-side limits per API key (see rate_limit.py); None means unlimited.
+  rate_per_second: float | None = None
+  rate_burst: float = 10.0
+  daily_quota: int | None = None
+  _upstream: ResilientUpstream | None = None
+  _limiter: RateLimiter | None = None
+
+  @property
+  def name(self) -> str:
+    return self.__class__.__name__
+
+  def _client(self, url: str) -> httpx.AsyncClient:
+    """Shared keep-alive client for url; falls back to the module pool outside the app lifespan."""
+    return (self.http_pool or get_default_pool()).client_for(url)
+
+  @property
+  def upstream(self) -> ResilientUpstream:
+    """Circuit breaker, retry budget and backoff shared by every call this provider makes."""
+    if self._upstream is None:
+      self._upstream = provider_upstream(self.name)
+    return self._upstream
+
+  def _credential(self) -> str:
+    """The API key the provider's quota is charged to."""
+    return getattr(self, "api_key", "") or ""
+
+  @property
+  def rate_limiter(self) -> RateLimiter:
+    if self._limiter is None:
+      self._limiter = get_rate_limiter(
+        self.name, self._credential(), self.rate_per_second, self.rate_burst, self.daily_quota
+      )
+    return self._limiter
+
+  async def _get(self, url: str, **kwargs) -> httpx.Response:
+    """GET through the provider's rate limiter and resilience layer.
+
+    Raises CircuitOpenError while the upstream is down and RateLimitedError when the key's bucket
+    or daily quota is exhausted.
+    """
+    return await self.upstream.get(self._client(url), url, permit=self.rate_limiter.acquire, **kwargs)
+
+  def upstream_stats(self) -> dict | None:
+    return self._upstream.stats() if self._upstream is not None else None
+
+  def quota_stats(self) -> dict | None:
+    return self._limiter.stats() if self._limiter is not None else None
+
+  def close(self) -> None:
+    """Release resources the provider owns (not the shared HTTP pool); called when a registry is retired."""
+
+  @abstractmethod
+  async def search(self, prefs: UserPreferences, context: SearchContext | None = None) -> List[VenueCandidate]:
+    raise NotImplementedError
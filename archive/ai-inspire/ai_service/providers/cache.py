@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, List, Set, Tuple
+
+from ai_service.cache import SingleFlight, TtlLruCache, refresh_level, search_key
+from ai_service.context import SearchContext
+from ai_service.models import UserPreferences, VenueCandidate
+from ai_service.providers.base import VenueProvider
+from ai_service.tracing import current_span
+
+logger = logging.getLogger("ai_inspire_service")
+
+CacheEntry = Tuple[float, List[VenueCandidate]]
+
+
+class CandidateStore(ABC):
+  """Backend holding (stored_at, candidates) per provider lookup key."""
+
+  @abstractmethod
+  def get(self, key: str) -> CacheEntry | None:
+    raise NotImplementedError
+
+  @abstractmethod
+  def set(self, key: str, stored_at: float, candidates: List[VenueCandidate]) -> None:
+    raise NotImplementedError
+
+  def close(self) -> None:
+    """Release the backend's connection; a no-op for in-memory stores."""
+
+
+class MemoryCandidateStore(CandidateStore):
+  def __init__(self, max_entries: int = 1024, max_age: float = 6 * 3600.0) -> None:
+    # max_age bounds how long an entry may be served stale; freshness is decided by CachedProvider.
+    self._cache = TtlLruCache(max_entries=max_entries, ttl=max_age)
+
+  def get(self, key: str) -> CacheEntry | None:
+    return self._cache.get(key)
+
+  def set(self, key: str, stored_at: float, candidates: List[VenueCandidate]) -> None:
+    self._cache.set(key, (stored_at, candidates))
+
+
+class SqliteCandidateStore(CandidateStore):
+  """On-disk store so warm provider caches survive restarts."""
+
+  def __init__(self, path: str, max_age: float = 6 * 3600.0) -> None:
+    self.path = path
+    self.max_age = max_age
+    self._conn = sqlite3.connect(path, check_same_thread=False)
+    self._conn.execute("PRAGMA journal_mode=WAL")
+    self._conn.execute(
+      "CREATE TABLE IF NOT EXISTS provider_cache (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, payload TEXT NOT NULL)"
+    )
+    self._conn.execute("DELETE FROM provider_cache WHERE stored_at < ?", (time.time() - max_age,))
+    self._conn.commit()
+
+  def get(self, key: str) -> CacheEntry | None:
+    row = self._conn.execute("SELECT stored_at, payload FROM provider_cache WHERE key = ?", (key,)).fetchone()
+    if row is None:
+      return None
+    stored_at, payload = row
+    if stored_at < time.time() - self.max_age:
+      return None
+    try:
+      return (stored_at, [VenueCandidate.from_dict(item) for item in json.loads(payload)])
+    except Exception:
+      logger.warning("Discarding unreadable provider cache entry %s", key)
+      return None
+
+  def set(self, key: str, stored_at: float, candidates: List[VenueCandidate]) -> None:
+    payload = json.dumps([cand.to_dict() for cand in candidates], ensure_ascii=False)
+    self._conn.execute(
+      "INSERT OR REPLACE INTO provider_cache (key, stored_at, payload) VALUES (?, ?, ?)",
+      (key, stored_at, payload),
+    )
+    self._conn.commit()
+
+  def close(self) -> None:
+    self._conn.close()
+
+
+class CachedProvider(VenueProvider):
+  """Wrap a provider with TTL caching, stale-while-revalidate and single-flight lookups."""
+
+  def __init__(
+    self,
+    inner: VenueProvider,
+    store: CandidateStore,
+    ttl: float,
+    stale_ttl: float = 3600.0,
+    clock: Callable[[], float] = time.time,
+  ) -> None:
+    self.inner = inner
+    self.store = store
+    self.ttl = ttl
+    self.stale_ttl = stale_ttl
+    self.clock = clock
+    self.http_pool = inner.http_pool
+    self.time_budget = inner.time_budget
+    self._flight = SingleFlight()
+    self._background: Set[asyncio.Task] = set()
+    self.hits = 0
+    self.stale_hits = 0
+    self.misses = 0
+
+  @property
+  def name(self) -> str:
+    return self.inner.name
+
+  def upstream_stats(self) -> dict | None:
+    return self.inner.upstream_stats()
+
+  def quota_stats(self) -> dict | None:
+    return self.inner.quota_stats()
+
+  def close(self) -> None:
+    self.store.close()
+    self.inner.close()
+
+  def _key(self, prefs: UserPreferences) -> str:
+    raw = json.dumps([self.name, *search_key(prefs), refresh_level(prefs)])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+  async def _fetch(
+    self, key: str, prefs: UserPreferences, context: SearchContext | None = None
+  ) -> List[VenueCandidate]:
+    """Fetch through the single flight; the upstream search is cancelled once no caller awaits it."""
+
+    async def run() -> List[VenueCandidate]:
+      candidates = await self.inner.search(prefs, context)
+      # Empty lists usually mean an upstream error page, so they are not cached.
+      if candidates:
+        self.store.set(key, self.clock(), candidates)
+      return candidates
+
+    return await self._flight.do(key, run)
+
+  def _revalidate(self, key: str, prefs: UserPreferences, context: SearchContext | None = None) -> None:
+    if key in self._flight:
+      return
+
+    async def refresh() -> None:
+      try:
+        await self._fetch(key, prefs, context)
+      except Exception as exc:
+        logger.warning("Background refresh for %s failed: %s", self.name, exc)
+
+    task = asyncio.ensure_future(refresh())
+    self._background.add(task)
+    task.add_done_callback(self._background.discard)
+
+  async def search(self, prefs: UserPreferences, context: SearchContext | None = None) -> List[VenueCandidate]:
+    key = self._key(prefs)
+    entry = self.store.get(key)
+    if entry is not None:
+      stored_at, candidates = entry
+      age = self.clock() - stored_at
+      if age < self.ttl:
+        self.hits += 1
+        current_span().set_attribute("cache.provider", "hit")
+        return candidates
+      if age < self.ttl + self.stale_ttl:
+        self.stale_hits += 1
+        current_span().set_attribute("cache.provider", "stale")
+        self._revalidate(key, prefs, context)
+        return candidates
+    self.misses += 1
+    current_span().set_attribute("cache.provider", "miss")
+    return await self._fetch(key, prefs, context)
+
+  def stats(self) -> dict:
+    return {
+      "hits": self.hits,
+      "staleHits": self.stale_hits,
+      "misses": self.misses,
+      "coalesced": self._flight.coalesced,
+    }
+
+
+def _ttl_overrides() -> dict:
+  """Parse PROVIDER_CACHE_TTLS, e.g. "GooglePlacesProvider=3600,MeetupProvider=300"."""
+  overrides = {}
+  for part in os.getenv("PROVIDER_CACHE_TTLS", "").split(","):
+    name, _, value = part.partition("=")
+    try:
+      overrides[name.strip()] = float(value)
+    except ValueError:
+      continue
+  return overrides
+
+
+def wrap_with_cache(providers: List[VenueProvider], store: CandidateStore | None) -> List[VenueProvider]:
+  if store is None:
+    return providers
+  overrides = _ttl_overrides()
+  stale_ttl = float(os.getenv("PROVIDER_CACHE_STALE_TTL", "3600"))
+  wrapped: List[VenueProvider] = []
+  for provider in providers:
+    ttl = overrides.get(provider.name, provider.cache_ttl)
+    # A TTL of 0 opts a provider out of caching (e.g. in-memory providers).
+    wrapped.append(CachedProvider(provider, store, ttl=ttl, stale_ttl=stale_ttl) if ttl > 0 else provider)
+  return wrapped
+
+
+def build_candidate_store() -> CandidateStore | None:
+  """Select the provider cache backend from PROVIDER_CACHE (memory, sqlite or off)."""
+  backend = os.getenv("PROVIDER_CACHE", "memory").lower()
+  max_age = float(os.getenv("PROVIDER_CACHE_MAX_AGE", str(6 * 3600)))
+  if backend in ("off", "none", "false", "0"):
+    return None
+  if backend == "sqlite":
+    path = os.getenv("PROVIDER_CACHE_PATH", "provider_cache.sqlite3")
+    try:
+      return SqliteCandidateStore(path, max_age=max_age)
+    except sqlite3.Error as exc:
+      logger.warning("SQLite provider cache unavailable at %s (%s); using memory cache.", path, exc)
+  return MemoryCandidateStore(max_entries=int(os.getenv("PROVIDER_CACHE_MAX_ENTRIES", "1024")), max_age=max_age)
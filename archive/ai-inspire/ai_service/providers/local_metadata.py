@@ -1,70 +1,60 @@
-import json
-import os
-from typing import List
+import re
+from typing import List, Tuple
 
-from ai_service.models import UserPreferences, VenueCandidate, SuggestionLocation, ExternalRef
+from ai_service.catalogue import DATA_PATH, get_catalogue
+from ai_service.context import SearchContext
+from ai_service.models import UserPreferences, VenueCandidate, CandidateLocation, CandidateRef
+from ai_service.providers.base import VenueProvider
 
-DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ai_inspire_me_events_with_metadata.json")
 
+def _slug(name: str) -> str:
+  return "-".join(re.findall(r"[a-z0-9]+", name.lower())) or "idea"
 
-class LocalMetadataProvider:
-  """Lightweight provider that returns static ideas from ai_inspire_me_events_with_metadata.json."""
 
-  def __init__(self, data_path: str = DATA_PATH) -> None:
-    self.data_path = data_path
-    self._cache = None
+class LocalMetadataProvider(VenueProvider):
+  """Offline ideas from ai_inspire_me_events_with_metadata.json.
 
-  def _load(self) -> List[dict]:
-    if self._cache is not None:
-      return self._cache
-    try:
-      with open(self.data_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-      self._cache = data.get("events", [])
-    except Exception:
-      self._cache = []
-    return self._cache
+  Ideas are looked up in the shared IdeaCatalogue: inverted-index token matches on name, category,
+  ideal_time, indoor_outdoor and budget, adjusted for group size, budget and season, top k by heap.
+  """
 
-  async def search(self, prefs: UserPreferences) -> List[VenueCandidate]:
-    data = self._load()
-    vibe = (prefs.vibe or "").lower()
-    event_type = (prefs.eventType or "").lower()
-    results: List[VenueCandidate] = []
+  # Results come from memory, so caching them would only cost memory.
+  cache_ttl = 0.0
+
+  def __init__(self, data_path: str = DATA_PATH, limit: int = 5) -> None:
+    self.data_path = data_path
+    self.limit = limit
+    self.catalogue = get_catalogue(data_path)
 
-    def score(item: dict) -> int:
-      s = 0
-      name = (item.get("name") or "").lower()
-      category = (item.get("category") or "").lower()
-      if name and any(tok in name for tok in vibe.split()):
-        s += 2
-      if category and category in vibe:
-        s += 2
-      if category and category in event_type:
-        s += 1
-      if event_type and event_type in name:
-        s += 1
-      return s
+  def top_ideas(self, prefs: UserPreferences, limit: int | None = None) -> List[Tuple[float, dict]]:
+    """(score, idea) pairs for feasible ideas sharing at least one token with the request.
 
-    ranked = sorted(data, key=score, reverse=True)
-    top = [item for item in ranked if score(item) > 0][:5] or ranked[:5]
+    When nothing matches, the best-fitting general ideas are returned instead, since this is the
+    provider of last resort when the live ones come back empty.
+    """
+    limit = limit or self.limit
+    return self.catalogue.select(prefs, limit) or self.catalogue.select(prefs, limit, require_match=False)
 
-    for idx, item in enumerate(top):
+  async def search(self, prefs: UserPreferences, context: SearchContext | None = None) -> List[VenueCandidate]:
+    results: List[VenueCandidate] = []
+    for _score, item in self.top_ideas(prefs):
+      name = item.get("name") or "Suggested idea"
+      slug = _slug(name)
       results.append(
         VenueCandidate(
-          id=f"local-{idx}-{item.get('name','idea')}",
-          title=item.get("name") or "Suggested idea",
+          id=f"local-{slug}",
+          title=name,
           category=item.get("category"),
           type="event",
-          location=SuggestionLocation(
+          location=CandidateLocation(
             name=prefs.location,
             address=prefs.location,
             lat=None,
             lng=None,
           ),
-          external=ExternalRef(source="local_metadata", url=None, sourceId=None),
+          external=CandidateRef(source="local_metadata", url=None, sourceId=f"local-{slug}"),
           roughPrice=item.get("budget"),
           description=item.get("description") or item.get("ideal_time"),
         )
       )
-
     return results
@@ -0,0 +1,183 @@
+import heapq
+import math
+import re
+from functools import lru_cache
+from datetime import datetime, timezone
+from typing import List, Sequence, Tuple
+
+from ai_service.dates import resolve_date_window
+from ai_service.geocoding import NO_COORDINATES, Coordinates
+from ai_service.intent_normalizer import normalize_intent
+from ai_service.models import UserPreferences, VenueCandidate
+
+# Relative weight of each signal in the final score; each signal is normalised to 0..1.
+WEIGHTS = {
+  "rating": 0.25,
+  "match": 0.35,
+  "distance": 0.15,
+  "price": 0.1,
+  "date": 0.15,
+}
+# Score used when a candidate has no data for a signal, so missing fields neither help nor sink it.
+NEUTRAL = 0.5
+# Distance (km) at which the distance score halves.
+DISTANCE_SCALE_KM = 3.0
+BUDGET_LEVELS = {"low": 1, "medium": 2, "high": 3}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"and", "the", "for", "with", "out", "day", "night", "something", "fun", "group"}
+_PRICE_SYMBOLS = "£$€"
+
+
+def _terms(*texts: str | None) -> set:
+  words = set()
+  for text in texts:
+    if text:
+      words.update(w for w in _WORD_RE.findall(text.lower().replace("_", " ")) if len(w) > 2)
+  return words - _STOPWORDS
+
+
+@lru_cache(maxsize=256)
+def price_level(rough_price: str | None) -> int | None:
+  """Map provider price strings ("Free", "££") onto Google's 0-4 price_level scale."""
+  if not rough_price:
+    return None
+  text = rough_price.strip()
+  if text.lower() == "free":
+    return 0
+  symbols = sum(1 for char in text if char in _PRICE_SYMBOLS)
+  return min(symbols, 4) if symbols else None
+
+
+@lru_cache(maxsize=4096)
+def _parse_start(value: str | None) -> float | None:
+  if not value:
+    return None
+  try:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+  except ValueError:
+    return None
+  if parsed.tzinfo is None:
+    parsed = parsed.replace(tzinfo=timezone.utc)
+  return parsed.timestamp()
+
+
+def candidate_centre(candidates: Sequence[VenueCandidate]) -> Coordinates:
+  """Median candidate position, used as the search centre when the location isn't geocoded."""
+  lats = sorted(c.location.lat for c in candidates if c.location.lat is not None and c.location.lng is not None)
+  lngs = sorted(c.location.lng for c in candidates if c.location.lat is not None and c.location.lng is not None)
+  if not lats:
+    return NO_COORDINATES
+  return (lats[len(lats) // 2], lngs[len(lngs) // 2])
+
+
+class RankingQuery:
+  """Everything about the request the scorer needs, derived once per ranking call."""
+
+  def __init__(self, prefs: UserPreferences, centre: Coordinates = NO_COORDINATES) -> None:
+    intent = normalize_intent(prefs.vibe, prefs.eventType)
+    self.category_terms = _terms(*intent.get("categories", []))
+    self.terms = _terms(prefs.vibe, prefs.eventType, *intent.get("tags", [])) | self.category_terms
+    # One alternation over all query terms is far cheaper than tokenising every candidate.
+    alternation = "|".join(re.escape(term) for term in sorted(self.terms, key=len, reverse=True))
+    self.term_re = re.compile(rf"\b(?:{alternation})\b") if self.terms else None
+    self.budget = BUDGET_LEVELS.get((prefs.budgetLevel or "").strip().lower())
+    start_dt, end_dt = resolve_date_window(prefs.dateRange)
+    self.window = (start_dt.timestamp(), end_dt.timestamp()) if start_dt and end_dt else None
+    lat, lng = centre
+    self.centre = (lat, lng) if lat is not None and lng is not None else None
+
+
+def score_candidates(query: RankingQuery, candidates: Sequence[VenueCandidate]) -> List[float]:
+  """Score every candidate in a single pass; higher is better.
+
+  Everything that depends only on the query (weights, compiled terms, the date window, the centre's
+  cosine) is bound to locals before the loop, and a signal the request can't use contributes its
+  weighted neutral score as a constant, so the loop body only does per-candidate work.
+  """
+  w_rating, w_match, w_distance, w_price, w_date = (
+    WEIGHTS["rating"],
+    WEIGHTS["match"],
+    WEIGHTS["distance"],
+    WEIGHTS["price"],
+    WEIGHTS["date"],
+  )
+  find_terms = query.term_re.findall if query.term_re is not None else None
+  category_terms = query.category_terms
+  centre = query.centre
+  if centre is not None:
+    lat0, lng0 = centre
+    cos_lat = math.cos(math.radians(lat0))
+  budget = query.budget
+  window = query.window
+  if window is not None:
+    lo, hi = window
+  base = (
+    (0.0 if find_terms is not None else w_match * NEUTRAL)
+    + (0.0 if centre is not None else w_distance * NEUTRAL)
+    + (0.0 if budget is not None else w_price * NEUTRAL)
+    + (0.0 if window is not None else w_date * NEUTRAL)
+  )
+  hypot = math.hypot
+
+  scores: List[float] = []
+  for cand in candidates:
+    rating = cand.rating
+    score = base + w_rating * (min(rating, 5.0) / 5.0 if rating is not None else NEUTRAL)
+
+    if find_terms is not None:
+      category = cand.category
+      text = f"{cand.title} {category}" if category else cand.title
+      hits = set(find_terms(text.lower().replace("_", " ")))
+      if hits:
+        # A category-term hit counts double: "bar" from the intent categories says more than a vibe word.
+        score += w_match * min(1.0, (len(hits) + len(hits & category_terms)) / 2.0)
+
+    if centre is not None:
+      location = cand.location
+      lat, lng = location.lat, location.lng
+      if lat is not None and lng is not None:
+        # Equirectangular approximation: accurate to well under 1% at city scale and much cheaper than haversine.
+        score += w_distance * DISTANCE_SCALE_KM / (
+          DISTANCE_SCALE_KM + 111.2 * hypot(lat - lat0, (lng - lng0) * cos_lat)
+        )
+      else:
+        score += w_distance * NEUTRAL
+
+    if budget is not None:
+      level = cand.priceLevel
+      if level is None:
+        level = price_level(cand.roughPrice)
+      if level is None:
+        score += w_price * NEUTRAL
+      elif level <= budget:
+        score += w_price
+      else:
+        score += w_price * max(0.0, 1.0 - (level - budget) / 2.0)
+
+    if window is not None:
+      start = _parse_start(cand.startTime) if cand.type == "event" else None
+      if start is None:
+        score += w_date * NEUTRAL
+      elif lo <= start <= hi:
+        score += w_date
+
+    scores.append(score)
+  return scores
+
+
+def rank_candidates(
+  prefs: UserPreferences,
+  candidates: Sequence[VenueCandidate],
+  centre: Coordinates = NO_COORDINATES,
+  limit: int | None = None,
+) -> List[VenueCandidate]:
+  """Deterministically order candidates by local score; ties keep provider order."""
+  if not candidates:
+    return []
+  if centre[0] is None:
+    centre = candidate_centre(candidates)
+  scores = score_candidates(RankingQuery(prefs, centre), candidates)
+  keyed: List[Tuple[float, int]] = [(score, -idx) for idx, score in enumerate(scores)]
+  top = heapq.nlargest(limit, keyed) if limit is not None else sorted(keyed, reverse=True)
+  return [candidates[-neg_idx] for _score, neg_idx in top]
@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import os
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Tuple
+
+
+class RateLimitedError(RuntimeError):
+  """Raised when a provider call would exceed its rate limit or daily quota."""
+
+
+class TokenBucket:
+  """Classic token bucket: `rate` tokens per second, holding at most `burst`.
+
+  acquire() reserves tokens up front, letting the balance go negative, so concurrent waiters are
+  served in arrival order without a lock: each one sleeps until its own reservation is covered.
+  """
+
+  def __init__(
+    self,
+    rate: float,
+    burst: float,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+  ) -> None:
+    self.rate = rate
+    self.burst = burst
+    self.clock = clock
+    self.sleep = sleep
+    self._tokens = burst
+    self._updated = clock()
+
+  def _refill(self) -> None:
+    now = self.clock()
+    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+    self._updated = now
+
+  @property
+  def tokens(self) -> float:
+    self._refill()
+    return self._tokens
+
+  def try_acquire(self, count: float = 1.0) -> bool:
+    self._refill()
+    if self._tokens >= count:
+      self._tokens -= count
+      return True
+    return False
+
+  async def acquire(self, count: float = 1.0, max_wait: float = 0.0) -> bool:
+    """Take count tokens, waiting up to max_wait seconds for them; False (and nothing taken) if too long."""
+    self._refill()
+    wait = (count - self._tokens) / self.rate if self._tokens < count else 0.0
+    if wait > max_wait:
+      return False
+    self._tokens -= count
+    if wait > 0:
+      await self.sleep(wait)
+    return True
+
+
+class DailyQuota:
+  """Calls made against a per-day allowance, reset at midnight UTC."""
+
+  def __init__(self, limit: int | None, clock: Callable[[], float] = time.time) -> None:
+    self.limit = limit
+    self.clock = clock
+    self.day = self._today()
+    self.used = 0
+
+  def _today(self) -> str:
+    return datetime.fromtimestamp(self.clock(), tz=timezone.utc).date().isoformat()
+
+  def _roll(self) -> None:
+    today = self._today()
+    if today != self.day:
+      self.day = today
+      self.used = 0
+
+  def remaining(self) -> int | None:
+    self._roll()
+    return None if self.limit is None else max(0, self.limit - self.used)
+
+  def record(self, count: int = 1) -> None:
+    self._roll()
+    self.used += count
+
+  def release(self, count: int = 1) -> None:
+    """Give back calls that were recorded but never made."""
+    self._roll()
+    self.used = max(0, self.used - count)
+
+
+class RateLimiter:
+  """Token bucket plus daily quota for one provider API key, shared by every in-flight request."""
+
+  def __init__(
+    self,
+    name: str,
+    bucket: TokenBucket | None,
+    quota: DailyQuota,
+    max_wait: float = 0.5,
+  ) -> None:
+    self.name = name
+    self.bucket = bucket
+    self.quota = quota
+    self.max_wait = max_wait
+    self.allowed = 0
+    self.throttled = 0
+    self.quota_refused = 0
+
+  def available(self) -> float:
+    """Calls that could go out right now without waiting (inf when unlimited)."""
+    tokens = self.bucket.tokens if self.bucket is not None else float("inf")
+    remaining = self.quota.remaining()
+    return max(0.0, min(tokens, float("inf") if remaining is None else remaining))
+
+  async def acquire(self) -> None:
+    """Wait (briefly) for permission to make one call; raises RateLimitedError instead of queueing long."""
+    remaining = self.quota.remaining()
+    if remaining is not None and remaining <= 0:
+      self.quota_refused += 1
+      raise RateLimitedError(f"{self.name} daily quota of {self.quota.limit} calls used up")
+    # Reserve the quota slot before waiting on the bucket, so concurrent callers that all passed the
+    # check above can't overshoot the quota; it is given back if the call doesn't go out.
+    self.quota.record()
+    try:
+      admitted = self.bucket is None or await self.bucket.acquire(1.0, self.max_wait)
+    except asyncio.CancelledError:
+      self.quota.release()
+      raise
+    if not admitted:
+      self.quota.release()
+      self.throttled += 1
+      raise RateLimitedError(f"{self.name} rate limit reached")
+    self.allowed += 1
+
+  def stats(self) -> dict:
+    return {
+      "day": self.quota.day,
+      "quotaUsed": self.quota.used,
+      "quotaLimit": self.quota.limit,
+      "quotaRemaining": self.quota.remaining(),
+      "allowed": self.allowed,
+      "throttled": self.throttled,
+      "quotaRefused": self.quota_refused,
+      "tokens": round(self.bucket.tokens, 2) if self.bucket is not None else None,
+    }
+
+
+def _overrides(var: str) -> Dict[str, float]:
+  """Parse "GooglePlacesProvider=5,MeetupProvider=0.5" style env settings."""
+  overrides: Dict[str, float] = {}
+  for part in os.getenv(var, "").split(","):
+    name, _, value = part.partition("=")
+    try:
+      overrides[name.strip()] = float(value)
+    except ValueError:
+      continue
+  return overrides
+
+
+_LIMITERS: Dict[Tuple[str, str], RateLimiter] = {}
+
+
+def get_rate_limiter(
+  name: str,
+  credential: str,
+  rate: float | None,
+  burst: float,
+  daily_quota: int | None,
+  clock: Callable[[], float] = time.monotonic,
+  sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+  wall_clock: Callable[[], float] = time.time,
+) -> RateLimiter:
+  """Shared limiter per provider and API key, so reloads and duplicate providers draw on one bucket.
+
+  PROVIDER_RATE_LIMITS, PROVIDER_RATE_BURSTS and PROVIDER_DAILY_QUOTAS override the provider's
+  defaults by name; a rate or quota of 0 disables that limit. PROVIDER_RATE_MAX_WAIT is how long a
+  call may queue for a token before the provider is skipped. clock and sleep drive the token
+  bucket and wall_clock the daily quota; they only apply when the limiter is first created.
+  """
+  key = (name, hashlib.sha1(credential.encode("utf-8")).hexdigest()[:12])
+  limiter = _LIMITERS.get(key)
+  if limiter is None:
+    rate = _overrides("PROVIDER_RATE_LIMITS").get(name, rate)
+    burst = _overrides("PROVIDER_RATE_BURSTS").get(name, burst)
+    quota = _overrides("PROVIDER_DAILY_QUOTAS").get(name, daily_quota)
+    limiter = _LIMITERS[key] = RateLimiter(
+      name,
+      TokenBucket(rate, max(1.0, burst), clock=clock, sleep=sleep) if rate else None,
+      DailyQuota(int(quota) if quota else None, clock=wall_clock),
+      max_wait=float(os.getenv("PROVIDER_RATE_MAX_WAIT", "0.5")),
+    )
+  return limiter
@@ -0,0 +1,91 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+from dotenv import load_dotenv
+
+from ai_service.geocoding import Geocoder, build_geocoder
+from ai_service.http_pool import HttpClientPool
+from ai_service.llm import PROMPT_STATS, LlmClient, build_llm_client
+from ai_service.providers import VenueProvider, build_candidate_store, build_providers, wrap_with_cache
+
+logger = logging.getLogger("ai_inspire_service")
+
+
+@dataclass
+class ServiceRegistry:
+  """Providers and LLM client built once from the environment and shared by all requests."""
+
+  providers: List[VenueProvider]
+  llm: LlmClient | None
+  geocoder: Geocoder | None = None
+  llm_error: str | None = None
+  generation: int = 0
+  built_at: float = field(default_factory=time.time)
+
+  def describe(self) -> dict:
+    """Configuration summary for diagnostics; never includes credentials."""
+    return {
+      "generation": self.generation,
+      "builtAt": self.built_at,
+      "providers": [provider.name for provider in self.providers],
+      "providerCache": {
+        provider.name: provider.stats() for provider in self.providers if hasattr(provider, "stats")
+      },
+      "providerUpstreams": {
+        provider.name: provider.upstream_stats()
+        for provider in self.providers
+        if provider.upstream_stats() is not None
+      },
+      "providerQuotas": {
+        provider.name: provider.quota_stats()
+        for provider in self.providers
+        if provider.quota_stats() is not None
+      },
+      "llm": {
+        "backend": self.llm.name if self.llm else None,
+        "model": getattr(self.llm, "model", None),
+        "error": self.llm_error,
+        "cache": self.llm.stats() if hasattr(self.llm, "stats") else None,
+        "prompt": PROMPT_STATS.stats(),
+        "breakers": self.llm.breaker_stats() if hasattr(self.llm, "breaker_stats") else None,
+      },
+      "geocoder": self.geocoder.stats() if self.geocoder else None,
+    }
+
+  def close(self) -> None:
+    """Close the SQLite-backed stores (provider, LLM and geocode caches) this registry opened."""
+    for provider in self.providers:
+      provider.close()
+    if self.llm is not None:
+      self.llm.close()
+    if self.geocoder is not None:
+      self.geocoder.close()
+
+
+def build_registry(http_pool: HttpClientPool | None = None, generation: int = 0) -> ServiceRegistry:
+  geocoder = build_geocoder(http_pool)
+  providers = wrap_with_cache(build_providers(http_pool, geocoder), build_candidate_store())
+  if not providers:
+    logger.warning("No providers configured; suggestions will come from the LLM fallback only.")
+  llm: LlmClient | None = None
+  llm_error: str | None = None
+  try:
+    llm = build_llm_client(http_pool, geocoder)
+  except RuntimeError as exc:
+    # Missing keys should degrade to provider output rather than failing every request.
+    llm_error = str(exc)
+    logger.warning("LLM backend unavailable: %s", exc)
+  return ServiceRegistry(
+    providers=providers, llm=llm, geocoder=geocoder, llm_error=llm_error, generation=generation
+  )
+
+
+def reload_registry(current: ServiceRegistry, http_pool: HttpClientPool | None = None) -> ServiceRegistry:
+  """Re-read .env files (overriding the process env) and build a fresh registry for key rotation."""
+  load_dotenv(".env", override=True)
+  load_dotenv(".env.local", override=True)
+  registry = build_registry(http_pool, generation=current.generation + 1)
+  logger.info("Registry reloaded (generation=%s)", registry.generation)
+  return registry
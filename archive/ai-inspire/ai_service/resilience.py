@@ -0,0 +1,321 @@
+import asyncio
+import email.utils
+import logging
+import math
+import os
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Tuple
+
+import httpx
+
+from ai_service.tracing import span
+
+logger = logging.getLogger("ai_inspire_service")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+  """Raised instead of calling an upstream whose breaker is open."""
+
+
+def percentile(values, pct: float) -> float | None:
+  """Nearest-rank percentile; None for an empty sample."""
+  ordered = sorted(values)
+  if not ordered:
+    return None
+  rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+  return ordered[rank - 1]
+
+
+class CircuitBreaker:
+  """Rolling-window breaker for one upstream.
+
+  The last `window` calls are kept as (ok, seconds). The breaker opens when, with at least
+  `min_calls` in the window, the failure ratio reaches `failure_ratio` or the p95 latency exceeds
+  `slow_seconds`. After `cooldown` seconds it lets a single probe through (half open): success
+  closes it with a fresh window, failure opens it again.
+  """
+
+  def __init__(
+    self,
+    name: str,
+    window: int = 20,
+    min_calls: int = 5,
+    failure_ratio: float = 0.5,
+    slow_seconds: float | None = None,
+    cooldown: float = 30.0,
+    clock: Callable[[], float] = time.monotonic,
+  ) -> None:
+    self.name = name
+    self.min_calls = min_calls
+    self.failure_ratio = failure_ratio
+    self.slow_seconds = slow_seconds
+    self.cooldown = cooldown
+    self.clock = clock
+    self._calls: Deque[Tuple[bool, float]] = deque(maxlen=window)
+    self._state = CLOSED
+    self._opened_at = 0.0
+    self._probing = False
+    self.opened = 0
+    self.rejected = 0
+
+  @property
+  def state(self) -> str:
+    if self._state == OPEN and self.clock() - self._opened_at >= self.cooldown:
+      self._state = HALF_OPEN
+      self._probing = False
+    return self._state
+
+  def allow(self) -> bool:
+    """Whether a call may go out now; in half-open state only one probe at a time is allowed."""
+    state = self.state
+    if state == CLOSED:
+      return True
+    if state == HALF_OPEN and not self._probing:
+      self._probing = True
+      return True
+    self.rejected += 1
+    return False
+
+  def p95(self, min_samples: int = 1) -> float | None:
+    """p95 latency of successful calls in the window; None with fewer than min_samples of them."""
+    latencies = [seconds for ok, seconds in self._calls if ok]
+    if len(latencies) < min_samples:
+      return None
+    return percentile(latencies, 95)
+
+  def record_success(self, seconds: float) -> None:
+    if self._state == HALF_OPEN:
+      self._calls.clear()
+      self._state = CLOSED
+      self._probing = False
+    self._calls.append((True, seconds))
+    self._evaluate()
+
+  def record_failure(self, seconds: float = 0.0) -> None:
+    if self._state == HALF_OPEN:
+      self._trip()
+      return
+    self._calls.append((False, seconds))
+    self._evaluate()
+
+  def release(self) -> None:
+    """Forget an allowed call that was abandoned (e.g. a cancelled hedge) without an outcome."""
+    self._probing = False
+
+  def open_for(self, seconds: float) -> None:
+    """Open now and stay open for at least seconds, e.g. to honour an upstream's Retry-After."""
+    self._trip()
+    self._opened_at = self.clock() - self.cooldown + max(seconds, 0.0)
+
+  def _evaluate(self) -> None:
+    if self._state != CLOSED or len(self._calls) < self.min_calls:
+      return
+    failures = sum(1 for ok, _seconds in self._calls if not ok)
+    if failures / len(self._calls) >= self.failure_ratio:
+      self._trip()
+      return
+    p95 = self.p95()
+    if self.slow_seconds is not None and p95 is not None and p95 > self.slow_seconds:
+      self._trip()
+
+  def _trip(self) -> None:
+    self._state = OPEN
+    self._opened_at = self.clock()
+    self._probing = False
+    self.opened += 1
+
+  def stats(self) -> dict:
+    failures = sum(1 for ok, _seconds in self._calls if not ok)
+    p95 = self.p95()
+    return {
+      "state": self.state,
+      "calls": len(self._calls),
+      "failureRate": round(failures / len(self._calls), 4) if self._calls else 0.0,
+      "p95Ms": round(p95 * 1000, 1) if p95 is not None else None,
+      "opened": self.opened,
+      "rejected": self.rejected,
+    }
+
+
+class RetryBudget:
+  """Caps retries at a fraction of calls so a dead upstream doesn't multiply its own load.
+
+  Every call deposits `ratio` tokens (up to `cap`), every retry withdraws one; with the defaults at
+  most one call in five is retried once the initial reserve is spent.
+  """
+
+  def __init__(self, ratio: float = 0.2, cap: float = 10.0) -> None:
+    self.ratio = ratio
+    self.cap = cap
+    self._balance = cap
+    self.denied = 0
+
+  def deposit(self) -> None:
+    self._balance = min(self.cap, self._balance + self.ratio)
+
+  def withdraw(self) -> bool:
+    if self._balance >= 1.0:
+      self._balance -= 1.0
+      return True
+    self.denied += 1
+    return False
+
+  @property
+  def balance(self) -> float:
+    return self._balance
+
+
+def retry_after_seconds(resp: httpx.Response, now: Callable[[], float] = time.time) -> float | None:
+  """Seconds from a Retry-After header (delta-seconds or HTTP date); None when absent or unparseable."""
+  value = resp.headers.get("retry-after")
+  if not value:
+    return None
+  value = value.strip()
+  if value.isdigit():
+    return float(value)
+  try:
+    when = email.utils.parsedate_to_datetime(value)
+  except (TypeError, ValueError):
+    return None
+  return max(0.0, when.timestamp() - now())
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: random.Random = random) -> float:
+  """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+  return rng.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+# Worth retrying: throttling and server-side failures. Other 4xx go straight back to the caller.
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class ResilientUpstream:
+  """Breaker, retry budget and jittered backoff in front of one upstream's GET requests.
+
+  Calls to an open breaker raise CircuitOpenError without touching the network. Transport errors
+  and RETRYABLE_STATUSES count against the breaker and are retried (budget and attempts
+  permitting) after max(backoff, Retry-After). A Retry-After longer than max_retry_after is not
+  waited out in-request: the breaker is held open for that long instead.
+  """
+
+  def __init__(
+    self,
+    name: str,
+    breaker: CircuitBreaker | None = None,
+    budget: RetryBudget | None = None,
+    max_attempts: int = 2,
+    base_delay: float = 0.25,
+    max_delay: float = 2.0,
+    max_retry_after: float = 2.0,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], object] = asyncio.sleep,
+    rng: random.Random | None = None,
+  ) -> None:
+    self.name = name
+    self.breaker = breaker or CircuitBreaker(name, clock=clock)
+    self.budget = budget or RetryBudget()
+    self.max_attempts = max(1, max_attempts)
+    self.base_delay = base_delay
+    self.max_delay = max_delay
+    self.max_retry_after = max_retry_after
+    self.clock = clock
+    self.sleep = sleep
+    self.rng = rng or random.Random()
+    self.calls = 0
+    self.retries = 0
+    self.short_circuited = 0
+
+  async def get(
+    self,
+    client: httpx.AsyncClient,
+    url: str,
+    permit: Callable[[], Awaitable[None]] | None = None,
+    **kwargs,
+  ) -> httpx.Response:
+    """GET url; returns the last response (even a non-200) or raises the last transport error.
+
+    permit, if given, is awaited before every attempt (e.g. a rate limiter) and may raise to skip it.
+    """
+    if not self.breaker.allow():
+      self.short_circuited += 1
+      raise CircuitOpenError(f"{self.name} circuit is open")
+    self.calls += 1
+    self.budget.deposit()
+    attempt = 0
+    while True:
+      resp: httpx.Response | None = None
+      try:
+        # One span per attempt; the URL is recorded without query params, which carry API keys.
+        with span("http.attempt", upstream=self.name, url=url.split("?", 1)[0], attempt=attempt) as attempt_span:
+          if permit is not None:
+            await permit()
+          started = self.clock()
+          resp = await client.get(url, **kwargs)
+          attempt_span.set_attribute("status", resp.status_code)
+      except httpx.RequestError as exc:
+        self.breaker.record_failure(self.clock() - started)
+        error: Exception = exc
+        wait = backoff_delay(attempt, self.base_delay, self.max_delay, self.rng)
+      except BaseException:
+        # Cancelled (e.g. by the provider time budget) or refused by permit: no verdict on the
+        # upstream, but free a half-open probe slot.
+        self.breaker.release()
+        raise
+      else:
+        if resp.status_code not in RETRYABLE_STATUSES:
+          self.breaker.record_success(self.clock() - started)
+          return resp
+        self.breaker.record_failure(self.clock() - started)
+        error = httpx.HTTPStatusError(f"status {resp.status_code}", request=resp.request, response=resp)
+        wait = backoff_delay(attempt, self.base_delay, self.max_delay, self.rng)
+        retry_after = retry_after_seconds(resp)
+        if retry_after is not None:
+          if retry_after > self.max_retry_after:
+            logger.warning("%s asked to back off for %.0fs; pausing calls", self.name, retry_after)
+            self.breaker.open_for(retry_after)
+            return resp
+          wait = max(wait, retry_after)
+
+      attempt += 1
+      if attempt >= self.max_attempts or self.breaker.state != CLOSED or not self.budget.withdraw():
+        if resp is not None:
+          return resp
+        raise error
+      self.retries += 1
+      await self.sleep(wait)
+
+  def stats(self) -> dict:
+    return {
+      **self.breaker.stats(),
+      "upstreamCalls": self.calls,
+      "retries": self.retries,
+      "retriesDenied": self.budget.denied,
+      "shortCircuited": self.short_circuited,
+    }
+
+
+def provider_upstream(name: str) -> ResilientUpstream:
+  """ResilientUpstream for a venue provider, configured from PROVIDER_* env vars."""
+  slow = float(os.getenv("PROVIDER_BREAKER_SLOW_SECONDS", "0"))
+  breaker = CircuitBreaker(
+    name,
+    window=int(os.getenv("PROVIDER_BREAKER_WINDOW", "20")),
+    min_calls=int(os.getenv("PROVIDER_BREAKER_MIN_CALLS", "5")),
+    failure_ratio=float(os.getenv("PROVIDER_BREAKER_FAILURE_RATIO", "0.5")),
+    slow_seconds=slow if slow > 0 else None,
+    cooldown=float(os.getenv("PROVIDER_BREAKER_COOLDOWN", "30")),
+  )
+  return ResilientUpstream(
+    name,
+    breaker=breaker,
+    budget=RetryBudget(ratio=float(os.getenv("PROVIDER_RETRY_BUDGET_RATIO", "0.2"))),
+    max_attempts=int(os.getenv("PROVIDER_MAX_ATTEMPTS", "2")),
+    base_delay=float(os.getenv("PROVIDER_RETRY_BASE_SECONDS", "0.25")),
+    max_delay=float(os.getenv("PROVIDER_RETRY_MAX_SECONDS", "2")),
+  )
@@ -0,0 +1,278 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, TextIO
+
+logger = logging.getLogger("ai_inspire_service")
+
+# Spans are exported in the OTLP/JSON span shape (traceId, spanId, parentSpanId, *UnixNano,
+# attributes, status) so a file export can be replayed into any OpenTelemetry collector.
+
+
+class Span:
+  """One timed operation in a request trace."""
+
+  __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start_ns", "end_ns", "error")
+
+  recording = True
+
+  def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: Dict[str, Any]) -> None:
+    self.name = name
+    self.trace_id = trace_id
+    self.span_id = secrets.token_hex(8)
+    self.parent_id = parent_id
+    self.attributes = attributes
+    self.start_ns = time.time_ns()
+    self.end_ns: int | None = None
+    self.error: str | None = None
+
+  def set_attribute(self, key: str, value: Any) -> None:
+    self.attributes[key] = value
+
+  def add(self, key: str, amount: int = 1) -> None:
+    """Increment a counting attribute, e.g. candidates dropped by a filter."""
+    self.attributes[key] = self.attributes.get(key, 0) + amount
+
+  def record_error(self, exc: BaseException) -> None:
+    self.error = f"{type(exc).__name__}: {exc}"
+
+  @property
+  def duration_ms(self) -> float:
+    return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+  def to_dict(self) -> dict:
+    return {
+      "traceId": self.trace_id,
+      "spanId": self.span_id,
+      "parentSpanId": self.parent_id or "",
+      "name": self.name,
+      "startTimeUnixNano": self.start_ns,
+      "endTimeUnixNano": self.end_ns,
+      "attributes": self.attributes,
+      "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+    }
+
+
+class _NoopSpan:
+  """Stand-in handed out while tracing is off; every call is a no-op."""
+
+  __slots__ = ()
+
+  recording = False
+
+  def set_attribute(self, key: str, value: Any) -> None:
+    pass
+
+  def add(self, key: str, amount: int = 1) -> None:
+    pass
+
+  def record_error(self, exc: BaseException) -> None:
+    pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_CURRENT: contextvars.ContextVar[Span | None] = contextvars.ContextVar("ai_inspire_span", default=None)
+
+
+class _NoopScope:
+  __slots__ = ()
+
+  def __enter__(self) -> _NoopSpan:
+    return NOOP_SPAN
+
+  def __exit__(self, *exc_info) -> bool:
+    return False
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class _SpanScope:
+  __slots__ = ("tracer", "span", "token")
+
+  def __init__(self, tracer: "Tracer", span: Span) -> None:
+    self.tracer = tracer
+    self.span = span
+    self.token: contextvars.Token | None = None
+
+  def __enter__(self) -> Span:
+    self.token = _CURRENT.set(self.span)
+    return self.span
+
+  def __exit__(self, exc_type, exc, tb) -> bool:
+    if exc is not None and not isinstance(exc, GeneratorExit):
+      self.span.record_error(exc)
+    try:
+      _CURRENT.reset(self.token)
+    except ValueError:
+      # An async generator closed from another task; that context never saw this span.
+      pass
+    self.span.end_ns = time.time_ns()
+    self.tracer.export(self.span)
+    return False
+
+
+class InMemoryExporter:
+  """Keeps the most recent spans in memory (for tests, benchmarks and /diagnostics)."""
+
+  name = "memory"
+
+  def __init__(self, max_spans: int = 10_000) -> None:
+    self.spans: Deque[Span] = deque(maxlen=max_spans)
+
+  def export(self, span: Span) -> None:
+    self.spans.append(span)
+
+  def trace(self, trace_id: str) -> List[Span]:
+    return sorted((span for span in self.spans if span.trace_id == trace_id), key=lambda span: span.start_ns)
+
+  def clear(self) -> None:
+    self.spans.clear()
+
+
+class FileExporter:
+  """Appends one OTLP/JSON span per line to a local file.
+
+  export() only queues the finished span; a daemon thread owns the single open file handle and
+  writes queued spans in batches, roughly every flush_interval seconds, so request handlers never
+  touch the disk. When the queue is full, spans are dropped and counted rather than blocking the
+  event loop.
+  """
+
+  name = "file"
+
+  def __init__(self, path: str, flush_interval: float = 0.1, max_queue: int = 10_000, max_batch: int = 1024) -> None:
+    self.path = path
+    self.flush_interval = flush_interval
+    self.max_batch = max_batch
+    self.dropped = 0
+    self._queue: "queue.Queue[dict | None]" = queue.Queue(maxsize=max_queue)
+    self._closed = False
+    self._thread = threading.Thread(target=self._run, name="span-file-exporter", daemon=True)
+    self._thread.start()
+    # Spans still queued at interpreter exit are written out rather than lost with the daemon thread.
+    atexit.register(self.close)
+
+  def export(self, span: Span) -> None:
+    if self._closed:
+      return
+    try:
+      self._queue.put_nowait(span.to_dict())
+    except queue.Full:
+      self.dropped += 1
+
+  def flush(self) -> None:
+    """Block until every span queued so far has been written."""
+    if self._thread.is_alive():
+      self._queue.join()
+
+  def close(self) -> None:
+    """Write what is queued, close the file and stop the writer thread; later spans are ignored."""
+    if self._closed:
+      return
+    self._closed = True
+    self._queue.put(None)
+    self._thread.join()
+    atexit.unregister(self.close)
+
+  def _run(self) -> None:
+    handle: TextIO | None = None
+    running = True
+    while running:
+      batch = [self._queue.get()]
+      if batch[0] is not None and self._queue.qsize() < self.max_batch:
+        # Let spans accumulate so the request path wakes the writer (and yields the GIL) less often.
+        time.sleep(self.flush_interval)
+      while len(batch) < self.max_batch:
+        try:
+          batch.append(self._queue.get_nowait())
+        except queue.Empty:
+          break
+      if None in batch:
+        running = False
+      lines = "".join(json.dumps(item, default=str) + "\n" for item in batch if item is not None)
+      try:
+        if lines:
+          if handle is None:
+            handle = open(self.path, "a", encoding="utf-8")
+          handle.write(lines)
+          handle.flush()
+      except OSError as exc:
+        logger.warning("Could not write spans to %s: %s", self.path, exc)
+        handle = None
+      finally:
+        for _ in batch:
+          self._queue.task_done()
+    if handle is not None:
+      handle.close()
+
+
+class Tracer:
+  """Creates spans parented on the current one; with no exporter, span() costs one attribute check."""
+
+  def __init__(self, exporter: InMemoryExporter | FileExporter | None = None) -> None:
+    self.exporter = exporter
+    self.exported = 0
+
+  @property
+  def enabled(self) -> bool:
+    return self.exporter is not None
+
+  def span(self, name: str, **attributes: Any) -> _SpanScope | _NoopScope:
+    if self.exporter is None:
+      return _NOOP_SCOPE
+    parent = _CURRENT.get()
+    trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+    return _SpanScope(self, Span(name, trace_id, parent.span_id if parent is not None else None, attributes))
+
+  def export(self, span: Span) -> None:
+    if self.exporter is not None:
+      self.exported += 1
+      self.exporter.export(span)
+
+  def describe(self) -> dict:
+    return {
+      "exporter": self.exporter.name if self.exporter is not None else None,
+      "exported": self.exported,
+      "dropped": getattr(self.exporter, "dropped", 0),
+    }
+
+
+def build_tracer() -> Tracer:
+  """Select the exporter from TRACING_EXPORTER (off, memory or file; file writes to TRACING_FILE)."""
+  backend = os.getenv("TRACING_EXPORTER", "off").lower()
+  if backend == "memory":
+    return Tracer(InMemoryExporter(int(os.getenv("TRACING_MAX_SPANS", "10000"))))
+  if backend == "file":
+    return Tracer(FileExporter(os.getenv("TRACING_FILE", "traces.jsonl")))
+  return Tracer()
+
+
+TRACER = build_tracer()
+
+
+def configure_tracing(exporter: InMemoryExporter | FileExporter | None) -> Tracer:
+  """Swap the process-wide exporter (None turns tracing off); a replaced file exporter is closed."""
+  previous, TRACER.exporter = TRACER.exporter, exporter
+  if isinstance(previous, FileExporter) and previous is not exporter:
+    previous.close()
+  return TRACER
+
+
+def span(name: str, **attributes: Any) -> _SpanScope | _NoopScope:
+  """Context manager timing `name` as a child of the current span."""
+  return TRACER.span(name, **attributes)
+
+
+def current_span() -> Span | _NoopSpan:
+  if TRACER.exporter is None:
+    return NOOP_SPAN
+  return _CURRENT.get() or NOOP_SPAN
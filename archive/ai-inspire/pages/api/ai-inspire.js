@@ -33,6 +33,12 @@ export default async function handler(req, res) {
     });
     clearTimeout(timeout);
 
+    // Per-stage durations from the service (cache, geocode, p-<provider>, providers, llm, total).
+    const serverTiming = response.headers.get('server-timing');
+    if (serverTiming) {
+      console.info('AI Inspire timing', response.status, serverTiming);
+    }
+
     if (!response.ok) {
       console.error('AI Inspire service error', response.status);
       return res
@@ -0,0 +1,51 @@
+import asyncio
+
+from ai_service.catalogue import IdeaCatalogue
+from ai_service.models import DateRange, UserPreferences
+from ai_service.providers import LocalMetadataProvider
+
+
+def _prefs(group_size: int, budget: str | None = None, vibe: str = "cooking class") -> UserPreferences:
+  return UserPreferences(
+    groupSize=group_size,
+    budgetLevel=budget,
+    location="London",
+    dateRange=DateRange(mode="relative", label="next week"),
+    vibe=vibe,
+    eventType="Day out",
+  )
+
+
+def _catalogue(*sizes: str) -> IdeaCatalogue:
+  catalogue = IdeaCatalogue("/nonexistent/ideas.json")
+  catalogue._build([{"name": f"Idea {idx}", "typical_group_size": size, "budget": "££"} for idx, size in enumerate(sizes)])
+  return catalogue
+
+
+def test_couple_gets_catalogue_ideas():
+  ideas = asyncio.run(LocalMetadataProvider().search(_prefs(2)))
+  assert len(ideas) == 5
+
+
+def test_couple_on_low_budget_gets_catalogue_ideas():
+  for size in (2, 3):
+    ideas = asyncio.run(LocalMetadataProvider().search(_prefs(size, "Low")))
+    assert ideas, f"no ideas for a group of {size} on a low budget"
+
+
+def test_unmatched_couple_falls_back_to_general_ideas():
+  ideas = asyncio.run(LocalMetadataProvider().search(_prefs(2, "Low", vibe="zzqx")))
+  assert len(ideas) == 5
+
+
+def test_group_size_misfit_is_penalised_not_pruned():
+  scores = _catalogue("4-20", "2-20", "10-80").structured_scores(_prefs(2))
+  assert scores[1] == 0.0
+  assert scores[0] is not None and scores[0] < 0
+  assert scores[2] is not None and scores[2] < scores[0]
+
+
+def test_group_far_above_maximum_is_pruned():
+  scores = _catalogue("4-20", "10-200").structured_scores(_prefs(250))
+  assert scores[0] is None
+  assert scores[1] is not None and scores[1] < 0
@@ -0,0 +1,96 @@
+import asyncio
+import json
+from typing import List
+
+from ai_service.benchmarks.stub_server import StubServer
+from ai_service.http_pool import HttpClientPool
+from ai_service.llm import OllamaLlmClient, RankStatus
+from ai_service.models import CandidateLocation, CandidateRef, DateRange, UserPreferences, VenueCandidate
+
+PREFS = UserPreferences(
+  groupSize=6,
+  location="London",
+  dateRange=DateRange(mode="relative", label="this week"),
+  vibe="cocktails",
+  eventType="night out",
+)
+CANDIDATES = [
+  VenueCandidate(
+    id=f"cand-{idx}",
+    title=f"Venue {idx}",
+    location=CandidateLocation(name="Soho"),
+    external=CandidateRef(source="google_places", url=f"https://example.com/{idx}"),
+  )
+  for idx in range(4)
+]
+ANSWER = json.dumps(
+  {"suggestions": [{"id": f"c{idx}", "whySuitable": f"Pick {idx} {{fun}}"} for idx in (2, 1, 3)]}
+)
+
+
+def _ollama(text: str, chunk_size: int = 7, done_early: bool = False):
+  """Streaming /api/generate stub; done_early sends done:true before the rest of the text."""
+
+  async def handler(path: str, query: dict, body: bytes):
+    assert json.loads(body)["stream"] is True
+
+    async def chunks():
+      pieces = [text[start:start + chunk_size] for start in range(0, len(text), chunk_size)]
+      if done_early:
+        pieces = pieces[: len(pieces) // 2]
+      for piece in pieces:
+        await asyncio.sleep(0)
+        yield (json.dumps({"response": piece, "done": False}) + "\n").encode("utf-8")
+      yield (json.dumps({"response": "", "done": True}) + "\n").encode("utf-8")
+      if done_early:
+        yield (json.dumps({"response": text[len(pieces) * chunk_size:], "done": False}) + "\n").encode("utf-8")
+
+    return (200, chunks())
+
+  return handler
+
+
+async def _collect(handler, annotate: bool = False, status: RankStatus | None = None) -> List:
+  pool = HttpClientPool(http2=False)
+  try:
+    async with StubServer(handler) as server:
+      client = OllamaLlmClient(base_url=server.base_url, model="stub", http_pool=pool)
+      if annotate:
+        stream = client.stream_rank_and_annotate(PREFS, CANDIDATES, status)
+      else:
+        stream = client.stream_rank(PREFS, CANDIDATES)
+      return [suggestion async for suggestion in stream]
+  finally:
+    await pool.aclose()
+
+
+def test_stream_rank_restores_candidates_in_model_order():
+  suggestions = asyncio.run(_collect(_ollama(ANSWER)))
+  assert [s.id for s in suggestions] == ["cand-1", "cand-0", "cand-2"]
+  assert suggestions[0].external.url == "https://example.com/1"
+  assert suggestions[0].whySuitable == "Pick 2 {fun}"
+
+
+def test_stream_rank_with_prose_before_the_json():
+  suggestions = asyncio.run(_collect(_ollama("Here you go:\n```json\n" + ANSWER + "\n```")))
+  assert [s.id for s in suggestions] == ["cand-1", "cand-0", "cand-2"]
+
+
+def test_done_before_the_array_closes_keeps_finished_suggestions():
+  suggestions = asyncio.run(_collect(_ollama(ANSWER, done_early=True)))
+  assert 0 < len(suggestions) < 3
+  assert [s.id for s in suggestions] == ["cand-1", "cand-0", "cand-2"][: len(suggestions)]
+
+
+def test_fallback_when_nothing_parses():
+  status = RankStatus()
+  suggestions = asyncio.run(_collect(_ollama("Sorry, I can't help with that."), annotate=True, status=status))
+  assert suggestions, "the deterministic fallback should answer"
+  assert {s.id for s in suggestions} <= {cand.id for cand in CANDIDATES}
+  assert status.answered is False
+
+
+def test_model_answer_marks_status_answered():
+  status = RankStatus()
+  asyncio.run(_collect(_ollama(ANSWER), annotate=True, status=status))
+  assert status.answered is True
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from ai_service.cache import TtlLruCache
+from ai_service.llm import LlmClient, LocalRankerClient
+from ai_service.models import CandidateLocation, CandidateRef, DateRange, UserPreferences, VenueCandidate
+from ai_service.pipeline import ResponseCaches, run_suggestions
+from ai_service.providers import VenueProvider
+from ai_service.registry import ServiceRegistry
+
+PREFS = UserPreferences(
+  groupSize=4,
+  location="London",
+  dateRange=DateRange(mode="relative", label="next week"),
+  vibe="live music",
+  eventType="night out",
+)
+
+
+class StaticProvider(VenueProvider):
+  cache_ttl = 0.0
+
+  async def search(self, prefs, context=None):
+    return [
+      VenueCandidate(
+        id=f"venue-{idx}",
+        title=f"Music bar {idx}",
+        category="bar",
+        location=CandidateLocation(name="London"),
+        external=CandidateRef(source="test", sourceId=f"venue-{idx}"),
+      )
+      for idx in range(8)
+    ]
+
+
+class FailingLlm(LlmClient):
+  async def rank(self, user_query, raw_results):
+    raise RuntimeError("connection refused")
+
+
+class EmptyLlm(LlmClient):
+  async def rank(self, user_query, raw_results):
+    return []
+
+
+class SlowLlm(LlmClient):
+  async def rank(self, user_query, raw_results):
+    await asyncio.sleep(5)
+    return []
+
+
+def _run(llm: LlmClient, caches: ResponseCaches):
+  registry = ServiceRegistry(providers=[StaticProvider()], llm=llm)
+  return asyncio.run(run_suggestions(PREFS, registry, caches))
+
+
+def _caches() -> ResponseCaches:
+  return ResponseCaches(candidate_pool=TtlLruCache(), response=TtlLruCache())
+
+
+def test_model_ranking_is_cached():
+  caches = _caches()
+  response = _run(LocalRankerClient(None), caches)
+  assert response.suggestions
+  assert caches.response.stats()["entries"] == 1
+
+
+@pytest.mark.parametrize("llm", [FailingLlm(), EmptyLlm()])
+def test_fallback_ranking_is_not_cached(llm):
+  caches = _caches()
+  response = _run(llm, caches)
+  assert response.suggestions, "the fallback should still answer"
+  assert caches.response.stats()["entries"] == 0
+
+
+def test_llm_stage_timeout_is_not_cached(monkeypatch):
+  monkeypatch.setenv("LLM_STAGE_SECONDS", "0.3")
+  caches = _caches()
+  response = _run(SlowLlm(), caches)
+  assert response.suggestions
+  assert caches.response.stats()["entries"] == 0
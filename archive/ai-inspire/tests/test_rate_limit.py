@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from ai_service.rate_limit import DailyQuota, RateLimitedError, RateLimiter, TokenBucket, get_rate_limiter
+
+
+class FakeClock:
+  """Manual clock; sleep() advances it instead of waiting."""
+
+  def __init__(self, now: float = 0.0) -> None:
+    self.now = now
+    self.sleeps = []
+
+  def __call__(self) -> float:
+    return self.now
+
+  async def sleep(self, seconds: float) -> None:
+    self.sleeps.append(seconds)
+    self.now += seconds
+
+
+def test_bucket_allows_a_burst_then_refills_at_rate():
+  clock = FakeClock()
+  bucket = TokenBucket(rate=2.0, burst=4.0, clock=clock, sleep=clock.sleep)
+  assert [bucket.try_acquire() for _ in range(5)] == [True, True, True, True, False]
+  clock.now += 1.0
+  assert bucket.tokens == pytest.approx(2.0)
+  clock.now += 60.0
+  assert bucket.tokens == pytest.approx(4.0), "refill is capped at the burst size"
+
+
+def test_bucket_waiters_sleep_for_their_own_reservation():
+  clock = FakeClock()
+  bucket = TokenBucket(rate=2.0, burst=1.0, clock=clock, sleep=clock.sleep)
+
+  async def run():
+    return [await bucket.acquire(1.0, max_wait=1.0) for _ in range(3)]
+
+  assert asyncio.run(run()) == [True, True, True]
+  assert clock.sleeps == [pytest.approx(0.5), pytest.approx(0.5)]
+  # A wait longer than max_wait is refused without taking anything.
+  clock.now += 10.0
+  assert bucket.try_acquire()
+  assert asyncio.run(bucket.acquire(1.0, max_wait=0.4)) is False
+  assert bucket.tokens == pytest.approx(0.0)
+
+
+def test_daily_quota_rolls_over_at_midnight_utc():
+  before_midnight = datetime(2026, 10, 17, 23, 59, 59, tzinfo=timezone.utc).timestamp()
+  clock = FakeClock(before_midnight)
+  quota = DailyQuota(3, clock=clock)
+  quota.record(3)
+  assert quota.remaining() == 0
+  clock.now += 0.5
+  assert quota.remaining() == 0
+  clock.now += 1.0
+  assert quota.remaining() == 3
+  assert quota.day == "2026-10-18"
+
+
+def test_cancelled_wait_releases_the_quota_slot():
+  clock = FakeClock()
+  blocked = asyncio.Event()
+
+  async def never(seconds: float) -> None:
+    blocked.set()
+    await asyncio.Future()
+
+  limiter = RateLimiter(
+    "test", TokenBucket(rate=1.0, burst=1.0, clock=clock, sleep=never), DailyQuota(5, clock=clock), max_wait=10.0
+  )
+
+  async def run():
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await blocked.wait()
+    assert limiter.quota.used == 2
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+      await waiter
+
+  asyncio.run(run())
+  assert limiter.quota.used == 1
+  assert limiter.quota.remaining() == 4
+  assert limiter.allowed == 1
+
+
+def test_twenty_callers_share_a_quota_of_five(monkeypatch):
+  monkeypatch.setattr("ai_service.rate_limit._LIMITERS", {})
+  for var in ("PROVIDER_RATE_LIMITS", "PROVIDER_RATE_BURSTS", "PROVIDER_DAILY_QUOTAS"):
+    monkeypatch.delenv(var, raising=False)
+  monkeypatch.setenv("PROVIDER_RATE_MAX_WAIT", "30")
+  clock = FakeClock()
+  limiter = get_rate_limiter(
+    "TestProvider", "key", rate=1.0, burst=2.0, daily_quota=5, clock=clock, sleep=clock.sleep, wall_clock=clock
+  )
+  assert limiter.bucket.clock is clock and limiter.quota.clock is clock
+  assert get_rate_limiter("TestProvider", "key", 1.0, 2.0, 5) is limiter
+
+  async def run():
+    return await asyncio.gather(*(limiter.acquire() for _ in range(20)), return_exceptions=True)
+
+  results = asyncio.run(run())
+  refused = [result for result in results if isinstance(result, RateLimitedError)]
+  assert limiter.allowed + len(refused) == 20
+  # Two calls fit the burst and three more wait a second each for a token; the quota refuses the rest.
+  assert limiter.allowed == limiter.quota.used == 5
+  assert len(refused) == limiter.quota_refused == 15
+  assert limiter.throttled == 0
+  assert clock.now == pytest.approx(3.0)
+
+  clock.now += 86400
+  assert asyncio.run(limiter.acquire()) is None
+  assert limiter.quota.used == 1
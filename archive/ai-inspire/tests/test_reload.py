@@ -0,0 +1,58 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_service.main import app
+from ai_service.registry import build_registry
+
+
+@pytest.fixture
+def sqlite_env(monkeypatch, tmp_path):
+  monkeypatch.chdir(tmp_path)
+  monkeypatch.setenv("EVENTBRITE_API_KEY", "test-key")
+  monkeypatch.setenv("AI_BACKEND", "ollama")
+  monkeypatch.setenv("PROVIDER_CACHE", "sqlite")
+  monkeypatch.setenv("PROVIDER_CACHE_PATH", str(tmp_path / "providers.sqlite3"))
+  monkeypatch.setenv("LLM_CACHE", "sqlite")
+  monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.sqlite3"))
+  monkeypatch.setenv("GEOCODE_STORE_PATH", str(tmp_path / "geocode.sqlite3"))
+
+
+def _connections(registry) -> list:
+  return [registry.providers[0].store._conn, registry.llm.store._conn, registry.geocoder.store._conn]
+
+
+def _closed(conn: sqlite3.Connection) -> bool:
+  try:
+    conn.execute("SELECT 1")
+  except sqlite3.ProgrammingError:
+    return True
+  return False
+
+
+def test_registry_close_closes_every_sqlite_store(sqlite_env):
+  registry = build_registry()
+  connections = _connections(registry)
+  assert not any(_closed(conn) for conn in connections)
+  registry.close()
+  assert all(_closed(conn) for conn in connections)
+
+
+def test_admin_reload_checks_the_token_and_retires_the_old_registry(sqlite_env, monkeypatch):
+  monkeypatch.setenv("ADMIN_TOKEN", "secret")
+  monkeypatch.setenv("REQUEST_DEADLINE_SECONDS", "0")
+  with TestClient(app) as client:
+    old = app.state.registry
+    connections = _connections(old)
+    assert client.post("/admin/reload").status_code == 403
+    assert client.post("/admin/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert app.state.registry is old
+
+    response = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["generation"] == old.generation + 1
+    # The old registry is closed once in-flight requests have had their deadline.
+    client.get("/health")
+    assert all(_closed(conn) for conn in connections)
+    assert not any(_closed(conn) for conn in _connections(app.state.registry))
@@ -0,0 +1,74 @@
+import json
+
+from ai_service.llm.stream_parser import SuggestionStreamParser
+
+ANSWER = {
+  "suggestions": [
+    {"id": "c1", "whySuitable": 'Lively {but} you can still "talk" \\ [honest]'},
+    {"id": "c2", "whySuitable": "Quiet}]{ corner"},
+    {"id": "c3", "whySuitable": "Late bar"},
+  ]
+}
+
+
+def _feed_all(parser: SuggestionStreamParser, text: str, size: int) -> list:
+  items = []
+  for start in range(0, len(text), size):
+    items.extend(parser.feed(text[start:start + size]))
+  return items
+
+
+def test_objects_split_across_every_chunk_boundary():
+  text = json.dumps(ANSWER)
+  for size in (1, 2, 3, 7, 64):
+    parser = SuggestionStreamParser()
+    assert _feed_all(parser, text, size) == ANSWER["suggestions"], f"chunk size {size}"
+    assert parser.done
+
+
+def test_each_object_is_returned_as_soon_as_it_closes():
+  text = json.dumps(ANSWER)
+  first_end = text.index("}, {") + 1
+  parser = SuggestionStreamParser()
+  assert parser.feed(text[:first_end - 1]) == []
+  assert parser.feed(text[first_end - 1:first_end]) == [ANSWER["suggestions"][0]]
+
+
+def test_escaped_quotes_and_braces_inside_strings():
+  text = json.dumps({"suggestions": [{"id": "c1", "whySuitable": '\\"}{][\\\\"'}]})
+  parser = SuggestionStreamParser()
+  assert parser.feed(text) == [{"id": "c1", "whySuitable": '\\"}{][\\\\"'}]
+  assert parser.done
+
+
+def test_prose_and_code_fence_before_the_json():
+  text = "Sure! Here are my picks {as requested}:\n```json\n" + json.dumps(ANSWER) + "\n```\nEnjoy!"
+  parser = SuggestionStreamParser()
+  assert _feed_all(parser, text, 5) == ANSWER["suggestions"]
+  assert parser.done
+
+
+def test_bare_top_level_array():
+  parser = SuggestionStreamParser()
+  assert parser.feed(json.dumps(ANSWER["suggestions"])) == ANSWER["suggestions"]
+
+
+def test_stream_ending_before_the_array_closes_keeps_finished_objects():
+  text = json.dumps(ANSWER)
+  cut = text.index('"c3"')
+  parser = SuggestionStreamParser()
+  assert _feed_all(parser, text[:cut], 4) == ANSWER["suggestions"][:2]
+  assert not parser.done
+
+
+def test_text_after_the_array_is_ignored():
+  parser = SuggestionStreamParser()
+  items = parser.feed(json.dumps(ANSWER) + ' {"suggestions": [{"id": "c9"}]}')
+  assert [item["id"] for item in items] == ["c1", "c2", "c3"]
+  assert parser.feed('{"id": "c10"}') == []
+
+
+def test_prose_only_yields_nothing():
+  parser = SuggestionStreamParser()
+  assert _feed_all(parser, "I'm sorry, I can't rank these venues.", 6) == []
+  assert not parser.done
@@ -0,0 +1,66 @@
+import json
+import threading
+
+from ai_service.tracing import FileExporter, Tracer
+
+
+def _trace(tracer: Tracer, spans: int) -> None:
+  with tracer.span("request"):
+    for idx in range(spans - 1):
+      with tracer.span("step", idx=idx):
+        pass
+
+
+def test_file_exporter_writes_spans_from_its_writer_thread(tmp_path, monkeypatch):
+  path = tmp_path / "traces.jsonl"
+  exporter = FileExporter(str(path))
+  opened = []
+  real_open = open
+  monkeypatch.setattr("builtins.open", lambda *args, **kwargs: opened.append(args[0]) or real_open(*args, **kwargs))
+  tracer = Tracer(exporter)
+  for _ in range(50):
+    _trace(tracer, 4)
+  exporter.flush()
+  lines = path.read_text(encoding="utf-8").splitlines()
+  assert len(lines) == tracer.exported == 200
+  assert opened == [str(path)], "the file is opened once, not per span"
+  first = json.loads(lines[0])
+  assert first["name"] == "step" and first["attributes"] == {"idx": 0}
+  assert first["parentSpanId"] == json.loads(lines[3])["spanId"]
+  exporter.close()
+
+
+def test_close_drains_the_queue_and_ignores_later_spans(tmp_path):
+  path = tmp_path / "traces.jsonl"
+  exporter = FileExporter(str(path))
+  tracer = Tracer(exporter)
+  _trace(tracer, 10)
+  exporter.close()
+  assert len(path.read_text(encoding="utf-8").splitlines()) == 10
+  _trace(tracer, 3)
+  exporter.close()
+  assert len(path.read_text(encoding="utf-8").splitlines()) == 10
+
+
+def test_full_queue_drops_spans_instead_of_blocking(tmp_path, monkeypatch):
+  path = tmp_path / "traces.jsonl"
+  writing, release = threading.Event(), threading.Event()
+  real_open = open
+
+  def slow_open(*args, **kwargs):
+    writing.set()
+    release.wait(5)
+    return real_open(*args, **kwargs)
+
+  monkeypatch.setattr("builtins.open", slow_open)
+  exporter = FileExporter(str(path), max_queue=1)
+  tracer = Tracer(exporter)
+  _trace(tracer, 1)
+  assert writing.wait(5)
+  # The writer is stuck on the disk: one span fits in the queue, the rest are dropped at once.
+  _trace(tracer, 20)
+  assert exporter.dropped == 19
+  assert tracer.describe()["dropped"] == 19
+  release.set()
+  exporter.close()
+  assert len(path.read_text(encoding="utf-8").splitlines()) == 2